@@ -0,0 +1,35 @@
+import threading
+from collections import OrderedDict
+
+
+class AdaptiveTtl:
+    """Lengthen a key's TTL while reloads keep returning byte-identical content."""
+
+    def __init__(self, *, growth_factor, max_ttl_seconds, max_keys):
+        if growth_factor <= 1:
+            raise ValueError("growth_factor must be greater than one")
+        self.growth_factor = growth_factor
+        self.max_ttl_seconds = max_ttl_seconds
+        self.max_keys = max_keys
+        self._lock = threading.Lock()
+        self._fingerprints = OrderedDict()
+
+    def ttl_for(self, key, fingerprint, floor):
+        """Record a load of `key` and return `(ttl, content)`."""
+        with self._lock:
+            previous = self._fingerprints.pop(key, None)
+            if previous is None:
+                unchanged_loads, content = 0, "new"
+            elif previous[0] == fingerprint:
+                unchanged_loads, content = previous[1] + 1, "unchanged"
+            else:
+                unchanged_loads, content = 0, "changed"
+            self._fingerprints[key] = (fingerprint, unchanged_loads)
+            while len(self._fingerprints) > self.max_keys:
+                self._fingerprints.popitem(last=False)
+        grown = floor * self.growth_factor ** min(unchanged_loads, 64)
+        return max(floor, min(grown, self.max_ttl_seconds)), content
+
+    def clear(self):
+        with self._lock:
+            self._fingerprints.clear()
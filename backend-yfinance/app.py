@@ -1,19 +1,34 @@
+import atexit
+import copy
+import gzip
+import hashlib
+import json
 import logging
 import math
 import os
+import threading
 import time
 import traceback
-from dataclasses import asdict, dataclass
+from dataclasses import asdict, dataclass, replace
 
+import numpy as np
 import pandas as pd
 import yfinance as yf
+from adaptive_ttl import AdaptiveTtl
 from bulkhead import BulkheadSaturatedError, LoaderBulkhead
 from circuit_breaker import CircuitBreaker, CircuitOpenError, CircuitOutcome, CircuitState
+from disk_cache import DiskCache
 from flask import Flask, Response, g, jsonify, request
 from flask.json.provider import DefaultJSONProvider
+from history_archive import HistoryArchive
+from market_sessions import DEFAULT_SESSIONS, MarketSessions, TradingSession
 from memory_cache import ByteBoundedTTLCache
 from metrics import AdapterMetrics
+from micro_batcher import MicroBatcher
+from price_history import HistoricalPrice, PriceHistory
+from refresh_ahead import RefreshAheadScheduler
 from singleflight import SingleFlight
+from warmup import CacheWarmup
 from werkzeug.exceptions import HTTPException
 from yfinance.exceptions import YFPricesMissingError, YFRateLimitError, YFTzMissingError
 
@@ -42,9 +57,8 @@ yf.config.debug.hide_exceptions = False
 VALID_PERIODS = {"1d", "5d", "1mo", "3mo", "6mo", "1y", "2y", "5y", "10y", "ytd", "max"}
 VALID_INTERVALS = {"1m", "5m", "15m", "30m", "1h", "1d", "1wk", "1mo"}
 INTRADAY_INTERVALS = {"1m", "2m", "5m", "15m", "30m", "60m", "90m", "1h"}
-MAX_HISTORY_START = "1900-01-01"
 METRIC_METHODS = {"GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS", "HEAD"}
-OPERATIONAL_PATHS = {"/health", "/metrics"}
+OPERATIONAL_PATHS = {"/health", "/ready", "/metrics"}
 
 HISTORY_CACHE_SECONDS = {
     "1d": 120,
@@ -61,10 +75,82 @@ HISTORY_CACHE_SECONDS = {
 }
 
 INTRADAY_CACHE_SECONDS = 30
+# The TTLs above apply while a symbol's market is open. Data fetched after the close has
+# settled, or before the open, stays fresh until the next session opens.
+SESSION_CLOSE_SETTLE_SECONDS = 1800
+SESSION_HOLIDAY_GRACE_SECONDS = 1800
+SESSION_MAX_TRACKED_SYMBOLS = 4096
+# Each reload that returns identical content doubles a key's TTL, up to a configurable
+# cap; the tables above are the floor.
+ADAPTIVE_TTL_GROWTH_FACTOR = 2
+ADAPTIVE_TTL_MAX_KEYS = 8192
+
+# Daily periods in increasing span. A period can be sliced from any longer cached period;
+# `ytd` is never a source because early in the year it is shorter than `1mo`.
+DERIVABLE_HISTORY_PERIODS = ("1mo", "3mo", "6mo", "ytd", "1y", "2y", "5y", "10y", "max")
+# Expired long daily series are kept this long so a refresh can fetch only their tail.
+INCREMENTAL_HISTORY_PERIODS = {"2y", "5y", "10y", "max"}
+ARCHIVED_HISTORY_PERIODS = {"5y", "10y", "max"}
+HISTORY_STALE_RETENTION_SECONDS = 7 * 86400
+# (tail period, largest calendar-day gap since the last cached bar it still overlaps).
+INCREMENTAL_HISTORY_WINDOWS = (("5d", 3), ("1mo", 21))
+# Repaired prices from a short window may differ in the last float digits.
+INCREMENTAL_HISTORY_RELATIVE_TOLERANCE = 1e-6
+HISTORY_PERIOD_OFFSETS = {
+    "1mo": pd.DateOffset(months=1),
+    "3mo": pd.DateOffset(months=3),
+    "6mo": pd.DateOffset(months=6),
+    "1y": pd.DateOffset(years=1),
+    "2y": pd.DateOffset(years=2),
+    "5y": pd.DateOffset(years=5),
+    "10y": pd.DateOffset(years=10),
+}
+
+# Weekly and monthly bars are aggregated from the daily series of the next longer period,
+# which covers yfinance's own repaired range: the period plus four days before it.
+RESAMPLED_INTERVALS = {"1wk", "1mo"}
+RESAMPLE_SOURCE_PERIODS = {
+    "1mo": "3mo",
+    "3mo": "6mo",
+    "6mo": "1y",
+    "ytd": "1y",
+    "1y": "2y",
+    "2y": "5y",
+    "5y": "10y",
+    "10y": "max",
+    "max": "max",
+}
+RESAMPLE_START_PADDING = pd.Timedelta(days=4)
+# Coarser intraday bars are aggregated from one cached `1m` series per symbol and period.
+# Yahoo serves `1m` bars for about the last week only, so longer periods are fetched as is.
+INTRADAY_SOURCE_INTERVAL = "1m"
+RESAMPLED_INTRADAY_SECONDS = {"5m": 300, "15m": 900, "30m": 1800, "1h": 3600}
+RESAMPLED_INTRADAY_PERIODS = {"1d", "5d"}
 
 INFO_CACHE_SECONDS = 300
+# Dividend and split events are shared by every period and interval of a symbol. A new
+# event reaches history first through the chart's own action columns.
+CORPORATE_ACTIONS_CACHE_SECONDS = 86400
 SEARCH_CACHE_SECONDS = 300
+# Matches the compare use case's ten quotes plus their FX conversion symbols.
+BATCH_MAX_SYMBOLS = 20
 RATE_LIMIT_RETRY_AFTER_SECONDS = 60
+# Refresh-ahead reloads hot history and info entries within the last tenth of their TTL,
+# stretched by up to half again per key so entries loaded together drift apart. A read
+# counts for half as much after five minutes, and one loader permit stays free for
+# interactive misses.
+REFRESH_AHEAD_KEY_PREFIXES = ("history:", "info:")
+REFRESH_AHEAD_LEAD_FRACTION = 0.1
+REFRESH_AHEAD_JITTER_FRACTION = 0.5
+REFRESH_AHEAD_MIN_LEAD_SECONDS = 2
+REFRESH_AHEAD_HALF_LIFE_SECONDS = 300
+REFRESH_AHEAD_MAX_TRACKED_KEYS = 4096
+REFRESH_AHEAD_RESERVED_LOADERS = 1
+# What a watchlist entry warms when it lists no history: the quote use case's series.
+WARMUP_DEFAULT_HISTORY = ({"period": "10y", "interval": "1d"},)
+# Below one MTU the gzip header and CPU cost outweigh the saved bytes.
+GZIP_MIN_BODY_BYTES = 1024
+GZIP_COMPRESS_LEVEL = 6
 SYMBOL_IDENTITY_FIELDS = ("symbol", "shortName", "longName", "quoteType", "exchange")
 
 DEFAULT_HISTORY_CACHE_MAX_BYTES = 64 * 1024 * 1024
@@ -78,6 +164,26 @@ DEFAULT_WAITRESS_THREADS = 8
 DEFAULT_CIRCUIT_BREAKER_FAILURE_THRESHOLD = 4
 DEFAULT_CIRCUIT_BREAKER_FAILURE_WINDOW_SECONDS = 30
 DEFAULT_CIRCUIT_BREAKER_OPEN_SECONDS = 30
+DEFAULT_DISK_CACHE_MAX_BYTES = 256 * 1024 * 1024
+DEFAULT_HISTORY_ARCHIVE_MAX_BYTES = 1024 * 1024 * 1024
+DEFAULT_INFO_BATCH_WINDOW_MS = 0
+DEFAULT_LAST_KNOWN_GOOD_MAX_BYTES = 32 * 1024 * 1024
+DEFAULT_LAST_KNOWN_GOOD_MAX_ENTRIES = 2048
+DEFAULT_LAST_KNOWN_GOOD_MAX_AGE_SECONDS = 86400
+DEFAULT_HISTORY_STALE_WHILE_REVALIDATE_SECONDS = 0
+DEFAULT_INFO_STALE_WHILE_REVALIDATE_SECONDS = 0
+DEFAULT_SEARCH_STALE_WHILE_REVALIDATE_SECONDS = 0
+DEFAULT_REFRESH_AHEAD_BUDGET_PER_MINUTE = 0
+DEFAULT_REFRESH_AHEAD_MIN_HITS = 3
+DEFAULT_WARMUP_CONCURRENCY = 2
+DEFAULT_WARMUP_LOADS_PER_MINUTE = 120
+DEFAULT_SESSION_TTL_MAX_EXTENSION_SECONDS = 4 * 86400
+DEFAULT_ADAPTIVE_TTL_MAX_SECONDS = 6 * 3600
+DEFAULT_NEGATIVE_CACHE_SECONDS = 60
+# Bump whenever a cached payload class changes shape so older disk rows are discarded.
+DISK_CACHE_SCHEMA_VERSION = 3
+# Bump whenever the archive file layout or its encoded body changes shape.
+HISTORY_ARCHIVE_SCHEMA_VERSION = 1
 
 
 def _non_negative_env_int(name, default):
@@ -133,16 +239,185 @@ CIRCUIT_BREAKER_OPEN_SECONDS = _positive_env_int(
     "YFINANCE_CIRCUIT_BREAKER_OPEN_SECONDS", DEFAULT_CIRCUIT_BREAKER_OPEN_SECONDS
 )
 WAITRESS_THREADS = _positive_env_int("YFINANCE_WAITRESS_THREADS", DEFAULT_WAITRESS_THREADS)
+DISK_CACHE_PATH = os.getenv("YFINANCE_DISK_CACHE_PATH") or None
+DISK_CACHE_MAX_BYTES = _positive_env_int(
+    "YFINANCE_DISK_CACHE_MAX_BYTES", DEFAULT_DISK_CACHE_MAX_BYTES
+)
+HISTORY_ARCHIVE_PATH = os.getenv("YFINANCE_HISTORY_ARCHIVE_PATH") or None
+HISTORY_ARCHIVE_MAX_BYTES = _positive_env_int(
+    "YFINANCE_HISTORY_ARCHIVE_MAX_BYTES", DEFAULT_HISTORY_ARCHIVE_MAX_BYTES
+)
+INFO_BATCH_WINDOW_MS = _non_negative_env_int(
+    "YFINANCE_INFO_BATCH_WINDOW_MS", DEFAULT_INFO_BATCH_WINDOW_MS
+)
+LAST_KNOWN_GOOD_MAX_BYTES = _non_negative_env_int(
+    "YFINANCE_LAST_KNOWN_GOOD_MAX_BYTES", DEFAULT_LAST_KNOWN_GOOD_MAX_BYTES
+)
+LAST_KNOWN_GOOD_MAX_ENTRIES = _non_negative_env_int(
+    "YFINANCE_LAST_KNOWN_GOOD_MAX_ENTRIES", DEFAULT_LAST_KNOWN_GOOD_MAX_ENTRIES
+)
+LAST_KNOWN_GOOD_MAX_AGE_SECONDS = _non_negative_env_int(
+    "YFINANCE_LAST_KNOWN_GOOD_MAX_AGE_SECONDS", DEFAULT_LAST_KNOWN_GOOD_MAX_AGE_SECONDS
+)
+# How long after its TTL an entry of each key class may still be served while one
+# background load refreshes it.
+STALE_WHILE_REVALIDATE_SECONDS = {
+    "history": _non_negative_env_int(
+        "YFINANCE_HISTORY_STALE_WHILE_REVALIDATE_SECONDS",
+        DEFAULT_HISTORY_STALE_WHILE_REVALIDATE_SECONDS,
+    ),
+    "info": _non_negative_env_int(
+        "YFINANCE_INFO_STALE_WHILE_REVALIDATE_SECONDS", DEFAULT_INFO_STALE_WHILE_REVALIDATE_SECONDS
+    ),
+    "search": _non_negative_env_int(
+        "YFINANCE_SEARCH_STALE_WHILE_REVALIDATE_SECONDS",
+        DEFAULT_SEARCH_STALE_WHILE_REVALIDATE_SECONDS,
+    ),
+}
+REFRESH_AHEAD_BUDGET_PER_MINUTE = _non_negative_env_int(
+    "YFINANCE_REFRESH_AHEAD_BUDGET_PER_MINUTE", DEFAULT_REFRESH_AHEAD_BUDGET_PER_MINUTE
+)
+REFRESH_AHEAD_MIN_HITS = _positive_env_int(
+    "YFINANCE_REFRESH_AHEAD_MIN_HITS", DEFAULT_REFRESH_AHEAD_MIN_HITS
+)
+WARMUP_WATCHLIST_PATH = os.getenv("YFINANCE_WARMUP_WATCHLIST_PATH") or None
+WARMUP_CONCURRENCY = _positive_env_int("YFINANCE_WARMUP_CONCURRENCY", DEFAULT_WARMUP_CONCURRENCY)
+WARMUP_LOADS_PER_MINUTE = _positive_env_int(
+    "YFINANCE_WARMUP_LOADS_PER_MINUTE", DEFAULT_WARMUP_LOADS_PER_MINUTE
+)
+TRADING_CALENDAR_PATH = os.getenv("YFINANCE_TRADING_CALENDAR_PATH") or None
+SESSION_TTL_MAX_EXTENSION_SECONDS = _non_negative_env_int(
+    "YFINANCE_SESSION_TTL_MAX_EXTENSION_SECONDS", DEFAULT_SESSION_TTL_MAX_EXTENSION_SECONDS
+)
+ADAPTIVE_TTL_MAX_SECONDS = _non_negative_env_int(
+    "YFINANCE_ADAPTIVE_TTL_MAX_SECONDS", DEFAULT_ADAPTIVE_TTL_MAX_SECONDS
+)
+NEGATIVE_CACHE_SECONDS = _non_negative_env_int(
+    "YFINANCE_NEGATIVE_CACHE_SECONDS", DEFAULT_NEGATIVE_CACHE_SECONDS
+)
 if WAITRESS_THREADS <= BULKHEAD_MAX_ACTIVE_LOADERS:
     raise RuntimeError(
         "YFINANCE_WAITRESS_THREADS must be greater than YFINANCE_BULKHEAD_MAX_ACTIVE_LOADERS"
     )
 
 
-_history_cache = ByteBoundedTTLCache(HISTORY_CACHE_MAX_BYTES, HISTORY_CACHE_MAX_ENTRIES)
-_metadata_cache = ByteBoundedTTLCache(METADATA_CACHE_MAX_BYTES, METADATA_CACHE_MAX_ENTRIES)
+_last_known_good = ByteBoundedTTLCache(LAST_KNOWN_GOOD_MAX_BYTES, LAST_KNOWN_GOOD_MAX_ENTRIES)
+
+
+def _retain_last_known_good(key, value):
+    """Keep a response payload leaving the primary caches for serving through upstream failures."""
+    if not isinstance(value, EncodedPayload) or value.stale_reason is not None:
+        return
+    if _is_negative(value):
+        # Serving "not found" through an outage would hide a symbol that has since appeared.
+        return
+    remaining = _last_known_good_remaining(value)
+    if remaining > 0:
+        # The value is leaving its cache, so the tier can keep it without another copy.
+        _last_known_good.set(key, value, remaining)
+
+
+def _last_known_good_remaining(payload):
+    return LAST_KNOWN_GOOD_MAX_AGE_SECONDS - (time.time() - payload.fetched_at)
+
+
+def _servable_as_last_known_good(payload):
+    return (
+        isinstance(payload, EncodedPayload)
+        and not _is_negative(payload)
+        and _last_known_good_remaining(payload) >= 0
+    )
+
+
+def _watchlist_loads(path):
+    """Return the info and history loads a watchlist file asks for, keyed by cache key."""
+    try:
+        with open(path, encoding="utf-8") as file:
+            watchlist = json.load(file)
+    except (OSError, ValueError) as error:
+        raise RuntimeError(f"YFINANCE_WARMUP_WATCHLIST_PATH cannot be read: {error}") from error
+    if not isinstance(watchlist, dict) or not all(
+        isinstance(watchlist.get(field, []), list) for field in ("symbols", "fx", "history")
+    ):
+        raise RuntimeError(
+            "YFINANCE_WARMUP_WATCHLIST_PATH must hold a JSON object of symbols, fx and history lists"
+        )
+
+    symbols = list(watchlist.get("symbols", []))
+    for pair in watchlist.get("fx", []):
+        currencies = pair.split("/") if isinstance(pair, str) else []
+        if len(currencies) != 2 or not all(currencies):
+            raise RuntimeError(f"Invalid watchlist FX pair: {pair!r}")
+        symbols.append(_conversion_symbol(*currencies))
+    if not all(isinstance(symbol, str) and symbol for symbol in symbols):
+        raise RuntimeError("Watchlist symbols must be non-empty strings")
+    history = []
+    for entry in watchlist.get("history", WARMUP_DEFAULT_HISTORY):
+        period = entry.get("period") if isinstance(entry, dict) else None
+        interval = entry.get("interval", "1d") if isinstance(entry, dict) else None
+        if period not in VALID_PERIODS or interval not in VALID_INTERVALS:
+            raise RuntimeError(f"Invalid watchlist history entry: {entry!r}")
+        history.append((period, interval))
+
+    loads = {}
+    for symbol in dict.fromkeys(symbols):
+        loads[f"info:{symbol}"] = lambda symbol=symbol: _basic_info_payload(symbol)
+        for period, interval in history:
+            loads[f"history:{symbol}:{period}:{interval}"] = (
+                lambda symbol=symbol, period=period, interval=interval: _history_payload(
+                    symbol, period, interval
+                )
+            )
+    return loads
+
+
+def _trading_sessions(path):
+    """Return the built-in exchange sessions, replaced or extended by a calendar file."""
+    sessions = {
+        timezone: TradingSession.parse(timezone, open_time, close_time)
+        for timezone, (open_time, close_time) in DEFAULT_SESSIONS.items()
+    }
+    if path is None:
+        return sessions
+    try:
+        with open(path, encoding="utf-8") as file:
+            calendar = json.load(file)
+        for timezone, entry in calendar.items():
+            sessions[timezone] = TradingSession.parse(
+                timezone, entry["open"], entry["close"], entry.get("holidays", ())
+            )
+    except Exception as error:
+        raise RuntimeError(f"YFINANCE_TRADING_CALENDAR_PATH is invalid: {error!r}") from error
+    return sessions
+
+
+def _conversion_symbol(source, target):
+    # Mirrors the Kotlin backend client, which requests these symbols for conversions.
+    if source.upper() == "USD":
+        return f"{target.upper()}=X"
+    return f"{source.upper()}{target.upper()}=X"
+
+
+_history_cache = ByteBoundedTTLCache(
+    HISTORY_CACHE_MAX_BYTES, HISTORY_CACHE_MAX_ENTRIES, on_evict=_retain_last_known_good
+)
+_metadata_cache = ByteBoundedTTLCache(
+    METADATA_CACHE_MAX_BYTES, METADATA_CACHE_MAX_ENTRIES, on_evict=_retain_last_known_good
+)
 _single_flight = SingleFlight()
 _metrics = AdapterMetrics()
+_adaptive_ttls = AdaptiveTtl(
+    growth_factor=ADAPTIVE_TTL_GROWTH_FACTOR,
+    max_ttl_seconds=ADAPTIVE_TTL_MAX_SECONDS,
+    max_keys=ADAPTIVE_TTL_MAX_KEYS,
+)
+_market_sessions = MarketSessions(
+    _trading_sessions(TRADING_CALENDAR_PATH),
+    settle_seconds=SESSION_CLOSE_SETTLE_SECONDS,
+    holiday_grace_seconds=SESSION_HOLIDAY_GRACE_SECONDS,
+    max_extension_seconds=SESSION_TTL_MAX_EXTENSION_SECONDS,
+    max_symbols=SESSION_MAX_TRACKED_SYMBOLS,
+)
 _loader_bulkhead = LoaderBulkhead(
     BULKHEAD_MAX_ACTIVE_LOADERS,
     acquire_timeout_seconds=BULKHEAD_ACQUIRE_TIMEOUT_MS / 1000,
@@ -154,6 +429,66 @@ _upstream_circuit = CircuitBreaker(
     forced_open_seconds=RATE_LIMIT_RETRY_AFTER_SECONDS,
     on_transition=_metrics.record_circuit_transition,
 )
+_disk_cache = (
+    DiskCache(
+        DISK_CACHE_PATH,
+        schema_version=DISK_CACHE_SCHEMA_VERSION,
+        max_bytes=DISK_CACHE_MAX_BYTES,
+        on_write=_metrics.record_disk_cache_write,
+    )
+    if DISK_CACHE_PATH
+    else None
+)
+if _disk_cache is not None:
+    atexit.register(_disk_cache.close)
+_info_batcher = (
+    MicroBatcher(
+        INFO_BATCH_WINDOW_MS / 1000,
+        BATCH_MAX_SYMBOLS,
+        lambda loaders: _load_micro_batch(loaders),
+        on_dispatch=_metrics.record_info_batch,
+    )
+    if INFO_BATCH_WINDOW_MS
+    else None
+)
+_history_archive = (
+    HistoryArchive(
+        HISTORY_ARCHIVE_PATH,
+        schema_version=HISTORY_ARCHIVE_SCHEMA_VERSION,
+        max_bytes=HISTORY_ARCHIVE_MAX_BYTES,
+    )
+    if HISTORY_ARCHIVE_PATH
+    else None
+)
+_revalidating_keys = set()
+_revalidating_lock = threading.Lock()
+_refresh_ahead = (
+    RefreshAheadScheduler(
+        lambda key, loader: _refresh_ahead_load(key, loader),
+        lambda key: _cache_for_key(key).expiry(key),
+        budget_per_minute=REFRESH_AHEAD_BUDGET_PER_MINUTE,
+        min_hits=REFRESH_AHEAD_MIN_HITS,
+        lead_fraction=REFRESH_AHEAD_LEAD_FRACTION,
+        jitter_fraction=REFRESH_AHEAD_JITTER_FRACTION,
+        min_lead_seconds=REFRESH_AHEAD_MIN_LEAD_SECONDS,
+        half_life_seconds=REFRESH_AHEAD_HALF_LIFE_SECONDS,
+        max_keys=REFRESH_AHEAD_MAX_TRACKED_KEYS,
+        on_outcome=lambda key, outcome: _metrics.record_refresh_ahead(_cache_name(key), outcome),
+    )
+    if REFRESH_AHEAD_BUDGET_PER_MINUTE
+    else None
+)
+_warmup = (
+    CacheWarmup(
+        _watchlist_loads(WARMUP_WATCHLIST_PATH),
+        max_concurrency=WARMUP_CONCURRENCY,
+        per_minute=WARMUP_LOADS_PER_MINUTE,
+        on_load=lambda key, outcome: _metrics.record_warmup_load(_cache_name(key), outcome),
+        on_complete=_metrics.record_warmup_duration,
+    )
+    if WARMUP_WATCHLIST_PATH
+    else None
+)
 
 
 class ApiError(Exception):
@@ -234,42 +569,172 @@ def _has_symbol_identity(info):
     return isinstance(info, dict) and any(info.get(field) for field in SYMBOL_IDENTITY_FIELDS)
 
 
-def _empty_history_for_known_symbol(ticker, symbol):
-    try:
-        info = ticker.info
-    except Exception as error:
-        _raise_classified_upstream_error(error, symbol)
-    if not _has_symbol_identity(info):
+def _empty_history_for_known_symbol(ticker, symbol, cache_key):
+    """Return a briefly cached empty history, or raise if Yahoo does not know the symbol."""
+    info_key = f"info:{symbol}"
+    identity = _cache_get(info_key)
+    if identity is None:
+        try:
+            info = ticker.info
+        except Exception as error:
+            _raise_classified_upstream_error(error, symbol)
+        identity = _basic_info_from(symbol, info, info_key)
+    if identity.value is None:
         raise SymbolNotFoundError(symbol)
-    return []
+    payload = _encoded_payload(cache_key, PriceHistory.empty(), [])
+    _cache_negative(cache_key, payload)
+    return payload
+
+
+def _is_negative(payload):
+    """Return whether a payload records an unknown symbol or a known symbol without prices."""
+    value = payload.value
+    return value is None or (isinstance(value, PriceHistory) and not value)
+
+
+def _cache_negative(key, payload):
+    if NEGATIVE_CACHE_SECONDS > 0:
+        _cache_set(key, payload, NEGATIVE_CACHE_SECONDS)
+
+
+def _known_missing(symbol):
+    """Return whether a cached info entry says Yahoo does not know `symbol`."""
+    try:
+        identity = _metadata_cache.get(f"info:{symbol}")
+    except Exception:
+        return False
+    if isinstance(identity, EncodedPayload) and identity.value is None:
+        _metrics.record_negative_cache_hit("metadata")
+        return True
+    return False
 
 
 def _cache_get(key):
     cache = _cache_for_key(key)
-    cache_name = "history" if key.startswith("history:") else "metadata"
+    cache_name = _cache_name(key)
     try:
         value = cache.get(key)
     except Exception:
         _metrics.record_cache_lookup(cache_name, "error")
         logger.warning("Cache read failed for %s; treating it as a miss", key, exc_info=True)
-        return None
-    _metrics.record_cache_lookup(cache_name, "hit" if value is not None else "miss")
+        value = None
+    else:
+        _metrics.record_cache_lookup(cache_name, "hit" if value is not None else "miss")
+    if value is None:
+        value = _disk_cache_get(key)
+    if isinstance(value, EncodedPayload) and _is_negative(value):
+        _metrics.record_negative_cache_hit(cache_name)
+    if value is not None and cache_name == "history":
+        _metrics.record_history_cache_hit("exact")
     return value
 
 
-def _cache_set(key, value, ttl):
+def _cache_set(key, value, ttl, stale_seconds=0):
+    stale_seconds = max(stale_seconds, _stale_while_revalidate_seconds(key))
+    stored = _memory_cache_set(key, value, ttl, stale_seconds)
+    if _disk_cache is not None and ttl > 0:
+        try:
+            _disk_cache.put(key, value, ttl, stale_seconds)
+        except Exception:
+            _metrics.record_disk_cache_write("error")
+            logger.warning("Disk cache write failed for %s", key, exc_info=True)
+    return stored
+
+
+def _memory_cache_set(key, value, ttl, stale_seconds=0):
     try:
-        return _cache_for_key(key).set(key, value, ttl)
+        return _cache_for_key(key).set(key, value, ttl, stale_seconds)
     except Exception:
         logger.warning("Cache write failed for %s; returning uncached data", key, exc_info=True)
         return False
 
 
+def _cache_get_stale(key):
+    try:
+        value = _cache_for_key(key).get_stale(key)
+    except Exception:
+        logger.warning("Stale cache read failed for %s; reloading in full", key, exc_info=True)
+        value = None
+    return value if value is not None else _disk_cache_get(key, allow_stale=True)
+
+
+def _disk_cache_get(key, allow_stale=False):
+    if _disk_cache is None:
+        return None
+    try:
+        entry = _disk_cache.get(key)
+    except Exception:
+        _metrics.record_disk_cache_lookup("error")
+        logger.warning("Disk cache read failed for %s; treating it as a miss", key, exc_info=True)
+        return None
+    if entry is None or (entry.expires_in <= 0 and not allow_stale):
+        _metrics.record_disk_cache_lookup("miss")
+        return None
+    _metrics.record_disk_cache_lookup("hit")
+    if entry.expires_in > 0:
+        # Promote with the remaining lifetimes so both tiers expire together.
+        _memory_cache_set(key, entry.value, entry.expires_in, entry.retained_for - entry.expires_in)
+    return entry.value
+
+
+def _loaded_ttl(key, payload, floor):
+    """Return how long a payload just loaded from Yahoo stays fresh from now."""
+    ttl, content = _adaptive_ttls.ttl_for(key, payload.etag, floor)
+    _metrics.record_adaptive_ttl(_cache_name(key), content)
+    if ttl > floor:
+        ttl = _grown_ttl_limit(key, payload.fetched_at, floor, ttl)
+    _record_session_ttl(key, ttl, payload.fetched_at)
+    return _fresh_seconds(key, ttl, payload.fetched_at)
+
+
+def _grown_ttl_limit(key, fetched_at, floor, ttl):
+    """Keep a grown TTL from reaching into the next session, where prices move again."""
+    parts = key.split(":")
+    if parts[0] == "history" and parts[3] in INTRADAY_INTERVALS:
+        return floor
+    decision, next_open = _market_sessions.session_state(parts[1], fetched_at)
+    if decision == "unknown":
+        return floor
+    if next_open is None:
+        return ttl
+    return max(floor, min(ttl, next_open - fetched_at))
+
+
+def _fresh_seconds(key, ttl, fetched_at):
+    """Return how long from now data fetched at `fetched_at` stays fresh for its market."""
+    return _fresh_until(key, ttl, fetched_at)[0] - time.time()
+
+
+def _record_session_ttl(key, ttl, fetched_at):
+    # Only called for TTLs assigned at cache insert, not for freshness checks of sources.
+    expires_at, decision = _fresh_until(key, ttl, fetched_at)
+    if decision is not None:
+        _metrics.record_session_ttl(_cache_name(key), decision, max(0.0, expires_at - fetched_at))
+
+
+def _fresh_until(key, ttl, fetched_at):
+    if key.startswith("info:"):
+        # `previous_close` depends on the UTC date of the load, so info is not extended
+        # while the market is closed and never outlives that date.
+        next_utc_midnight = (fetched_at // 86400 + 1) * 86400
+        return min(fetched_at + ttl, next_utc_midnight), None
+    return _market_sessions.fresh_until(key.split(":")[1], fetched_at, ttl)
+
+
 def _cache_for_key(key):
     return _history_cache if key.startswith("history:") else _metadata_cache
 
 
-def _coalesced_cached_load(key, loader):
+def _cache_name(key):
+    return "history" if key.startswith("history:") else "metadata"
+
+
+def _stale_while_revalidate_seconds(key):
+    return STALE_WHILE_REVALIDATE_SECONDS.get(key.partition(":")[0], 0)
+
+
+def _coalesced_cached_load(key, loader, derive=None):
+    _record_access(key, loader)
     cached = _cache_get(key)
     if cached is not None:
         return cached
@@ -278,6 +743,12 @@ def _coalesced_cached_load(key, loader):
         cached_after_join = _cache_get(key)
         if cached_after_join is not None:
             return cached_after_join
+        if derive is not None:
+            derived = derive()
+            if derived is not None:
+                return derived
+        if _info_batcher is not None and key.startswith("info:"):
+            return _info_batcher.submit(key, loader)
         try:
             return _loader_bulkhead.call(
                 lambda: _upstream_circuit.call(loader, _classify_circuit_error)
@@ -289,20 +760,174 @@ def _coalesced_cached_load(key, loader):
             _metrics.record_circuit_rejection()
             raise UpstreamCircuitOpenError(error.retry_after_seconds) from error
 
-    return _single_flight.call(key, load_after_second_cache_check)
+    stale = _stale_while_revalidating(key, load_after_second_cache_check)
+    if stale is not None:
+        return stale
+    try:
+        return _single_flight.call(key, load_after_second_cache_check)
+    except (UpstreamCircuitOpenError, UpstreamRateLimitError, UpstreamDataError) as error:
+        fallback = _stale_if_error(key, error)
+        if fallback is None:
+            raise
+        return fallback
+
+
+def _stale_if_error(key, error):
+    """Return the last known good payload for `key` marked with why it is served stale."""
+    if isinstance(error, UpstreamCircuitOpenError):
+        reason = "circuit_open"
+    elif isinstance(error, UpstreamRateLimitError):
+        reason = "rate_limited"
+    else:
+        reason = "upstream_error"
+    # Retained and disk entries may be far older than the last known good tier allows.
+    payload = _cache_get_stale(key)
+    if not _servable_as_last_known_good(payload):
+        try:
+            payload = _last_known_good.get_stale(key)
+        except Exception:
+            payload = None
+            logger.warning("Last known good read failed for %s", key, exc_info=True)
+    if not _servable_as_last_known_good(payload):
+        return None
+    logger.info("Serving last known good %s after %s", key, reason)
+    _metrics.record_stale_response(_cache_name(key), reason)
+    return replace(payload, stale_reason=reason)
+
+
+def _stale_while_revalidating(key, refresh):
+    """Serve an entry expired within its class's window and refresh it once in the background."""
+    window = _stale_while_revalidate_seconds(key)
+    if not window:
+        return None
+    try:
+        retained = _cache_for_key(key).get_expired_for(key)
+    except Exception:
+        logger.warning("Stale cache read failed for %s; loading it in the foreground", key, exc_info=True)
+        return None
+    if retained is None:
+        return None
+    payload, expired_for = retained
+    if expired_for > window:
+        return None
+    if expired_for <= 0:
+        return payload
+    with _revalidating_lock:
+        start = key not in _revalidating_keys
+        _revalidating_keys.add(key)
+    if start:
+        threading.Thread(
+            target=_revalidate, args=(key, refresh), name=f"revalidate {key}", daemon=True
+        ).start()
+    _metrics.record_stale_response(_cache_name(key), "revalidating")
+    return replace(payload, stale_reason="revalidating")
+
+
+def _revalidate(key, refresh):
+    try:
+        # Joining the key's flight keeps this to one load alongside any foreground miss,
+        # and the load itself still goes through the bulkhead and the circuit breaker.
+        _single_flight.call(key, refresh)
+    except Exception:
+        _metrics.record_stale_refresh(_cache_name(key), "error")
+        logger.warning("Background refresh failed for %s", key, exc_info=True)
+    else:
+        _metrics.record_stale_refresh(_cache_name(key), "refreshed")
+    finally:
+        with _revalidating_lock:
+            _revalidating_keys.discard(key)
+
+
+def _record_access(key, loader):
+    if _refresh_ahead is not None and key.startswith(REFRESH_AHEAD_KEY_PREFIXES):
+        _refresh_ahead.record(key, loader)
+
+
+def _refresh_ahead_load(key, loader):
+    """Reload a hot entry before it expires, or return False to defer while Yahoo is strained."""
+    if _upstream_circuit.state is not CircuitState.CLOSED:
+        return False
+
+    def load():
+        try:
+            return _upstream_circuit.call(loader, _classify_circuit_error)
+        except CircuitOpenError as error:
+            raise UpstreamCircuitOpenError(error.retry_after_seconds) from error
+
+    try:
+        # The permit is held outside the flight, so a joining reader never sees a rejection.
+        _loader_bulkhead.call_spare(
+            lambda: _single_flight.call(key, load), REFRESH_AHEAD_RESERVED_LOADERS
+        )
+    except BulkheadSaturatedError:
+        return False
+    return True
 
 
 @dataclass(frozen=True)
-class HistoricalPrice:
-    date: str
-    open: float
-    close: float
-    low: float
-    high: float
-    volume: int
-    dividend: float
-    timestamp: int | None = None
-    splitRatio: float | None = None
+class EncodedPayload:
+    """A parsed cache value and the response bodies encoded once when it was loaded."""
+
+    value: object
+    body: bytes | memoryview
+    etag: str
+    fetched_at: float
+    gzip_body: bytes | memoryview | None = None
+    # Set only on a copy served after its TTL: while a background refresh runs, or because
+    # the upstream load failed or was rejected.
+    stale_reason: str | None = None
+
+    def __copy__(self):
+        # The bodies are immutable bytes or read-only archive views, so only the parsed
+        # value needs a defensive copy.
+        return replace(self, value=copy.copy(self.value))
+
+
+def _encoded_payload(cache_key, value, json_ready, fetched_at=None, compress=True):
+    # Encode through the app provider so cached bodies match `jsonify` byte for byte.
+    body = app.json.response(json_ready).get_data()
+    return EncodedPayload(
+        value=value,
+        body=body,
+        etag=hashlib.blake2b(body, digest_size=16).hexdigest(),
+        fetched_at=time.time() if fetched_at is None else fetched_at,
+        gzip_body=_gzip_variant(cache_key, body) if compress else None,
+    )
+
+
+def _gzip_variant(cache_key, body):
+    if len(body) < GZIP_MIN_BODY_BYTES:
+        return None
+    started = time.thread_time()
+    # A fixed mtime keeps the variant deterministic for identical bodies.
+    compressed = gzip.compress(body, compresslevel=GZIP_COMPRESS_LEVEL, mtime=0)
+    _metrics.record_compression(
+        _cache_name(cache_key), len(body), len(compressed), time.thread_time() - started
+    )
+    return compressed if len(compressed) < len(body) else None
+
+
+def _payload_response(payload, max_age):
+    if payload.gzip_body is not None and request.accept_encodings["gzip"] > 0:
+        response = app.response_class(bytes(payload.gzip_body), mimetype=app.json.mimetype)
+        response.headers["Content-Encoding"] = "gzip"
+        # Strong validators identify one representation, so each encoding has its own tag.
+        response.set_etag(f"{payload.etag}-gzip")
+        _metrics.record_response_encoding("gzip")
+    else:
+        response = app.response_class(bytes(payload.body), mimetype=app.json.mimetype)
+        response.set_etag(payload.etag)
+        _metrics.record_response_encoding("identity")
+    response.vary.add("Accept-Encoding")
+    response.last_modified = payload.fetched_at
+    if payload.stale_reason is not None:
+        response.headers["X-Data-Stale"] = "true"
+        response.headers["X-Data-Stale-Reason"] = payload.stale_reason
+        response.headers["Age"] = str(int(max(0.0, time.time() - payload.fetched_at)))
+        max_age = 0
+    response.headers["Cache-Control"] = f"public, max-age={max_age}"
+    # The body is already encoded, so a matching validator only swaps in a 304 status.
+    return response.make_conditional(request)
 
 
 @dataclass(frozen=True)
@@ -338,13 +963,432 @@ class BasicInfo:
     market_timestamp: int | None
 
 
+@dataclass(frozen=True)
+class CorporateActions:
+    """A symbol's dividends summed and splits multiplied per calendar date of the event."""
+
+    dividend_days: np.ndarray
+    dividends: np.ndarray
+    split_days: np.ndarray
+    split_ratios: np.ndarray
+
+    @classmethod
+    def empty(cls):
+        return cls(*(np.empty(0) for _ in range(4)))
+
+
 def get_history(symbol, period, interval="1d"):
+    return _history_payload(symbol, period, interval).value
+
+
+def _history_payload(symbol, period, interval):
+    key = f"history:{symbol}:{period}:{interval}"
+    return _coalesced_cached_load(
+        key,
+        lambda: _load_history_for_interval(symbol, period, interval, key),
+        derive=lambda: _history_without_upstream(symbol, period, interval, key),
+    )
+
+
+def _history_range_payload(symbol, start, end=None, compress=False):
+    """Return the daily bars from `start` to `end` inclusive and the period they came from."""
+    periods = _covering_history_periods(start)
+    for period in periods:
+        key = f"history:{symbol}:{period}:1d"
+        source = _cached_or_in_flight(key)
+        if source is not None:
+            _metrics.record_cache_lookup("history", "hit")
+            _metrics.record_history_cache_hit("range")
+        else:
+            source = _archived_history_payload(period, "1d", key)
+        if source is not None:
+            _record_access(key, lambda: _load_history_for_interval(symbol, period, "1d", key))
+            break
+    else:
+        period = periods[0]
+        source = _history_payload(symbol, period, "1d")
+
+    history = source.value
+    first = int(np.searchsorted(history.epoch_days, _epoch_day(pd.Timestamp(start))))
+    last = len(history)
+    if end is not None:
+        last = int(np.searchsorted(history.epoch_days, _epoch_day(pd.Timestamp(end)), side="right"))
+    if first == 0 and last == len(history):
+        return source, period
+    history = history[first:last]
+    range_key = f"history:{symbol}:{start.isoformat()}:{end.isoformat() if end else ''}:1d"
+    payload = _encoded_payload(range_key, history, history.records(), source.fetched_at, compress)
+    return replace(payload, stale_reason=source.stale_reason), period
+
+
+def _covering_history_periods(start):
+    # The exchange date may be a day ahead of UTC, so a period must reach one day further.
+    earliest_needed = pd.Timestamp(start) - pd.Timedelta(days=1)
+    today = _exchange_today(None)
+    return [
+        period
+        for period in DERIVABLE_HISTORY_PERIODS
+        if period == "max"
+        or (period != "ytd" and today - HISTORY_PERIOD_OFFSETS[period] <= earliest_needed)
+    ]
+
+
+def _history_without_upstream(symbol, period, interval, cache_key):
+    return (
+        _archived_history_payload(period, interval, cache_key)
+        or _derived_history_payload(symbol, period, interval, cache_key)
+        or _resampled_history_payload(symbol, period, interval, cache_key)
+        or _resampled_intraday_payload(symbol, period, interval, cache_key)
+    )
+
+
+def _load_history_for_interval(symbol, period, interval, cache_key):
+    if _is_resampled_intraday(period, interval):
+        source = _load_source_history(symbol, period, INTRADAY_SOURCE_INTERVAL)
+        payload = _intraday_payload(symbol, cache_key, source, interval)
+        if payload.value:
+            _cache_set(cache_key, payload, _loaded_ttl(cache_key, payload, INTRADAY_CACHE_SECONDS))
+        return payload
+    if interval not in RESAMPLED_INTERVALS or period not in RESAMPLE_SOURCE_PERIODS:
+        return _load_history(symbol, period, interval, cache_key)
+    source_period = RESAMPLE_SOURCE_PERIODS[period]
+    source = _load_source_history(symbol, source_period, "1d")
+    payload = _resampled_payload(cache_key, source, period, interval)
+    if payload.value:
+        _cache_set(cache_key, payload, _loaded_ttl(cache_key, payload, HISTORY_CACHE_SECONDS[period]))
+    return payload
+
+
+def _load_source_history(symbol, period, interval):
+    """Return the cached history a resampled interval is built from, loading it once."""
     key = f"history:{symbol}:{period}:{interval}"
-    return _coalesced_cached_load(key, lambda: _load_history(symbol, period, interval, key))
+    return _load_within_permit(key, lambda: _load_history(symbol, period, interval, key))
+
+
+def _history_batch_outcomes(symbols, period, interval):
+    """Return each symbol's payload or error, loading every miss under one permit."""
+    keys = {symbol: f"history:{symbol}:{period}:{interval}" for symbol in symbols}
+    return _batch_outcomes(
+        keys,
+        lambda symbol, key: _history_without_upstream(symbol, period, interval, key),
+        lambda symbol, key: _load_history_for_interval(symbol, period, interval, key),
+    )
+
+
+def _batch_outcomes(keys, derive, load):
+    outcomes = {}
+    for symbol, key in keys.items():
+        _record_access(key, lambda symbol=symbol, key=key: load(symbol, key))
+        payload = _cache_get(key) or derive(symbol, key)
+        if payload is not None:
+            outcomes[key] = payload
+            _metrics.record_batch_symbol(_cache_name(key), "cache")
+    loaders = {
+        key: (lambda symbol=symbol, key=key: load(symbol, key))
+        for symbol, key in keys.items()
+        if key not in outcomes
+    }
+    if loaders:
+        outcomes.update(
+            _single_flight.call_many(
+                loaders, lambda led: _load_batch({key: loaders[key] for key in led})
+            )
+        )
+    return {symbol: outcomes[key] for symbol, key in keys.items()}
+
+
+def _load_batch(loaders, count_symbols=True):
+    outcomes = {}
+    pending = {}
+    for key, loader in loaders.items():
+        cached = _cache_get(key)
+        if cached is not None:
+            outcomes[key] = cached
+        else:
+            pending[key] = loader
+    if not pending:
+        return outcomes
+    try:
+        outcomes.update(_loader_bulkhead.call(lambda: _load_sequence(pending, count_symbols)))
+    except BulkheadSaturatedError as error:
+        _metrics.record_bulkhead_rejection()
+        raise BackendBusyError() from error
+    return outcomes
+
+
+def _load_micro_batch(loaders):
+    # Micro-batches are counted by their own size and wait histograms, not as batch symbols.
+    return _load_batch(loaders, count_symbols=False)
+
+
+def _load_sequence(loaders, count_symbols):
+    # One permit covers the whole batch, so keys load one after another and each load
+    # still passes through the circuit breaker with its usual classification.
+    outcomes = {}
+    for key, loader in loaders.items():
+        if count_symbols:
+            _metrics.record_batch_symbol(_cache_name(key), "upstream")
+        try:
+            outcomes[key] = _upstream_circuit.call(loader, _classify_circuit_error)
+        except CircuitOpenError as error:
+            _metrics.record_circuit_rejection()
+            outcomes[key] = UpstreamCircuitOpenError(error.retry_after_seconds)
+        except Exception as error:
+            outcomes[key] = error
+    return outcomes
+
+
+def _archived_history_payload(period, interval, cache_key):
+    """Serve a fresh archived long daily history straight from its shared file mapping."""
+    if interval != "1d" or period not in ARCHIVED_HISTORY_PERIODS:
+        return None
+    archived = _read_history_archive(cache_key)
+    if archived is None:
+        return None
+    remaining = _fresh_seconds(cache_key, HISTORY_CACHE_SECONDS[period], archived.fetched_at)
+    if remaining <= 0:
+        _metrics.record_history_archive_lookup("expired")
+        return None
+    _metrics.record_history_archive_lookup("hit")
+    payload = _archived_payload(archived)
+    # Memory only: the views cannot be pickled, and the archive already outlives restarts.
+    _memory_cache_set(cache_key, payload, remaining, HISTORY_STALE_RETENTION_SECONDS)
+    _record_session_ttl(cache_key, HISTORY_CACHE_SECONDS[period], archived.fetched_at)
+    _metrics.record_history_cache_hit("archive")
+    return payload
+
+
+def _read_history_archive(cache_key):
+    if _history_archive is None:
+        return None
+    try:
+        archived = _history_archive.read(cache_key)
+    except Exception:
+        _metrics.record_history_archive_lookup("error")
+        logger.warning("History archive read failed for %s; treating it as a miss", cache_key, exc_info=True)
+        return None
+    if archived is None:
+        _metrics.record_history_archive_lookup("miss")
+    return archived
+
+
+def _archived_payload(archived):
+    return EncodedPayload(
+        value=archived.history,
+        body=archived.body,
+        etag=archived.etag,
+        fetched_at=archived.fetched_at,
+        gzip_body=archived.gzip_body,
+    )
+
+
+def _write_history_archive(period, interval, cache_key, payload):
+    if _history_archive is None or interval != "1d" or period not in ARCHIVED_HISTORY_PERIODS:
+        return
+    try:
+        _history_archive.write(
+            cache_key,
+            payload.value,
+            payload.body,
+            payload.gzip_body,
+            payload.etag,
+            payload.fetched_at,
+        )
+    except Exception:
+        _metrics.record_history_archive_write("error")
+        logger.warning("History archive write failed for %s", cache_key, exc_info=True)
+    else:
+        _metrics.record_history_archive_write("written")
+
+
+def _derived_history_payload(symbol, period, interval, cache_key):
+    """Slice a fresh-enough cached or in-flight longer daily period instead of fetching."""
+    if interval != "1d" or period not in DERIVABLE_HISTORY_PERIODS:
+        return None
+    ttl = HISTORY_CACHE_SECONDS[period]
+    longer_periods = DERIVABLE_HISTORY_PERIODS[DERIVABLE_HISTORY_PERIODS.index(period) + 1 :]
+    for source_period in longer_periods:
+        if source_period == "ytd":
+            continue
+        source_key = f"history:{symbol}:{source_period}:{interval}"
+        source = _cached_or_in_flight(source_key) or _archived_history_payload(
+            source_period, interval, source_key
+        )
+        if source is None:
+            continue
+        # The slice is only as fresh as its source, so it inherits the source's fetch time.
+        remaining = _fresh_seconds(cache_key, ttl, source.fetched_at)
+        if remaining <= 0:
+            continue
+        history = _slice_history_period(source.value, period)
+        if not history:
+            continue
+        payload = _encoded_payload(cache_key, history, history.records(), source.fetched_at)
+        _cache_set(cache_key, payload, remaining)
+        _record_session_ttl(cache_key, ttl, source.fetched_at)
+        _metrics.record_history_cache_hit("derived")
+        return payload
+    return None
+
+
+def _resampled_history_payload(symbol, period, interval, cache_key):
+    """Aggregate a fresh-enough cached or in-flight daily source instead of fetching."""
+    if interval not in RESAMPLED_INTERVALS or period not in RESAMPLE_SOURCE_PERIODS:
+        return None
+    ttl = HISTORY_CACHE_SECONDS[period]
+    first_source = DERIVABLE_HISTORY_PERIODS.index(RESAMPLE_SOURCE_PERIODS[period])
+    for source_period in DERIVABLE_HISTORY_PERIODS[first_source:]:
+        if source_period == "ytd":
+            continue
+        source_key = f"history:{symbol}:{source_period}:1d"
+        source = _cached_or_in_flight(source_key) or _archived_history_payload(
+            source_period, "1d", source_key
+        )
+        if source is None:
+            continue
+        remaining = _fresh_seconds(cache_key, ttl, source.fetched_at)
+        if remaining <= 0:
+            continue
+        payload = _resampled_payload(cache_key, source, period, interval)
+        if not payload.value:
+            continue
+        _cache_set(cache_key, payload, remaining)
+        _record_session_ttl(cache_key, ttl, source.fetched_at)
+        _metrics.record_history_cache_hit("resampled")
+        return payload
+    return None
+
+
+def _resampled_payload(cache_key, source, period, interval):
+    history = _resample_history(source.value, period, interval)
+    return _encoded_payload(cache_key, history, history.records(), source.fetched_at)
+
+
+def _resample_history(daily, period, interval):
+    """Rebuild the bars yfinance resamples from repaired daily data for `1wk` and `1mo`."""
+    if period != "max":
+        today = _exchange_today(daily.timezone)
+        if period == "ytd":
+            start = today.replace(month=1, day=1)
+        else:
+            start = today - HISTORY_PERIOD_OFFSETS[period] - RESAMPLE_START_PADDING
+        daily = daily[int(np.searchsorted(daily.epoch_days, _epoch_day(start))) :]
+    if not daily:
+        return daily
+    days = daily.epoch_days.astype(np.int64)
+    if interval == "1mo":
+        months = days.astype("datetime64[D]").astype("datetime64[M]")
+        buckets = months.astype("datetime64[D]").astype(np.int64)
+        labels = np.arange(months[0], months[-1] + np.timedelta64(1, "M"))
+        labels = labels.astype("datetime64[D]").astype(np.int64)
+        return daily.aggregate(buckets, labels)
+    if period == "ytd":
+        # yfinance counts year-to-date weeks in seven-day blocks from 1 January.
+        origin = _epoch_day(start)
+        buckets = origin + (days - origin) // 7 * 7
+    else:
+        # Epoch day 0 was a Thursday, so adding three aligns the weeks on Monday.
+        buckets = days - (days + 3) % 7
+    return daily.aggregate(buckets, np.arange(buckets[0], buckets[-1] + 1, 7))
+
+
+def _is_resampled_intraday(period, interval):
+    return interval in RESAMPLED_INTRADAY_SECONDS and period in RESAMPLED_INTRADAY_PERIODS
+
+
+def _resampled_intraday_payload(symbol, period, interval, cache_key):
+    """Aggregate a fresh cached or in-flight `1m` series of the same period instead of fetching."""
+    if not _is_resampled_intraday(period, interval):
+        return None
+    source = _cached_or_in_flight(f"history:{symbol}:{period}:{INTRADAY_SOURCE_INTERVAL}")
+    if source is None:
+        return None
+    remaining = _fresh_seconds(cache_key, INTRADAY_CACHE_SECONDS, source.fetched_at)
+    if remaining <= 0:
+        return None
+    payload = _intraday_payload(symbol, cache_key, source, interval)
+    if not payload.value:
+        return None
+    _cache_set(cache_key, payload, remaining)
+    _record_session_ttl(cache_key, INTRADAY_CACHE_SECONDS, source.fetched_at)
+    _metrics.record_history_cache_hit("resampled")
+    return payload
+
+
+def _intraday_payload(symbol, cache_key, source, interval):
+    session = _market_sessions.regular_session(symbol)
+    history = _resample_intraday(source.value, RESAMPLED_INTRADAY_SECONDS[interval], session)
+    return _encoded_payload(cache_key, history, history.records(), source.fetched_at)
+
+
+def _resample_intraday(minutes, width, session=None):
+    """Aggregate minute bars into `width`-second bars anchored at the session open."""
+    if not minutes:
+        return minutes
+    local = pd.to_datetime(minutes.timestamp, unit="s", utc=True).tz_convert(minutes.timezone or "UTC")
+    time_of_day = (local - local.normalize()).total_seconds().to_numpy(dtype=np.int64)
+    if session is not None and session.timezone.key == minutes.timezone:
+        opens = session.open
+        session_open = opens.hour * 3600 + opens.minute * 60 + opens.second
+    else:
+        # Without a known session, guess the open from the earliest first bar of any day.
+        first_bars = np.flatnonzero(np.r_[True, minutes.epoch_days[1:] != minutes.epoch_days[:-1]])
+        session_open = int(time_of_day[first_bars].min())
+    bucket_offset = session_open + (time_of_day - session_open) // width * width
+    return minutes.aggregate(minutes.timestamp - (time_of_day - bucket_offset))
+
+
+def _cached_or_in_flight(key):
+    try:
+        cached = _cache_for_key(key).get(key)
+    except Exception:
+        logger.warning("Cache read failed for %s; skipping it as a slice source", key, exc_info=True)
+        cached = None
+    if cached is not None:
+        return cached
+    try:
+        return _single_flight.join(key)
+    except Exception:
+        # The source load failed; the caller falls back to its own upstream fetch.
+        return None
+
+
+def _slice_history_period(history, period):
+    today = _exchange_today(history.timezone)
+    if period == "ytd":
+        start = today.replace(month=1, day=1)
+    else:
+        start = today - HISTORY_PERIOD_OFFSETS[period]
+    # A cached slice must not keep the longer source's columns alive after it is evicted.
+    return history[int(np.searchsorted(history.epoch_days, _epoch_day(start))) :].detached()
+
+
+def _exchange_today(timezone):
+    return pd.Timestamp.now(timezone or "UTC").normalize().tz_localize(None)
+
+
+def _epoch_day(timestamp):
+    return (timestamp - pd.Timestamp("1970-01-01")).days
 
 
 def _load_history(symbol, period, interval, cache_key):
+    if _known_missing(symbol):
+        raise SymbolNotFoundError(symbol)
     ticker = yf.Ticker(symbol)
+    incremental = interval == "1d" and period in INCREMENTAL_HISTORY_PERIODS
+    stale_seconds = HISTORY_STALE_RETENTION_SECONDS if incremental else 0
+    if incremental:
+        stale = _cache_get_stale(cache_key)
+        if stale is None and period in ARCHIVED_HISTORY_PERIODS:
+            archived = _read_history_archive(cache_key)
+            stale = None if archived is None else _archived_payload(archived)
+        refreshed = None if stale is None else _refresh_history_tail(ticker, symbol, period, stale.value)
+        if refreshed is not None:
+            payload = _encoded_payload(cache_key, refreshed, refreshed.records())
+            ttl = _loaded_ttl(cache_key, payload, HISTORY_CACHE_SECONDS[period])
+            _cache_set(cache_key, payload, ttl, stale_seconds)
+            _write_history_archive(period, interval, cache_key, payload)
+            return payload
     try:
         # Yahoo normally returns OHLC, volume and dividends already expressed on the latest
         # split basis, even when dividend auto-adjustment is disabled. `repair=True` makes
@@ -353,69 +1397,252 @@ def _load_history(symbol, period, interval, cache_key):
         # GBP/ZAR/ILS. Downstream consumers must therefore scale only info-derived spot fields.
         # Keep `auto_adjust=False`: enabling it would additionally adjust for dividends and
         # would make the explicit dividend stream unsuitable for yield/total-return logic.
-        # With repaired weekly/monthly candles yfinance resamples daily data and tries to
-        # parse the period before its special `max` handling. An explicit start preserves
-        # maximum-history semantics without passing the unparseable `max` duration.
-        history_range = (
-            {"start": MAX_HISTORY_START}
-            if period == "max" and interval in {"1wk", "1mo"}
-            else {"period": period}
-        )
         history = ticker.history(
+            period=period,
             interval=interval,
             auto_adjust=False,
             actions=True,
             repair=True,
-            **history_range,
         )
     except YFPricesMissingError:
         logger.info("No prices returned for %s (%s); verifying symbol identity", symbol, period)
-        return _empty_history_for_known_symbol(ticker, symbol)
+        return _empty_history_for_known_symbol(ticker, symbol, cache_key)
     except Exception as error:
         logger.warning("Failed to fetch history for %s (%s)", symbol, period, exc_info=True)
         _raise_classified_upstream_error(error, symbol)
+    intraday = interval in INTRADAY_INTERVALS
+    actions = _fallback_actions(symbol, ticker, history)
+    result = _normalize_history(symbol, history, actions, intraday)
+    payload = _encoded_payload(cache_key, result, result.records())
+
+    if result:
+        ttl = INTRADAY_CACHE_SECONDS if intraday else HISTORY_CACHE_SECONDS.get(period, 60)
+        _cache_set(cache_key, payload, _loaded_ttl(cache_key, payload, ttl), stale_seconds)
+        _write_history_archive(period, interval, cache_key, payload)
+    return payload
+
+
+def _fallback_actions(symbol, ticker, history):
+    """Return cached corporate actions for a history frame, or None if its own are complete."""
+    if all(
+        column in history.columns and not np.isnan(_finite_column(history, column)).any()
+        for column in ("Dividends", "Stock Splits")
+    ):
+        return None
+    key = f"actions:{symbol}"
+    return _load_within_permit(key, lambda: _load_corporate_actions(symbol, ticker, key))
+
+
+def _load_within_permit(key, loader):
+    """Return the cached payload for `key` or load it once, for a caller holding a permit."""
+    cached = _cache_get(key)
+    if cached is not None:
+        return cached
+    # Taking another permit could deadlock a saturated bulkhead, so concurrent callers
+    # only coalesce on the key's flight.
+    return _single_flight.call(key, lambda: _cache_get(key) or loader())
+
+
+def _load_corporate_actions(symbol, ticker, cache_key):
     try:
+        # Both properties read yfinance's one cached max-period chart call.
         dividends = ticker.dividends
+        splits = ticker.splits
     except YFRateLimitError as error:
-        logger.warning("Rate limited while fetching dividends for %s", symbol)
+        logger.warning("Rate limited while fetching corporate actions for %s", symbol)
         _raise_classified_upstream_error(error, symbol)
     except Exception:
-        logger.warning("Failed to fetch dividend fallback for %s", symbol, exc_info=True)
-        dividends = pd.Series(dtype=float)
+        logger.warning("Failed to fetch corporate actions for %s", symbol, exc_info=True)
+        return CorporateActions.empty()
+    actions = CorporateActions(
+        *_events_by_day(dividends, np.add),
+        *_events_by_day(splits, np.multiply, positive=True),
+    )
+    _cache_set(cache_key, actions, CORPORATE_ACTIONS_CACHE_SECONDS)
+    return actions
 
-    intraday = interval in INTRADAY_INTERVALS
-    dividends_by_date = _dividends_by_date(dividends)
-
-    result = []
-    for index, row in history.iterrows():
-        date = index.strftime("%Y-%m-%d")
-        open_price = _finite_float(row.get("Open"))
-        close_price = _finite_float(row.get("Close"))
-        low_price = _finite_float(row.get("Low"))
-        high_price = _finite_float(row.get("High"))
-        if any(value is None for value in (open_price, close_price, low_price, high_price)):
-            logger.warning("Skipping history row with non-finite OHLC for %s on %s", symbol, date)
-            continue
-        timestamp = None
-        if intraday:
-            utc_index = index.tz_localize("UTC") if index.tzinfo is None else index.tz_convert("UTC")
-            timestamp = int(utc_index.timestamp())
-        price = HistoricalPrice(
-            date=date,
-            open=open_price,
-            close=close_price,
-            low=low_price,
-            high=high_price,
-            volume=_finite_int(row.get("Volume")),
-            dividend=_resolve_dividend(row, date, dividends_by_date),
-            timestamp=timestamp,
-            splitRatio=_resolve_split_ratio(row),
+
+def _refresh_history_tail(ticker, symbol, period, cached):
+    """Splice a short recent daily window onto an expired series, or return None to reload."""
+    if not cached:
+        return None
+    gap_days = _epoch_day(_exchange_today(cached.timezone)) - int(cached.epoch_days[-1])
+    window = next((name for name, max_gap in INCREMENTAL_HISTORY_WINDOWS if gap_days <= max_gap), None)
+    if window is None:
+        _metrics.record_history_incremental_refresh("gap")
+        return None
+    try:
+        history = ticker.history(
+            period=window, interval="1d", auto_adjust=False, actions=True, repair=True
         )
-        result.append(price)
+    except YFPricesMissingError:
+        _metrics.record_history_incremental_refresh("gap")
+        return None
+    except Exception as error:
+        logger.warning("Failed to fetch history tail for %s (%s)", symbol, window, exc_info=True)
+        _raise_classified_upstream_error(error, symbol)
+    tail = _normalize_history(
+        symbol, history, _fallback_actions(symbol, ticker, history), intraday=False
+    )
 
-    if result:
-        ttl = INTRADAY_CACHE_SECONDS if intraday else HISTORY_CACHE_SECONDS.get(period, 60)
-        _cache_set(cache_key, result, ttl)
+    outcome, splice_at = _history_tail_outcome(cached, tail)
+    _metrics.record_history_incremental_refresh(outcome)
+    if outcome != "spliced":
+        logger.info("History tail for %s (%s) was %s; reloading in full", symbol, period, outcome)
+        return None
+    spliced = PriceHistory.concatenate((cached[:splice_at], tail))
+    return spliced if period == "max" else _slice_history_period(spliced, period)
+
+
+def _history_tail_outcome(cached, tail):
+    """Classify a fetched tail and return where it starts in the cached series."""
+    if not tail:
+        return "gap", None
+    splice_at = int(np.searchsorted(cached.epoch_days, tail.epoch_days[0]))
+    # The last cached bar may have been an unfinished session, so only earlier bars verify.
+    overlap = cached[splice_at:-1]
+    if not overlap:
+        return "gap", None
+    cached_splits = set(cached.epoch_days[~np.isnan(cached.split_ratio)].tolist())
+    tail_splits = tail.epoch_days[~np.isnan(tail.split_ratio)].tolist()
+    if any(day not in cached_splits for day in tail_splits):
+        return "split", None
+    positions = np.searchsorted(tail.epoch_days, overlap.epoch_days)
+    if positions[-1] >= len(tail) or not np.array_equal(tail.epoch_days[positions], overlap.epoch_days):
+        return "restatement", None
+    for column in ("open", "close", "low", "high", "dividend"):
+        if not np.allclose(
+            getattr(tail, column)[positions],
+            getattr(overlap, column),
+            rtol=INCREMENTAL_HISTORY_RELATIVE_TOLERANCE,
+            atol=0.0,
+        ):
+            return "restatement", None
+    return "spliced", splice_at
+
+
+def _normalize_history(symbol, history, actions, intraday):
+    """Sanitise a yfinance history frame column-wise into a columnar `PriceHistory`."""
+    actions = actions or CorporateActions.empty()
+    index = _datetime_index(history.index)
+    epoch_days = _epoch_days(index)
+    open_prices = _finite_column(history, "Open")
+    close_prices = _finite_column(history, "Close")
+    low_prices = _finite_column(history, "Low")
+    high_prices = _finite_column(history, "High")
+    valid = ~(
+        np.isnan(open_prices) | np.isnan(close_prices) | np.isnan(low_prices) | np.isnan(high_prices)
+    )
+    for date in _date_strings(epoch_days[~valid]):
+        logger.warning("Skipping history row with non-finite OHLC for %s on %s", symbol, date)
+
+    volumes = _finite_column(history, "Volume")
+    volumes = np.where(np.isnan(volumes), 0.0, np.trunc(volumes)).astype(np.int64)
+    row_dividends = _finite_column(history, "Dividends")
+    fallback_dividends = _events_on_days(actions.dividend_days, actions.dividends, epoch_days)
+    resolved_dividends = np.where(
+        ~np.isnan(row_dividends) & (row_dividends != 0.0),
+        row_dividends,
+        np.where(
+            ~np.isnan(fallback_dividends),
+            fallback_dividends,
+            np.where(np.isnan(row_dividends), 0.0, row_dividends),
+        ),
+    )
+    split_ratios = _finite_column(history, "Stock Splits")
+    if intraday:
+        # A day's split would land on every bar of that day and compound once per bar.
+        split_ratios[~(split_ratios > 0.0)] = np.nan
+    else:
+        split_ratios = np.where(
+            split_ratios > 0.0,
+            split_ratios,
+            _events_on_days(actions.split_days, actions.split_ratios, epoch_days),
+        )
+
+    return PriceHistory(
+        epoch_days=epoch_days[valid],
+        open=open_prices[valid],
+        close=close_prices[valid],
+        low=low_prices[valid],
+        high=high_prices[valid],
+        volume=volumes[valid],
+        dividend=resolved_dividends[valid],
+        split_ratio=split_ratios[valid],
+        timestamp=_epoch_seconds(index)[valid] if intraday else None,
+        timezone=None if index.tz is None else str(index.tz),
+    )
+
+
+def _finite_column(frame, column):
+    """Return a column as float64 with missing, non-numeric and non-finite cells set to NaN."""
+    if column not in frame.columns:
+        return np.full(len(frame), np.nan)
+    return _finite_array(frame[column])
+
+
+def _finite_array(series):
+    if not pd.api.types.is_numeric_dtype(series.dtype):
+        series = pd.to_numeric(series, errors="coerce")
+    values = series.to_numpy(dtype=np.float64, na_value=np.nan, copy=True)
+    values[~np.isfinite(values)] = np.nan
+    return values
+
+
+def _epoch_days(index):
+    """Return exchange-local calendar dates of a whole index as days since 1970-01-01."""
+    try:
+        index = _datetime_index(index)
+    except (TypeError, ValueError):
+        # Mixed UTC offsets cannot share one DatetimeIndex; resolve those labels one by one.
+        return np.array(
+            [_date_key(label) for label in index], dtype="datetime64[D]"
+        ).astype(np.int64)
+    local = index.tz_localize(None) if index.tz is not None else index
+    return local.to_numpy().astype("datetime64[D]").astype(np.int64)
+
+
+def _datetime_index(index):
+    return index if isinstance(index, pd.DatetimeIndex) else pd.DatetimeIndex(index)
+
+
+def _date_strings(epoch_days):
+    return np.datetime_as_string(epoch_days.astype("datetime64[D]")).tolist()
+
+
+def _date_key(index):
+    try:
+        return index.strftime("%Y-%m-%d")
+    except AttributeError:
+        return pd.Timestamp(index).strftime("%Y-%m-%d")
+
+
+def _epoch_seconds(index):
+    utc = index.tz_convert("UTC").tz_localize(None) if index.tz is not None else index
+    return utc.to_numpy().astype("datetime64[s]").astype(np.int64)
+
+
+def _events_by_day(events, combine, positive=False):
+    """Combine finite event amounts per calendar date into sorted days and totals."""
+    if not isinstance(events, pd.Series) or events.empty:
+        return np.empty(0, dtype=np.int64), np.empty(0)
+    amounts = _finite_array(events)
+    valid = amounts > 0.0 if positive else ~np.isnan(amounts)
+    days, positions = np.unique(_epoch_days(events.index)[valid], return_inverse=True)
+    totals = np.full(len(days), combine.identity, dtype=np.float64)
+    # Unbuffered accumulation combines same-day amounts in their original order.
+    combine.at(totals, positions, amounts[valid])
+    return days, totals
+
+
+def _events_on_days(event_days, amounts, epoch_days):
+    """Align per-date event amounts with history dates; dates without an event are NaN."""
+    result = np.full(len(epoch_days), np.nan)
+    if not len(event_days):
+        return result
+    slots = np.searchsorted(event_days, epoch_days).clip(max=len(event_days) - 1)
+    matched = event_days[slots] == epoch_days
+    result[matched] = amounts[slots[matched]]
     return result
 
 
@@ -454,48 +1681,28 @@ def _optional_string(value):
         return None
 
 
-def _date_key(index):
-    try:
-        return index.strftime("%Y-%m-%d")
-    except AttributeError:
-        return pd.Timestamp(index).strftime("%Y-%m-%d")
-
-
-def _dividends_by_date(dividends):
-    result = {}
-    if dividends is None:
-        return result
-    try:
-        items = dividends.items()
-    except AttributeError:
-        return result
-    for index, amount in items:
-        dividend = _finite_float(amount)
-        if dividend is None:
-            continue
-        date = _date_key(index)
-        result[date] = result.get(date, 0.0) + dividend
-    return result
-
-
-def _resolve_dividend(row, date, dividends_by_date):
-    row_dividend = _finite_float(row.get("Dividends"))
-    if row_dividend is not None and row_dividend != 0.0:
-        return row_dividend
-    fallback = dividends_by_date.get(date)
-    if fallback is not None:
-        return fallback
-    return row_dividend if row_dividend is not None else 0.0
+def get_basic_info(symbol):
+    payload = _basic_info_payload(symbol)
+    return None if payload is None else payload.value
 
 
-def _resolve_split_ratio(row):
-    split_ratio = _finite_float(row.get("Stock Splits"))
-    return split_ratio if split_ratio is not None and split_ratio > 0.0 else None
+def _basic_info_payload(symbol):
+    key = f"info:{symbol}"
+    payload = _coalesced_cached_load(key, lambda: _load_basic_info(symbol, key))
+    return None if payload.value is None else payload
 
 
-def get_basic_info(symbol):
-    key = f"info:{symbol}"
-    return _coalesced_cached_load(key, lambda: _load_basic_info(symbol, key))
+def _basic_info_batch_outcomes(symbols):
+    """Return each symbol's payload, None for an unknown symbol, or an error."""
+    outcomes = _batch_outcomes(
+        {symbol: f"info:{symbol}" for symbol in symbols},
+        lambda _symbol, _key: None,
+        _load_basic_info,
+    )
+    return {
+        symbol: None if isinstance(outcome, EncodedPayload) and outcome.value is None else outcome
+        for symbol, outcome in outcomes.items()
+    }
 
 
 def _load_basic_info(symbol, cache_key):
@@ -504,8 +1711,21 @@ def _load_basic_info(symbol, cache_key):
     except Exception as error:
         logger.warning("Failed to fetch info for %s", symbol, exc_info=True)
         _raise_classified_upstream_error(error, symbol)
+    return _basic_info_from(symbol, info, cache_key)
+
+
+def _basic_info_from(symbol, info, cache_key):
+    """Cache and return the info payload for a fetched info dict."""
     if not _has_symbol_identity(info):
-        return None
+        payload = _encoded_payload(cache_key, None, None)
+        _cache_negative(cache_key, payload)
+        return payload
+    _market_sessions.observe(
+        symbol,
+        info.get("exchangeTimezoneName"),
+        info.get("quoteType"),
+        _finite_int(info.get("regularMarketTime"), default=None),
+    )
 
     result = BasicInfo(
         name=_optional_string(info.get("longName")) or _optional_string(info.get("shortName")),
@@ -531,8 +1751,9 @@ def _load_basic_info(symbol, cache_key):
         market_timestamp=_finite_int(info.get("regularMarketTime"), default=None),
     )
 
-    _cache_set(cache_key, result, INFO_CACHE_SECONDS)
-    return result
+    payload = _encoded_payload(cache_key, result, asdict(result))
+    _cache_set(cache_key, payload, _loaded_ttl(cache_key, payload, INFO_CACHE_SECONDS))
+    return payload
 
 
 def _resolve_previous_close(info):
@@ -546,7 +1767,7 @@ def _resolve_previous_close(info):
     if market_time is not None and price is not None and prev is not None:
         try:
             market_date = datetime.fromtimestamp(market_time, tz=timezone.utc).date()
-            today = datetime.now(tz=timezone.utc).date()
+            today = datetime.fromtimestamp(time.time(), tz=timezone.utc).date()
             if market_date < today:
                 return price
         except (OverflowError, OSError, ValueError):
@@ -596,6 +1817,10 @@ def _resolve_market_date(info):
 
 
 def search_tickers(query):
+    return _search_payload(query).value
+
+
+def _search_payload(query):
     key = f"search:{query}"
     return _coalesced_cached_load(key, lambda: _load_search_results(query, key))
 
@@ -617,8 +1842,9 @@ def _load_search_results(query, cache_key):
         for q in results
     ]
 
-    _cache_set(cache_key, filtered, SEARCH_CACHE_SECONDS)
-    return filtered
+    payload = _encoded_payload(cache_key, filtered, [asdict(result) for result in filtered])
+    _cache_set(cache_key, payload, SEARCH_CACHE_SECONDS)
+    return payload
 
 
 @app.before_request
@@ -668,6 +1894,15 @@ def health_endpoint():
     return jsonify({"status": "ok"})
 
 
+@app.route("/ready")
+def ready_endpoint():
+    """Report ready once the optional startup warm-up has run, whatever its failures."""
+    if _warmup is None:
+        return jsonify({"status": "ready"})
+    body = {"status": "ready" if _warmup.complete else "warming", "warmup": _warmup.progress()}
+    return jsonify(body), 200 if _warmup.complete else 503
+
+
 @app.route("/metrics")
 def metrics_endpoint():
     return Response(
@@ -678,8 +1913,12 @@ def metrics_endpoint():
 
 def _normalized_metric_route(path):
     segments = path.strip("/").split("/")
+    if segments in (["history", "batch"], ["info", "batch"]):
+        return f"/{segments[0]}/batch"
     if len(segments) == 3 and segments[0] == "history":
         return "/history/{symbol}/{period}"
+    if len(segments) == 2 and segments[0] == "history":
+        return "/history/{symbol}"
     if len(segments) == 2 and segments[0] == "info":
         return "/info/{symbol}"
     if len(segments) == 2 and segments[0] == "search":
@@ -694,10 +1933,17 @@ def _render_runtime_gauges():
         "# TYPE stock_analyst_yfinance_cache_entries gauge",
         f'stock_analyst_yfinance_cache_entries{{cache="history"}} {len(_history_cache)}',
         f'stock_analyst_yfinance_cache_entries{{cache="metadata"}} {len(_metadata_cache)}',
+        f'stock_analyst_yfinance_cache_entries{{cache="last_known_good"}} {len(_last_known_good)}',
         "# HELP stock_analyst_yfinance_cache_bytes Estimated retained cache bytes.",
         "# TYPE stock_analyst_yfinance_cache_bytes gauge",
         f'stock_analyst_yfinance_cache_bytes{{cache="history"}} {_history_cache.total_bytes}',
         f'stock_analyst_yfinance_cache_bytes{{cache="metadata"}} {_metadata_cache.total_bytes}',
+        "stock_analyst_yfinance_cache_bytes"
+        f'{{cache="last_known_good"}} {_last_known_good.total_bytes}',
+        "# HELP stock_analyst_yfinance_disk_cache_pending_writes Queued disk cache writes.",
+        "# TYPE stock_analyst_yfinance_disk_cache_pending_writes gauge",
+        "stock_analyst_yfinance_disk_cache_pending_writes "
+        f"{0 if _disk_cache is None else _disk_cache.pending_writes}",
         "# HELP stock_analyst_yfinance_bulkhead_active Active unique upstream loaders.",
         "# TYPE stock_analyst_yfinance_bulkhead_active gauge",
         f"stock_analyst_yfinance_bulkhead_active {_loader_bulkhead.active_count}",
@@ -707,6 +1953,10 @@ def _render_runtime_gauges():
         "# HELP stock_analyst_yfinance_singleflight_active Active coalesced keys.",
         "# TYPE stock_analyst_yfinance_singleflight_active gauge",
         f"stock_analyst_yfinance_singleflight_active {_single_flight.active_count}",
+        "# HELP stock_analyst_yfinance_refresh_ahead_tracked_keys Keys tracked for refresh-ahead.",
+        "# TYPE stock_analyst_yfinance_refresh_ahead_tracked_keys gauge",
+        "stock_analyst_yfinance_refresh_ahead_tracked_keys "
+        f"{0 if _refresh_ahead is None else _refresh_ahead.tracked_count}",
         "# HELP stock_analyst_yfinance_circuit_state Current circuit state as a one-hot gauge.",
         "# TYPE stock_analyst_yfinance_circuit_state gauge",
     ]
@@ -725,11 +1975,6 @@ def _render_runtime_gauges():
     return "\n".join(lines) + "\n"
 
 
-def _serialize_price(price):
-    d = asdict(price)
-    return {k: v for k, v in d.items() if v is not None}
-
-
 @app.route("/history/<symbol>/<period>")
 def history_endpoint(symbol, period):
     if period not in VALID_PERIODS:
@@ -737,37 +1982,137 @@ def history_endpoint(symbol, period):
 
     interval = request.args.get("interval", "1d")
     if interval not in VALID_INTERVALS:
-        return jsonify({"error": f"Invalid interval: {interval}. Valid values: {', '.join(sorted(VALID_INTERVALS))}"}), 400
+        return jsonify({"error": _invalid_interval_message(interval)}), 400
 
-    result = get_history(symbol, period, interval)
-    response = jsonify([_serialize_price(p) for p in result])
     intraday = interval in INTRADAY_INTERVALS
     max_age = INTRADAY_CACHE_SECONDS if intraday else HISTORY_CACHE_SECONDS.get(period, 60)
-    response.headers["Cache-Control"] = f"public, max-age={max_age}"
-    return response
+    return _payload_response(_history_payload(symbol, period, interval), max_age)
+
+
+def _invalid_interval_message(interval):
+    return f"Invalid interval: {interval}. Valid values: {', '.join(sorted(VALID_INTERVALS))}"
+
+
+@app.route("/history/<symbol>")
+def history_range_endpoint(symbol):
+    start = _query_date("start")
+    if start is None:
+        return jsonify({"error": "start is required"}), 400
+    end = _query_date("end")
+    if end is not None and end < start:
+        return jsonify({"error": "end must not be before start"}), 400
+
+    interval = request.args.get("interval", "1d")
+    if interval != "1d":
+        return jsonify({"error": "Date ranges support only the 1d interval"}), 400
+
+    payload, period = _history_range_payload(
+        symbol, start, end, compress=request.accept_encodings["gzip"] > 0
+    )
+    return _payload_response(payload, HISTORY_CACHE_SECONDS[period])
+
+
+def _query_date(name):
+    from datetime import date
+
+    value = request.args.get(name)
+    if value is None:
+        return None
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise ApiError(f"Invalid {name} date: {value}. Expected YYYY-MM-DD", 400) from None
+
+
+@app.route("/history/batch", methods=["POST"])
+def history_batch_endpoint():
+    body = request.get_json(silent=True)
+    if not isinstance(body, dict):
+        return jsonify({"error": "Request body must be a JSON object"}), 400
+
+    period = body.get("period")
+    if period not in VALID_PERIODS:
+        return jsonify({"error": f"Invalid period: {period}"}), 400
+
+    interval = body.get("interval", "1d")
+    if interval not in VALID_INTERVALS:
+        return jsonify({"error": _invalid_interval_message(interval)}), 400
+
+    symbols = _batch_symbols(body)
+    return _batch_response(_history_batch_outcomes(symbols, period, interval), "prices")
+
+
+@app.route("/info/batch", methods=["POST"])
+def info_batch_endpoint():
+    body = request.get_json(silent=True)
+    if not isinstance(body, dict):
+        return jsonify({"error": "Request body must be a JSON object"}), 400
+    return _batch_response(_basic_info_batch_outcomes(_batch_symbols(body)), "info")
+
+
+def _batch_symbols(body):
+    symbols = body.get("symbols")
+    if (
+        not isinstance(symbols, list)
+        or not symbols
+        or not all(isinstance(symbol, str) and symbol for symbol in symbols)
+    ):
+        raise ApiError("symbols must be a non-empty list of strings", 400)
+    symbols = list(dict.fromkeys(symbols))
+    if len(symbols) > BATCH_MAX_SYMBOLS:
+        raise ApiError(f"At most {BATCH_MAX_SYMBOLS} distinct symbols are allowed", 400)
+    return symbols
+
+
+def _batch_response(outcomes, field):
+    """Splice each symbol's cached body into one object without re-encoding it."""
+    entries = []
+    for symbol, outcome in outcomes.items():
+        if isinstance(outcome, EncodedPayload):
+            entry = b'{"%s":%s,"status":200}' % (field.encode(), bytes(outcome.body).rstrip(b"\n"))
+        elif outcome is None:
+            entry = _batch_error_entry(symbol, SymbolNotFoundError(symbol))
+        else:
+            entry = _batch_error_entry(symbol, outcome)
+        entries.append(_json_bytes(symbol) + b":" + entry)
+    return app.response_class(b"{" + b",".join(entries) + b"}\n", mimetype=app.json.mimetype)
+
+
+def _batch_error_entry(symbol, error):
+    if isinstance(error, ApiError):
+        entry = {"error": error.message, "status": error.status_code}
+        if "Retry-After" in error.headers:
+            entry["retryAfter"] = int(error.headers["Retry-After"])
+    else:
+        logger.error("Batch load of %s failed", symbol, exc_info=error)
+        entry = {"error": "An internal error occurred", "status": 500}
+    return _json_bytes(entry)
+
+
+def _json_bytes(value):
+    return app.json.response(value).get_data().rstrip(b"\n")
 
 
 @app.route("/info/<symbol>")
 def info_endpoint(symbol):
-    result = get_basic_info(symbol)
-    if result is None:
+    payload = _basic_info_payload(symbol)
+    if payload is None:
         return jsonify({"error": f"Symbol not found: {symbol}"}), 404
-    response = jsonify(asdict(result))
-    response.headers["Cache-Control"] = f"public, max-age={INFO_CACHE_SECONDS}"
-    return response
+    return _payload_response(payload, INFO_CACHE_SECONDS)
 
 
 @app.route("/search/<query>")
 def search_endpoint(query):
-    data = search_tickers(query)
-    response = jsonify([asdict(r) for r in data])
-    response.headers["Cache-Control"] = f"public, max-age={SEARCH_CACHE_SECONDS}"
-    return response
+    return _payload_response(_search_payload(query), SEARCH_CACHE_SECONDS)
 
 
 def run_server():
     from waitress import serve
 
+    if _warmup is not None:
+        _warmup.start()
+    if _refresh_ahead is not None:
+        _refresh_ahead.start()
     serve(app, host="0.0.0.0", port=8081, threads=WAITRESS_THREADS)
 
 
@@ -0,0 +1,427 @@
+"""Deterministic offline benchmarks for adapter hot paths.
+
+Run from this directory with the development requirements installed, for example:
+
+    python benchmark.py history
+
+No benchmark calls Yahoo. Each one prints a plain-text table and exits non-zero if the
+optimised path stops producing the same output as its reference implementation.
+"""
+
+import argparse
+import gc
+import gzip
+import json
+import sys
+import time
+import tracemalloc
+from dataclasses import asdict, fields, is_dataclass
+
+import numpy as np
+import pandas as pd
+
+from flask import jsonify
+
+from app import (
+    GZIP_COMPRESS_LEVEL,
+    HISTORY_CACHE_SECONDS,
+    BasicInfo,
+    CorporateActions,
+    HistoricalPrice,
+    SearchResult,
+    _encoded_payload,
+    _events_by_day,
+    _finite_float,
+    _finite_int,
+    _normalize_history,
+    _payload_response,
+    app,
+)
+from memory_cache import ByteBoundedTTLCache, estimate_cache_entry_bytes, estimate_retained_bytes
+from price_history import PriceHistory
+
+# Bars per (period, interval) roughly matching what Yahoo returns for a US equity.
+HISTORY_SHAPES = (
+    ("1mo", "1d", 21),
+    ("1y", "1d", 252),
+    ("10y", "1d", 2_520),
+    ("max", "1d", 16_000),
+    ("max", "1wk", 3_300),
+    ("max", "1mo", 760),
+    ("5d", "1m", 1_950),
+    ("1mo", "5m", 1_638),
+    ("1y", "1h", 1_764),
+)
+
+
+def _synthetic_history(bars, interval, seed=7):
+    rng = np.random.default_rng(seed)
+    if interval in {"1m", "5m", "1h"}:
+        frequency = {"1m": "1min", "5m": "5min", "1h": "1h"}[interval]
+        index = pd.date_range(
+            "2024-06-10 09:30", periods=bars, freq=frequency, tz="America/New_York"
+        )
+    else:
+        frequency = {"1d": "B", "1wk": "W-MON", "1mo": "MS"}[interval]
+        index = pd.date_range(end="2024-06-14", periods=bars, freq=frequency, tz="America/New_York")
+    close = 100.0 + np.cumsum(rng.normal(0.0, 1.0, bars))
+    dividends = np.where(rng.random(bars) < 0.016, 0.25, 0.0)
+    splits = np.where(rng.random(bars) < 0.0005, 2.0, 0.0)
+    frame = pd.DataFrame(
+        {
+            "Open": close + rng.normal(0.0, 0.3, bars),
+            "High": close + 1.0,
+            "Low": close - 1.0,
+            "Close": close,
+            "Volume": rng.integers(1_000, 10_000_000, bars),
+            "Dividends": dividends,
+            "Stock Splits": splits,
+        },
+        index=index,
+    )
+    fallback = pd.Series(dividends[dividends > 0.0], index=index[dividends > 0.0])
+    return frame, fallback
+
+
+def _dividend_actions(dividends):
+    """Wrap a symbol-wide dividend series as the cached corporate actions history loads read."""
+    return CorporateActions(*_events_by_day(dividends, np.add), np.empty(0, dtype=np.int64), np.empty(0))
+
+
+def _legacy_normalize_history(history, dividends, intraday):
+    """The row-by-row `iterrows` normalisation that `_normalize_history` replaced."""
+    dividends_by_date = {}
+    for index, amount in dividends.items():
+        dividend = _finite_float(amount)
+        if dividend is not None:
+            date = index.strftime("%Y-%m-%d")
+            dividends_by_date[date] = dividends_by_date.get(date, 0.0) + dividend
+
+    result = []
+    for index, row in history.iterrows():
+        date = index.strftime("%Y-%m-%d")
+        open_price = _finite_float(row.get("Open"))
+        close_price = _finite_float(row.get("Close"))
+        low_price = _finite_float(row.get("Low"))
+        high_price = _finite_float(row.get("High"))
+        if any(value is None for value in (open_price, close_price, low_price, high_price)):
+            continue
+        timestamp = None
+        if intraday:
+            utc_index = index.tz_localize("UTC") if index.tzinfo is None else index.tz_convert("UTC")
+            timestamp = int(utc_index.timestamp())
+        row_dividend = _finite_float(row.get("Dividends"))
+        if row_dividend is not None and row_dividend != 0.0:
+            dividend = row_dividend
+        elif dividends_by_date.get(date) is not None:
+            dividend = dividends_by_date[date]
+        else:
+            dividend = row_dividend if row_dividend is not None else 0.0
+        split_ratio = _finite_float(row.get("Stock Splits"))
+        result.append(
+            HistoricalPrice(
+                date=date,
+                open=open_price,
+                close=close_price,
+                low=low_price,
+                high=high_price,
+                volume=_finite_int(row.get("Volume")),
+                dividend=dividend,
+                timestamp=timestamp,
+                splitRatio=split_ratio if split_ratio is not None and split_ratio > 0.0 else None,
+            )
+        )
+    return result
+
+
+# Entry counts for the cache scaling benchmark, up to far beyond the default entry limits.
+CACHE_SIZES = (100, 1_000, 10_000, 100_000)
+CACHE_LOOKUPS = 200
+
+
+class _ScanningTTLCache(ByteBoundedTTLCache):
+    """The full scan of every entry on each access that the expiry heap replaced."""
+
+    def _remove_expired(self, now, limit=None):
+        expired = [key for key, entry in self._entries.items() if entry.retain_until <= now]
+        for key in expired:
+            self._on_evict(key, self._remove(key).value)
+
+
+# Largest accepted gap between an estimate and the bytes tracemalloc attributes to the
+# same payload, as a share of the traced bytes.
+SIZE_ESTIMATE_ERROR_BOUND = 0.10
+
+
+def _legacy_estimate_retained_bytes(value):
+    """The identity-tracked walk with per-object dataclass introspection that was replaced."""
+    seen = set()
+
+    def estimate(current):
+        identity = id(current)
+        if identity in seen:
+            return 0
+        seen.add(identity)
+
+        size = sys.getsizeof(current)
+        if is_dataclass(current) and not isinstance(current, type):
+            return size + sum(estimate(getattr(current, field.name)) for field in fields(current))
+        if isinstance(current, dict):
+            return size + sum(estimate(key) + estimate(item) for key, item in current.items())
+        if isinstance(current, (list, tuple, set, frozenset)):
+            return size + sum(estimate(item) for item in current)
+        return size
+
+    return estimate(value)
+
+
+def _best_of(repeats, function):
+    best = float("inf")
+    result = None
+    for _ in range(repeats):
+        started = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def _legacy_records(prices):
+    return [
+        {name: value for name, value in asdict(price).items() if value is not None}
+        for price in prices
+    ]
+
+
+def benchmark_history(repeats):
+    print(f"{'period':>6} {'interval':>8} {'bars':>7} {'iterrows ms':>12} {'vectorized ms':>14} {'speedup':>8}")
+    identical = True
+    for period, interval, bars in HISTORY_SHAPES:
+        history, dividends = _synthetic_history(bars, interval)
+        intraday = interval in {"1m", "5m", "1h"}
+        # The adapter reads the symbol's corporate actions from their own cache entry.
+        actions = _dividend_actions(dividends)
+        legacy_seconds, legacy = _best_of(
+            repeats, lambda: _legacy_normalize_history(history, dividends, intraday)
+        )
+        vectorized_seconds, vectorized = _best_of(
+            repeats, lambda: _normalize_history("BENCH", history, actions, intraday)
+        )
+        identical = identical and (
+            app.json.dumps(_legacy_records(legacy)) == app.json.dumps(vectorized.records())
+        )
+        print(
+            f"{period:>6} {interval:>8} {bars:>7} {legacy_seconds * 1000:>12.2f} "
+            f"{vectorized_seconds * 1000:>14.2f} {legacy_seconds / vectorized_seconds:>7.1f}x"
+        )
+    print("JSON output identical:", identical)
+    return identical
+
+
+def benchmark_history_memory(_repeats):
+    print(f"{'period':>6} {'interval':>8} {'bars':>7} {'list bytes':>12} {'columnar bytes':>15} {'ratio':>7}")
+    identical = True
+    for period, interval, bars in HISTORY_SHAPES:
+        history, dividends = _synthetic_history(bars, interval)
+        intraday = interval in {"1m", "5m", "1h"}
+        legacy = _legacy_normalize_history(history, dividends, intraday)
+        columnar = _normalize_history("BENCH", history, _dividend_actions(dividends), intraday)
+        identical = identical and list(columnar) == legacy
+        key = f"history:BENCH:{period}:{interval}"
+        legacy_bytes = estimate_cache_entry_bytes(key, legacy)
+        columnar_bytes = estimate_cache_entry_bytes(key, columnar)
+        print(
+            f"{period:>6} {interval:>8} {bars:>7} {legacy_bytes:>12} {columnar_bytes:>15} "
+            f"{legacy_bytes / columnar_bytes:>6.1f}x"
+        )
+    print("Bars identical:", identical)
+    return identical
+
+
+def benchmark_cache_hit(repeats):
+    print(
+        f"{'period':>6} {'interval':>8} {'bars':>7} {'re-encode ms':>13} {'cached body ms':>15} "
+        f"{'gzip once ms':>13} {'json KiB':>9} {'gzip KiB':>9}"
+    )
+    identical = True
+    with app.test_request_context(headers={"Accept-Encoding": "gzip"}):
+        for period, interval, bars in HISTORY_SHAPES:
+            history, dividends = _synthetic_history(bars, interval)
+            prices = _normalize_history(
+                "BENCH", history, _dividend_actions(dividends), interval in {"1m", "5m", "1h"}
+            )
+            key = f"history:BENCH:{period}:{interval}"
+            encode_seconds, encoded = _best_of(repeats, lambda: jsonify(prices.records()))
+            payload = _encoded_payload(key, prices, prices.records())
+            gzip_seconds, _ = _best_of(
+                repeats, lambda: gzip.compress(payload.body, compresslevel=GZIP_COMPRESS_LEVEL, mtime=0)
+            )
+            max_age = HISTORY_CACHE_SECONDS.get(period, 60)
+            cached_seconds, cached = _best_of(repeats, lambda: _payload_response(payload, max_age))
+            identical = identical and gzip.decompress(cached.get_data()) == encoded.get_data()
+            print(
+                f"{period:>6} {interval:>8} {bars:>7} {encode_seconds * 1000:>13.2f} "
+                f"{cached_seconds * 1000:>15.3f} {gzip_seconds * 1000:>13.2f} "
+                f"{len(payload.body) / 1024:>9.1f} {len(payload.gzip_body) / 1024:>9.1f}"
+            )
+    print("Response bodies identical:", identical)
+    return identical
+
+
+def benchmark_cache_scale(repeats):
+    print(f"{'entries':>8} {'scan hit us':>12} {'heap hit us':>12} {'scan len us':>12} {'heap len us':>12}")
+    identical = True
+    for size in CACHE_SIZES:
+        keys = [f"history:BENCH{index}:1y:1d" for index in range(size)]
+        lookups = [keys[index * 7919 % size] for index in range(CACHE_LOOKUPS)]
+        caches = []
+        for cache_class in (_ScanningTTLCache, ByteBoundedTTLCache):
+            cache = cache_class(size * 1_000, size, size_of=lambda _key, _value: 1_000)
+            # Filling through the scanning cache would be quadratic, so it adopts the
+            # entries a heap-indexed cache built.
+            filled = ByteBoundedTTLCache(size * 1_000, size, size_of=lambda _key, _value: 1_000)
+            for index, key in enumerate(keys):
+                # Spread TTLs so the heap is not trivially ordered by insertion.
+                filled.set(key, index, ttl=3_600 + index * 7919 % 600)
+            cache._entries = filled._entries
+            cache._expiry_heap = filled._expiry_heap
+            cache._total_bytes = filled._total_bytes
+            caches.append(cache)
+        timings = []
+        for cache in caches:
+            hit_seconds, hits = _best_of(repeats, lambda: [cache.get(key) for key in lookups])
+            len_seconds, length = _best_of(repeats, lambda: len(cache))
+            timings.append((hit_seconds / CACHE_LOOKUPS, len_seconds, hits, length))
+        (scan_hit, scan_len, scan_hits, scan_length), (heap_hit, heap_len, heap_hits, heap_length) = timings
+        identical = identical and scan_hits == heap_hits and scan_length == heap_length == size
+        print(
+            f"{size:>8} {scan_hit * 1e6:>12.2f} {heap_hit * 1e6:>12.2f} "
+            f"{scan_len * 1e6:>12.2f} {heap_len * 1e6:>12.2f}"
+        )
+    print("Hits identical:", identical)
+    return identical
+
+
+def _traced_bytes(build):
+    """Return what `build()` returns and the heap bytes it still retains afterwards."""
+    # A first build fills lazily created state, such as metric counters, outside the trace.
+    build()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        value = build()
+        gc.collect()
+        retained = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+    return value, retained
+
+
+def _fresh(value):
+    # Decoding allocates new leaves, as parsing a Yahoo response does, so nothing in the
+    # payload is shared with its source.
+    return json.loads(json.dumps(value))
+
+
+def _size_calibration_payloads():
+    for period, interval, bars in HISTORY_SHAPES:
+        history, dividends = _synthetic_history(bars, interval)
+        prices = _normalize_history("BENCH", history, None, interval in {"1m", "5m", "1h"})
+        key = f"history:BENCH:{period}:{interval}"
+
+        def build(prices=prices, key=key):
+            copied = PriceHistory(
+                *(column.copy() for column in prices._columns()[:8]),
+                timestamp=None if prices.timestamp is None else prices.timestamp.copy(),
+                timezone=prices.timezone,
+            )
+            return _encoded_payload(key, copied, copied.records())
+
+        yield f"{period} {interval}", build
+    info = {
+        "name": "Benchmark Industries Incorporated",
+        "price": 195.37,
+        "currency": "USD",
+        "pe_ratio": 28.4,
+        "pb_ratio": 47.1,
+        "eps": 6.43,
+        "roe": 1.47,
+        "market_cap": 3.0e12,
+        "recommendation": "buy",
+        "analyst_count": 41,
+        "fifty_two_week_high": 199.62,
+        "fifty_two_week_low": 164.08,
+        "beta": 1.29,
+        "sector": "Technology",
+        "industry": "Consumer Electronics",
+        "earnings_date": "2024-08-01",
+        "dividend_rate": 1.0,
+        "trailing_annual_dividend_rate": 0.96,
+        "previous_close": 194.35,
+        "market_date": "2024-06-14",
+        "market_timestamp": 1718395200,
+    }
+
+    def build_info():
+        result = BasicInfo(**_fresh(info))
+        return _encoded_payload("info:BENCH", result, asdict(result))
+
+    yield "info", build_info
+    quotes = [
+        {
+            "symbol": f"BENCH{index}.WA",
+            "name": f"Benchmark Holding {index} S.A.",
+            "exchange": "WSE",
+            "quoteType": "EQUITY",
+        }
+        for index in range(20)
+    ]
+
+    def build_search():
+        results = [SearchResult(**quote) for quote in _fresh(quotes)]
+        return _encoded_payload("search:bench", results, [asdict(result) for result in results])
+
+    yield "search", build_search
+
+
+def benchmark_size_calibration(repeats):
+    print(
+        f"{'payload':>10} {'traced B':>10} {'estimate B':>11} {'error':>7} "
+        f"{'walk us':>9} {'typed us':>9}"
+    )
+    within_bound = True
+    with app.app_context():
+        for label, build in _size_calibration_payloads():
+            payload, traced = _traced_bytes(build)
+            estimate = estimate_retained_bytes(payload)
+            error = (estimate - traced) / traced
+            within_bound = within_bound and abs(error) <= SIZE_ESTIMATE_ERROR_BOUND
+            walk_seconds, _ = _best_of(repeats, lambda: _legacy_estimate_retained_bytes(payload))
+            typed_seconds, _ = _best_of(repeats, lambda: estimate_retained_bytes(payload))
+            print(
+                f"{label:>10} {traced:>10} {estimate:>11} {error:>+7.1%} "
+                f"{walk_seconds * 1e6:>9.1f} {typed_seconds * 1e6:>9.1f}"
+            )
+    print(f"Estimates within {SIZE_ESTIMATE_ERROR_BOUND:.0%} of tracemalloc:", within_bound)
+    return within_bound
+
+
+BENCHMARKS = {
+    "cache-hit": benchmark_cache_hit,
+    "cache-scale": benchmark_cache_scale,
+    "history": benchmark_history,
+    "history-memory": benchmark_history_memory,
+    "size-calibration": benchmark_size_calibration,
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("benchmark", choices=sorted(BENCHMARKS))
+    parser.add_argument("--repeats", type=int, default=5)
+    arguments = parser.parse_args(argv)
+    return 0 if BENCHMARKS[arguments.benchmark](arguments.repeats) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
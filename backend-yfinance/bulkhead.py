@@ -23,7 +23,17 @@ class LoaderBulkhead:
         acquired = self._permits.acquire(timeout=self.acquire_timeout_seconds)
         if not acquired:
             raise BulkheadSaturatedError("yfinance loader bulkhead is saturated")
+        return self._run_with_permit(loader)
 
+    def call_spare(self, loader, reserve):
+        """Run `loader` only if a permit is free now and `reserve` more would still be free."""
+        with self._state_lock:
+            spare = self._active_count + reserve < self.max_active
+        if not spare or not self._permits.acquire(blocking=False):
+            raise BulkheadSaturatedError("yfinance loader bulkhead has no spare permit")
+        return self._run_with_permit(loader)
+
+    def _run_with_permit(self, loader):
         counted = False
         try:
             with self._state_lock:
@@ -0,0 +1,199 @@
+import copy
+import logging
+import pickle
+import queue
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+
+
+logger = logging.getLogger(__name__)
+
+_WRITE_BATCH_SIZE = 64
+_STOP = object()
+
+
+@dataclass(frozen=True)
+class DiskEntry:
+    value: object
+    expires_in: float
+    retained_for: float
+
+
+class DiskCache:
+    """Optional SQLite second cache tier with asynchronous write-behind."""
+
+    def __init__(
+        self,
+        path,
+        *,
+        schema_version,
+        max_bytes,
+        max_pending_writes=1024,
+        clock=time.time,
+        on_write=None,
+    ):
+        if max_bytes <= 0:
+            raise ValueError("max_bytes must be positive")
+        self.path = path
+        self.schema_version = schema_version
+        self.max_bytes = max_bytes
+        self._clock = clock
+        self._on_write = on_write or (lambda _result: None)
+        self._pending = queue.Queue(maxsize=max_pending_writes)
+        self._writer = None
+        self._writer_lock = threading.Lock()
+        self._read_lock = threading.Lock()
+        self._reader = self._connect()
+        with self._reader:
+            self._reader.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS entries (
+                    key TEXT PRIMARY KEY,
+                    schema_version INTEGER NOT NULL,
+                    expires_at REAL NOT NULL,
+                    retain_until REAL NOT NULL,
+                    written_at REAL NOT NULL,
+                    size_bytes INTEGER NOT NULL,
+                    value BLOB NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS entries_retain_until ON entries (retain_until);
+                CREATE INDEX IF NOT EXISTS entries_written_at ON entries (written_at);
+                """
+            )
+            self._reader.execute(
+                "DELETE FROM entries WHERE schema_version != ?", (schema_version,)
+            )
+
+    def _connect(self):
+        connection = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    def get(self, key):
+        """Return a retained entry with its remaining lifetimes, or None."""
+        now = self._clock()
+        with self._read_lock:
+            row = self._reader.execute(
+                "SELECT expires_at, retain_until, value FROM entries "
+                "WHERE key = ? AND schema_version = ? AND retain_until > ?",
+                (key, self.schema_version, now),
+            ).fetchone()
+        if row is None:
+            return None
+        expires_at, retain_until, blob = row
+        return DiskEntry(
+            value=pickle.loads(blob),
+            expires_in=expires_at - now,
+            retained_for=retain_until - now,
+        )
+
+    def put(self, key, value, ttl, stale_seconds=0):
+        """Queue a write and return False if the write-behind queue is full."""
+        now = self._clock()
+        item = (key, copy.copy(value), now + ttl, now + ttl + max(0, stale_seconds))
+        self._ensure_writer()
+        try:
+            self._pending.put_nowait(item)
+        except queue.Full:
+            self._on_write("dropped")
+            return False
+        return True
+
+    def flush(self, timeout=None):
+        """Wait until every write queued before this call has been committed."""
+        if self._writer is None:
+            return True
+        done = threading.Event()
+        self._pending.put(done, timeout=timeout)
+        return done.wait(timeout)
+
+    def close(self, timeout=5):
+        with self._writer_lock:
+            writer = self._writer
+            self._writer = None
+        if writer is not None:
+            try:
+                self._pending.put(_STOP, timeout=timeout)
+            except queue.Full:
+                logger.warning("Disk cache write-behind queue is full; abandoning pending writes")
+            writer.join(timeout)
+        with self._read_lock:
+            self._reader.close()
+
+    @property
+    def pending_writes(self):
+        return self._pending.qsize()
+
+    def _ensure_writer(self):
+        if self._writer is not None:
+            return
+        with self._writer_lock:
+            if self._writer is None:
+                self._writer = threading.Thread(
+                    target=self._write_behind, name="disk-cache-writer", daemon=True
+                )
+                self._writer.start()
+
+    def _write_behind(self):
+        connection = self._connect()
+        try:
+            while True:
+                batch = [self._pending.get()]
+                while len(batch) < _WRITE_BATCH_SIZE:
+                    try:
+                        batch.append(self._pending.get_nowait())
+                    except queue.Empty:
+                        break
+                writes = [item for item in batch if isinstance(item, tuple)]
+                if writes:
+                    self._commit(connection, writes)
+                for item in batch:
+                    if isinstance(item, threading.Event):
+                        item.set()
+                if any(item is _STOP for item in batch):
+                    return
+        finally:
+            connection.close()
+
+    def _commit(self, connection, writes):
+        now = self._clock()
+        rows = []
+        for key, value, expires_at, retain_until in writes:
+            try:
+                blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+            except Exception:
+                logger.warning("Disk cache could not serialise %s", key, exc_info=True)
+                self._on_write("error")
+                continue
+            rows.append(
+                (key, self.schema_version, expires_at, retain_until, now, len(blob), blob)
+            )
+        try:
+            with connection:
+                connection.executemany(
+                    "INSERT OR REPLACE INTO entries "
+                    "(key, schema_version, expires_at, retain_until, written_at, size_bytes, value) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    rows,
+                )
+                connection.execute("DELETE FROM entries WHERE retain_until <= ?", (now,))
+                # Keep the most recently written rows whose cumulative size fits the budget.
+                connection.execute(
+                    "DELETE FROM entries WHERE key IN ("
+                    " SELECT key FROM ("
+                    "  SELECT key, SUM(size_bytes) OVER (ORDER BY written_at DESC, key) AS newer_bytes"
+                    "  FROM entries"
+                    " ) WHERE newer_bytes > ?"
+                    ")",
+                    (self.max_bytes,),
+                )
+        except sqlite3.Error:
+            logger.warning("Disk cache write of %d entries failed", len(rows), exc_info=True)
+            for _row in rows:
+                self._on_write("error")
+            return
+        for _row in rows:
+            self._on_write("written")
@@ -0,0 +1,177 @@
+import json
+import mmap
+import os
+import struct
+import tempfile
+import time
+from dataclasses import dataclass
+from urllib.parse import quote
+
+import numpy as np
+
+from price_history import PriceHistory
+
+
+_MAGIC = b"SAHIST01"
+_PREFIX = struct.Struct("<8sQ")
+_ALIGNMENT = 8
+# A temporary file this old was left by a crashed writer; live writes finish far sooner.
+_STALE_TEMPORARY_SECONDS = 3600
+_COLUMNS = (
+    ("epoch_days", np.int32),
+    ("open", np.float64),
+    ("close", np.float64),
+    ("low", np.float64),
+    ("high", np.float64),
+    ("volume", np.int64),
+    ("dividend", np.float64),
+    ("split_ratio", np.float64),
+)
+
+
+@dataclass(frozen=True)
+class ArchivedHistory:
+    history: PriceHistory
+    body: memoryview
+    gzip_body: memoryview | None
+    etag: str
+    fetched_at: float
+
+
+class HistoryArchive:
+    """Read-only columnar daily history files that processes on one host share via mmap."""
+
+    def __init__(self, directory, *, schema_version, max_bytes):
+        if max_bytes <= 0:
+            raise ValueError("max_bytes must be positive")
+        self.directory = directory
+        self.schema_version = schema_version
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+        self.prune()
+
+    def path_for(self, key):
+        return os.path.join(self.directory, quote(key, safe="") + ".hist")
+
+    def read(self, key):
+        """Map the archived entry for `key`, or return None if it is absent or foreign."""
+        try:
+            with open(self.path_for(key), "rb") as file:
+                mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (FileNotFoundError, ValueError):
+            # mmap raises ValueError for an empty file.
+            return None
+        magic, header_length = _PREFIX.unpack_from(mapped, 0)
+        if magic != _MAGIC:
+            raise ValueError(f"{self.path_for(key)} is not a history archive")
+        header = json.loads(mapped[_PREFIX.size : _PREFIX.size + header_length])
+        if header["schema_version"] != self.schema_version or header["key"] != key:
+            return None
+        bars = header["bars"]
+        sections = header["sections"]
+        columns = [
+            np.frombuffer(mapped, dtype=dtype, count=bars, offset=sections[name][0])
+            for name, dtype in _COLUMNS
+        ]
+        view = memoryview(mapped)
+        body_offset, body_length = sections["body"]
+        gzip_section = sections.get("gzip_body")
+        return ArchivedHistory(
+            history=PriceHistory(*columns, timezone=header["timezone"]),
+            body=view[body_offset : body_offset + body_length],
+            gzip_body=(
+                None
+                if gzip_section is None
+                else view[gzip_section[0] : gzip_section[0] + gzip_section[1]]
+            ),
+            etag=header["etag"],
+            fetched_at=header["fetched_at"],
+        )
+
+    def write(self, key, history, body, gzip_body, etag, fetched_at):
+        """Atomically replace the archived entry for `key`."""
+        if history.timestamp is not None:
+            raise ValueError("only daily price histories can be archived")
+        sections = [
+            (name, getattr(history, name).astype(dtype, copy=False).tobytes())
+            for name, dtype in _COLUMNS
+        ]
+        sections.append(("body", bytes(body)))
+        if gzip_body is not None:
+            sections.append(("gzip_body", bytes(gzip_body)))
+
+        header = {
+            "schema_version": self.schema_version,
+            "key": key,
+            "bars": len(history),
+            "timezone": history.timezone,
+            "etag": etag,
+            "fetched_at": fetched_at,
+            "sections": {},
+        }
+        # Section offsets depend on the header length, which depends on the offsets, so
+        # reserve generous fixed-width room for the offset digits before laying out data.
+        header["sections"] = {name: [10**15, len(data)] for name, data in sections}
+        data_start = _aligned(_PREFIX.size + len(json.dumps(header).encode()))
+        offset = data_start
+        for name, data in sections:
+            header["sections"][name] = [offset, len(data)]
+            offset = _aligned(offset + len(data))
+        encoded_header = json.dumps(header).encode()
+
+        descriptor, temporary_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(descriptor, "wb") as file:
+                file.write(_PREFIX.pack(_MAGIC, len(encoded_header)))
+                file.write(encoded_header)
+                for name, data in sections:
+                    file.seek(header["sections"][name][0])
+                    file.write(data)
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(temporary_path, self.path_for(key))
+        except BaseException:
+            try:
+                os.unlink(temporary_path)
+            except FileNotFoundError:
+                pass
+            raise
+        self.prune(keep=self.path_for(key))
+
+    def prune(self, keep=None):
+        """Delete abandoned temporary files and the oldest archives beyond `max_bytes`."""
+        files = []
+        abandoned = []
+        abandoned_before = time.time() - _STALE_TEMPORARY_SECONDS
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if not entry.name.endswith((".hist", ".tmp")):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                if entry.name.endswith(".hist"):
+                    files.append((stat.st_mtime_ns, entry.path, stat.st_size))
+                elif stat.st_mtime < abandoned_before:
+                    abandoned.append(entry.path)
+        total = sum(size for _mtime, _path, size in files)
+        for _mtime, path, size in sorted(files):
+            if total <= self.max_bytes:
+                break
+            if path != keep:
+                abandoned.append(path)
+                total -= size
+        deleted = 0
+        for path in abandoned:
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                # Another process sharing the directory deleted it first.
+                continue
+            deleted += 1
+        return deleted
+
+
+def _aligned(offset):
+    return (offset + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
@@ -0,0 +1,165 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from datetime import time as time_of_day
+from zoneinfo import ZoneInfo
+
+
+# Regular sessions of the exchanges the adapter mostly serves, keyed by the IANA
+# timezone Yahoo reports for them. A calendar file can replace or add entries.
+DEFAULT_SESSIONS = {
+    "America/New_York": ("09:30", "16:00"),
+    "America/Toronto": ("09:30", "16:00"),
+    "Europe/London": ("08:00", "16:30"),
+    "Europe/Warsaw": ("09:00", "17:00"),
+    "Europe/Berlin": ("09:00", "17:30"),
+    "Europe/Paris": ("09:00", "17:30"),
+    "Europe/Amsterdam": ("09:00", "17:30"),
+    "Europe/Zurich": ("09:00", "17:30"),
+    "Asia/Tokyo": ("09:00", "15:30"),
+    "Asia/Hong_Kong": ("09:30", "16:00"),
+    "Australia/Sydney": ("10:00", "16:00"),
+}
+# Quote types that trade around the clock or nearly so keep their fixed TTLs.
+ALWAYS_OPEN_QUOTE_TYPES = {"CRYPTOCURRENCY", "CURRENCY", "FUTURE"}
+# Searching further than this for the next open means the calendar is unusable.
+_MAX_CLOSED_DAYS = 14
+
+
+@dataclass(frozen=True)
+class TradingSession:
+    timezone: ZoneInfo
+    open: time_of_day
+    close: time_of_day
+    holidays: frozenset = frozenset()
+
+    @classmethod
+    def parse(cls, timezone, open, close, holidays=()):
+        session = cls(
+            ZoneInfo(timezone),
+            time_of_day.fromisoformat(open),
+            time_of_day.fromisoformat(close),
+            frozenset(date.fromisoformat(holiday) for holiday in holidays),
+        )
+        if session.open >= session.close:
+            raise ValueError(f"{timezone} session must open before it closes")
+        return session
+
+    def trades_on(self, day):
+        return day.weekday() < 5 and day not in self.holidays
+
+    def opens_on(self, day):
+        return datetime.combine(day, self.open, tzinfo=self.timezone)
+
+    def closes_on(self, day):
+        return datetime.combine(day, self.close, tzinfo=self.timezone)
+
+    def next_open(self, after, skip_day=None):
+        day = after.date()
+        for _ in range(_MAX_CLOSED_DAYS):
+            opens = self.opens_on(day)
+            if opens > after and day != skip_day and self.trades_on(day):
+                return opens
+            day += timedelta(days=1)
+        return None
+
+
+@dataclass(frozen=True)
+class _Market:
+    timezone: str | None
+    always_open: bool
+    market_time: int | None
+    observed_at: float
+
+
+class MarketSessions:
+    """Decide how long market data stays fresh from its exchange's trading session."""
+
+    def __init__(
+        self,
+        sessions,
+        *,
+        settle_seconds,
+        holiday_grace_seconds,
+        max_extension_seconds,
+        max_symbols,
+        clock=time.time,
+    ):
+        self.sessions = dict(sessions)
+        self.settle_seconds = settle_seconds
+        self.holiday_grace_seconds = holiday_grace_seconds
+        self.max_extension_seconds = max_extension_seconds
+        self.max_symbols = max_symbols
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._markets = OrderedDict()
+
+    def observe(self, symbol, timezone, quote_type, market_time):
+        market = _Market(
+            timezone=timezone if isinstance(timezone, str) else None,
+            always_open=quote_type in ALWAYS_OPEN_QUOTE_TYPES,
+            market_time=market_time,
+            observed_at=self._clock(),
+        )
+        with self._lock:
+            self._markets[symbol] = market
+            self._markets.move_to_end(symbol)
+            while len(self._markets) > self.max_symbols:
+                self._markets.popitem(last=False)
+
+    def fresh_until(self, symbol, fetched_at, ttl):
+        """Return when data fetched at `fetched_at` expires and the decision behind it."""
+        expires_at = fetched_at + ttl
+        decision, next_open = self.session_state(symbol, fetched_at)
+        if decision in ("open", "always_open", "unknown"):
+            return expires_at, decision
+        if next_open is None or self.max_extension_seconds == 0:
+            return expires_at, "unknown"
+        extended = min(next_open, fetched_at + self.max_extension_seconds)
+        return max(expires_at, extended), decision
+
+    def session_state(self, symbol, at):
+        """Return the market state of `symbol` at `at` and its next regular open."""
+        with self._lock:
+            market = self._markets.get(symbol)
+        if market is None:
+            return "unknown", None
+        if market.always_open:
+            return "always_open", None
+        session = self.sessions.get(market.timezone)
+        if session is None:
+            return "unknown", None
+
+        local = datetime.fromtimestamp(at, session.timezone)
+        day = local.date()
+        decision = "closed"
+        skip_day = None
+        if session.trades_on(day):
+            opens = session.opens_on(day)
+            settled = session.closes_on(day) + timedelta(seconds=self.settle_seconds)
+            if opens <= local < settled:
+                if self._missed_open(market, opens):
+                    decision = "holiday"
+                    skip_day = day
+                else:
+                    decision = "open"
+        next_open = session.next_open(local, skip_day)
+        return decision, None if next_open is None else next_open.timestamp()
+
+    def regular_session(self, symbol):
+        """Return the trading session of `symbol`'s exchange, or None if it is unknown."""
+        with self._lock:
+            market = self._markets.get(symbol)
+        if market is None or market.always_open:
+            return None
+        return self.sessions.get(market.timezone)
+
+    def _missed_open(self, market, opens):
+        grace_ended = opens.timestamp() + self.holiday_grace_seconds
+        return (
+            market.market_time is not None
+            and market.observed_at >= grace_ended
+            and market.market_time < opens.timestamp()
+        )
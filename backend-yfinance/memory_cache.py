@@ -1,4 +1,7 @@
 import copy
+import functools
+import heapq
+import itertools
 import sys
 import threading
 import time
@@ -6,8 +9,19 @@ from collections import OrderedDict
 from dataclasses import dataclass, fields, is_dataclass
 
 
-# Conservative allowance for the OrderedDict node, _CacheEntry, expiry float and size integer.
-_ENTRY_OVERHEAD_BYTES = 256
+# Conservative allowance for the OrderedDict node, _CacheEntry, expiry floats, size integer
+# and expiry heap item.
+_ENTRY_OVERHEAD_BYTES = 320
+# Reads drop at most this many ended retentions, so one read never pays for a mass expiry.
+_EXPIRY_BATCH = 32
+
+
+# Leaves that reference no other objects. Their size never needs the identity set.
+_ATOMIC_TYPES = (str, bytes, bytearray, int, float, complex, memoryview)
+# CPython stores a dataclass instance's attributes inline after the object, a pointer per
+# field plus a small header, and `sys.getsizeof` leaves them out.
+_INLINE_VALUES_HEADER_BYTES = 32
+_INLINE_VALUE_BYTES = 8
 
 
 def estimate_retained_bytes(value):
@@ -15,14 +29,20 @@ def estimate_retained_bytes(value):
     seen = set()
 
     def estimate(current):
+        if current is None or current is True or current is False:
+            return 0
+        if type(current) in _ATOMIC_TYPES:
+            return sys.getsizeof(current)
         identity = id(current)
         if identity in seen:
             return 0
         seen.add(identity)
 
         size = sys.getsizeof(current)
-        if is_dataclass(current) and not isinstance(current, type):
-            return size + sum(estimate(getattr(current, field.name)) for field in fields(current))
+        layout = _dataclass_layout(type(current))
+        if layout is not None:
+            names, inline_bytes = layout
+            return size + inline_bytes + sum(estimate(getattr(current, name)) for name in names)
         if isinstance(current, dict):
             return size + sum(estimate(key) + estimate(item) for key, item in current.items())
         if isinstance(current, (list, tuple, set, frozenset)):
@@ -32,6 +52,15 @@ def estimate_retained_bytes(value):
     return estimate(value)
 
 
+@functools.cache
+def _dataclass_layout(cls):
+    """Return a dataclass type's `(field names, inline attribute bytes)`, or None."""
+    if not is_dataclass(cls):
+        return None
+    names = tuple(field.name for field in fields(cls))
+    return names, _INLINE_VALUES_HEADER_BYTES + _INLINE_VALUE_BYTES * len(names)
+
+
 def estimate_cache_entry_bytes(key, value):
     """Include the key and an allowance for the OrderedDict node and entry metadata."""
     return _ENTRY_OVERHEAD_BYTES + estimate_retained_bytes(key) + estimate_retained_bytes(value)
@@ -40,7 +69,9 @@ def estimate_cache_entry_bytes(key, value):
 @dataclass(frozen=True)
 class _CacheEntry:
     value: object
+    stored_at: float
     expires_at: float
+    retain_until: float
     size_bytes: int
 
 
@@ -55,6 +86,7 @@ class ByteBoundedTTLCache:
         clock=time.monotonic,
         size_of=estimate_cache_entry_bytes,
         clone=copy.copy,
+        on_evict=None,
     ):
         if max_bytes < 0:
             raise ValueError("max_bytes must be non-negative")
@@ -65,22 +97,58 @@ class ByteBoundedTTLCache:
         self._clock = clock
         self._size_of = size_of
         self._clone = clone
+        # Called under the cache lock for retention ends and budget evictions, so it must
+        # not call back into this cache.
+        self._on_evict = on_evict or (lambda _key, _value: None)
         self._entries = OrderedDict()
+        # (retain_until, sequence, key, entry); items of replaced entries are skipped.
+        self._expiry_heap = []
+        self._sequence = itertools.count()
         self._total_bytes = 0
         self._lock = threading.Lock()
 
     def get(self, key):
         now = self._clock()
         with self._lock:
-            self._remove_expired(now)
+            self._remove_expired(now, _EXPIRY_BATCH)
             entry = self._entries.get(key)
-            if entry is None:
+            if entry is None or entry.expires_at <= now:
                 return None
             self._entries.move_to_end(key)
             value = entry.value
         return self._clone(value)
 
-    def set(self, key, value, ttl):
+    def get_stale(self, key):
+        """Return a retained value even after its TTL, without promoting it in LRU order."""
+        now = self._clock()
+        with self._lock:
+            entry = self._retained(key, now)
+            if entry is None:
+                return None
+            value = entry.value
+        return self._clone(value)
+
+    def get_expired_for(self, key):
+        """Return a retained `(value, seconds past its TTL)` pair without promoting it in LRU order."""
+        now = self._clock()
+        with self._lock:
+            entry = self._retained(key, now)
+            if entry is None:
+                return None
+            value = entry.value
+            expired_for = max(0.0, now - entry.expires_at)
+        return self._clone(value), expired_for
+
+    def expiry(self, key):
+        """Return a fresh entry's `(seconds until its TTL ends, TTL it was stored with)`."""
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.expires_at <= now:
+                return None
+            return entry.expires_at - now, entry.expires_at - entry.stored_at
+
+    def set(self, key, value, ttl, stale_seconds=0):
         if ttl <= 0 or self.max_bytes == 0 or self.max_entries == 0:
             now = self._clock()
             with self._lock:
@@ -98,24 +166,33 @@ class ByteBoundedTTLCache:
             if size_bytes > self.max_bytes:
                 return False
 
-            self._entries[key] = _CacheEntry(
+            entry = _CacheEntry(
                 value=stored_value,
+                stored_at=now,
                 expires_at=now + ttl,
+                retain_until=now + ttl + max(0, stale_seconds),
                 size_bytes=size_bytes,
             )
+            self._entries[key] = entry
             self._total_bytes += size_bytes
+            heapq.heappush(
+                self._expiry_heap, (entry.retain_until, next(self._sequence), key, entry)
+            )
+            self._compact_expiry_heap()
             self._evict_to_budget()
             return key in self._entries
 
     def contains(self, key):
         now = self._clock()
         with self._lock:
-            self._remove_expired(now)
-            return key in self._entries
+            self._remove_expired(now, _EXPIRY_BATCH)
+            entry = self._entries.get(key)
+            return entry is not None and entry.expires_at > now
 
     def clear(self):
         with self._lock:
             self._entries.clear()
+            self._expiry_heap.clear()
             self._total_bytes = 0
 
     @property
@@ -136,17 +213,44 @@ class ByteBoundedTTLCache:
             self._remove_expired(now)
             return len(self._entries)
 
-    def _remove_expired(self, now):
-        expired = [key for key, entry in self._entries.items() if entry.expires_at <= now]
-        for key in expired:
+    def _remove_expired(self, now, limit=None):
+        heap = self._expiry_heap
+        removed = 0
+        while heap and heap[0][0] <= now and (limit is None or removed < limit):
+            _retain_until, _sequence, key, entry = heapq.heappop(heap)
+            if self._entries.get(key) is entry:
+                self._remove(key)
+                self._on_evict(key, entry.value)
+                removed += 1
+
+    def _retained(self, key, now):
+        """Return the entry for `key` unless its retention has ended, dropping it if so."""
+        self._remove_expired(now, _EXPIRY_BATCH)
+        entry = self._entries.get(key)
+        if entry is not None and entry.retain_until <= now:
+            # Its heap item is skipped once popped, because the key no longer maps to it.
             self._remove(key)
+            self._on_evict(key, entry.value)
+            return None
+        return entry
+
+    def _compact_expiry_heap(self):
+        # Replaced and evicted entries leave their items behind until their retention ends.
+        if len(self._expiry_heap) > 2 * len(self._entries) + 64:
+            self._expiry_heap = [
+                (entry.retain_until, next(self._sequence), key, entry)
+                for key, entry in self._entries.items()
+            ]
+            heapq.heapify(self._expiry_heap)
 
     def _remove(self, key):
         entry = self._entries.pop(key, None)
         if entry is not None:
             self._total_bytes -= entry.size_bytes
+        return entry
 
     def _evict_to_budget(self):
         while len(self._entries) > self.max_entries or self._total_bytes > self.max_bytes:
-            _key, entry = self._entries.popitem(last=False)
+            key, entry = self._entries.popitem(last=False)
             self._total_bytes -= entry.size_bytes
+            self._on_evict(key, entry.value)
@@ -14,6 +14,16 @@ _DURATION_BUCKETS = (
     ("10", 10.0),
     ("30", 30.0),
 )
+_BATCH_SIZE_BUCKETS = (("1", 1), ("2", 2), ("3", 3), ("5", 5), ("10", 10), ("20", 20))
+_BATCH_WAIT_BUCKETS = (
+    ("0.001", 0.001),
+    ("0.0025", 0.0025),
+    ("0.005", 0.005),
+    ("0.01", 0.01),
+    ("0.025", 0.025),
+    ("0.05", 0.05),
+    ("0.1", 0.1),
+)
 
 
 class AdapterMetrics:
@@ -29,6 +39,32 @@ class AdapterMetrics:
             self._http_duration_sums = defaultdict(float)
             self._http_duration_buckets = defaultdict(lambda: [0] * len(_DURATION_BUCKETS))
             self._cache_lookups = defaultdict(int)
+            self._history_cache_hits = defaultdict(int)
+            self._disk_cache_lookups = defaultdict(int)
+            self._disk_cache_writes = defaultdict(int)
+            self._history_archive_lookups = defaultdict(int)
+            self._history_archive_writes = defaultdict(int)
+            self._history_incremental_refreshes = defaultdict(int)
+            self._batch_symbols = defaultdict(int)
+            self._stale_responses = defaultdict(int)
+            self._stale_refreshes = defaultdict(int)
+            self._refresh_ahead = defaultdict(int)
+            self._warmup_loads = defaultdict(int)
+            self._session_ttl_decisions = defaultdict(int)
+            self._adaptive_ttl_loads = defaultdict(int)
+            self._negative_cache_hits = defaultdict(int)
+            self._session_ttl_seconds = defaultdict(float)
+            self._warmup_duration_seconds = None
+            self._info_batch_sizes = [0] * len(_BATCH_SIZE_BUCKETS)
+            self._info_batch_size_sum = 0
+            self._info_batch_count = 0
+            self._info_batch_waits = [0] * len(_BATCH_WAIT_BUCKETS)
+            self._info_batch_wait_sum = 0.0
+            self._info_batch_wait_count = 0
+            self._compression_input_bytes = defaultdict(int)
+            self._compression_output_bytes = defaultdict(int)
+            self._compression_cpu_seconds = defaultdict(float)
+            self._response_encodings = defaultdict(int)
             self._bulkhead_rejections = 0
             self._circuit_rejections = 0
             self._circuit_transitions = defaultdict(int)
@@ -48,6 +84,88 @@ class AdapterMetrics:
         with self._lock:
             self._cache_lookups[(cache, result)] += 1
 
+    def record_disk_cache_lookup(self, result):
+        with self._lock:
+            self._disk_cache_lookups[result] += 1
+
+    def record_disk_cache_write(self, result):
+        with self._lock:
+            self._disk_cache_writes[result] += 1
+
+    def record_history_archive_lookup(self, result):
+        with self._lock:
+            self._history_archive_lookups[result] += 1
+
+    def record_history_archive_write(self, result):
+        with self._lock:
+            self._history_archive_writes[result] += 1
+
+    def record_history_cache_hit(self, match):
+        with self._lock:
+            self._history_cache_hits[match] += 1
+
+    def record_history_incremental_refresh(self, outcome):
+        with self._lock:
+            self._history_incremental_refreshes[outcome] += 1
+
+    def record_batch_symbol(self, cache, source):
+        with self._lock:
+            self._batch_symbols[(cache, source)] += 1
+
+    def record_stale_response(self, cache, reason):
+        with self._lock:
+            self._stale_responses[(cache, reason)] += 1
+
+    def record_stale_refresh(self, cache, outcome):
+        with self._lock:
+            self._stale_refreshes[(cache, outcome)] += 1
+
+    def record_refresh_ahead(self, cache, outcome):
+        with self._lock:
+            self._refresh_ahead[(cache, outcome)] += 1
+
+    def record_adaptive_ttl(self, cache, content):
+        with self._lock:
+            self._adaptive_ttl_loads[(cache, content)] += 1
+
+    def record_negative_cache_hit(self, cache):
+        with self._lock:
+            self._negative_cache_hits[cache] += 1
+
+    def record_session_ttl(self, cache, decision, seconds):
+        with self._lock:
+            self._session_ttl_decisions[(cache, decision)] += 1
+            self._session_ttl_seconds[(cache, decision)] += max(0.0, float(seconds))
+
+    def record_warmup_load(self, cache, outcome):
+        with self._lock:
+            self._warmup_loads[(cache, outcome)] += 1
+
+    def record_warmup_duration(self, seconds):
+        with self._lock:
+            self._warmup_duration_seconds = max(0.0, float(seconds))
+
+    def record_info_batch(self, size, wait_seconds):
+        with self._lock:
+            _observe(self._info_batch_sizes, _BATCH_SIZE_BUCKETS, size)
+            self._info_batch_size_sum += size
+            self._info_batch_count += 1
+            for wait in wait_seconds:
+                wait = max(0.0, float(wait))
+                _observe(self._info_batch_waits, _BATCH_WAIT_BUCKETS, wait)
+                self._info_batch_wait_sum += wait
+                self._info_batch_wait_count += 1
+
+    def record_compression(self, cache, input_bytes, output_bytes, cpu_seconds):
+        with self._lock:
+            self._compression_input_bytes[cache] += input_bytes
+            self._compression_output_bytes[cache] += output_bytes
+            self._compression_cpu_seconds[cache] += max(0.0, float(cpu_seconds))
+
+    def record_response_encoding(self, encoding):
+        with self._lock:
+            self._response_encodings[encoding] += 1
+
     def record_bulkhead_rejection(self):
         with self._lock:
             self._bulkhead_rejections += 1
@@ -68,6 +186,36 @@ class AdapterMetrics:
                 key: tuple(values) for key, values in self._http_duration_buckets.items()
             }
             cache_lookups = dict(self._cache_lookups)
+            history_cache_hits = dict(self._history_cache_hits)
+            disk_cache_lookups = dict(self._disk_cache_lookups)
+            disk_cache_writes = dict(self._disk_cache_writes)
+            history_archive_lookups = dict(self._history_archive_lookups)
+            history_archive_writes = dict(self._history_archive_writes)
+            history_incremental_refreshes = dict(self._history_incremental_refreshes)
+            batch_symbols = dict(self._batch_symbols)
+            stale_responses = dict(self._stale_responses)
+            stale_refreshes = dict(self._stale_refreshes)
+            refresh_ahead = dict(self._refresh_ahead)
+            warmup_loads = dict(self._warmup_loads)
+            session_ttl_decisions = dict(self._session_ttl_decisions)
+            adaptive_ttl_loads = dict(self._adaptive_ttl_loads)
+            negative_cache_hits = dict(self._negative_cache_hits)
+            session_ttl_seconds = dict(self._session_ttl_seconds)
+            warmup_duration_seconds = self._warmup_duration_seconds
+            info_batch_sizes = (
+                tuple(self._info_batch_sizes),
+                self._info_batch_size_sum,
+                self._info_batch_count,
+            )
+            info_batch_waits = (
+                tuple(self._info_batch_waits),
+                self._info_batch_wait_sum,
+                self._info_batch_wait_count,
+            )
+            compression_input_bytes = dict(self._compression_input_bytes)
+            compression_output_bytes = dict(self._compression_output_bytes)
+            compression_cpu_seconds = dict(self._compression_cpu_seconds)
+            response_encodings = dict(self._response_encodings)
             bulkhead_rejections = self._bulkhead_rejections
             circuit_rejections = self._circuit_rejections
             circuit_transitions = dict(self._circuit_transitions)
@@ -124,6 +272,272 @@ class AdapterMetrics:
                 f"{_labels(cache=cache, result=result)} {cache_lookups[key]}"
             )
 
+        lines.extend(
+            (
+                "# HELP stock_analyst_yfinance_disk_cache_lookups_total "
+                "Disk cache lookups after a memory miss.",
+                "# TYPE stock_analyst_yfinance_disk_cache_lookups_total counter",
+            )
+        )
+        for result in sorted(disk_cache_lookups):
+            lines.append(
+                "stock_analyst_yfinance_disk_cache_lookups_total"
+                f"{_labels(result=result)} {disk_cache_lookups[result]}"
+            )
+        lines.extend(
+            (
+                "# HELP stock_analyst_yfinance_disk_cache_writes_total Disk cache write-behind outcomes.",
+                "# TYPE stock_analyst_yfinance_disk_cache_writes_total counter",
+            )
+        )
+        for result in sorted(disk_cache_writes):
+            lines.append(
+                "stock_analyst_yfinance_disk_cache_writes_total"
+                f"{_labels(result=result)} {disk_cache_writes[result]}"
+            )
+
+        lines.extend(
+            (
+                "# HELP stock_analyst_yfinance_history_archive_lookups_total "
+                "Memory-mapped history archive lookups after a memory miss.",
+                "# TYPE stock_analyst_yfinance_history_archive_lookups_total counter",
+            )
+        )
+        for result in sorted(history_archive_lookups):
+            lines.append(
+                "stock_analyst_yfinance_history_archive_lookups_total"
+                f"{_labels(result=result)} {history_archive_lookups[result]}"
+            )
+        lines.extend(
+            (
+                "# HELP stock_analyst_yfinance_history_archive_writes_total History archive rebuild outcomes.",
+                "# TYPE stock_analyst_yfinance_history_archive_writes_total counter",
+            )
+        )
+        for result in sorted(history_archive_writes):
+            lines.append(
+                "stock_analyst_yfinance_history_archive_writes_total"
+                f"{_labels(result=result)} {history_archive_writes[result]}"
+            )
+
+        lines.extend(
+            (
+                "# HELP stock_analyst_yfinance_history_cache_hits_total "
+                "History served from an exact entry, an archive map, a longer period or resampled daily bars.",
+                "# TYPE stock_analyst_yfinance_history_cache_hits_total counter",
+            )
+        )
+        for match in sorted(history_cache_hits):
+            lines.append(
+                "stock_analyst_yfinance_history_cache_hits_total"
+                f"{_labels(match=match)} {history_cache_hits[match]}"
+            )
+
+        lines.extend(
+            (
+                "# HELP stock_analyst_yfinance_history_incremental_refreshes_total "
+                "Expired long history refresh attempts by tail outcome.",
+                "# TYPE stock_analyst_yfinance_history_incremental_refreshes_total counter",
+            )
+        )
+        for outcome in sorted(history_incremental_refreshes):
+            lines.append(
+                "stock_analyst_yfinance_history_incremental_refreshes_total"
+                f"{_labels(outcome=outcome)} {history_incremental_refreshes[outcome]}"
+            )
+
+        lines.extend(
+            (
+                "# HELP stock_analyst_yfinance_stale_responses_total "
+                "Expired entries served during a background refresh or instead of an upstream error.",
+                "# TYPE stock_analyst_yfinance_stale_responses_total counter",
+            )
+        )
+        for key in sorted(stale_responses):
+            cache, reason = key
+            lines.append(
+                "stock_analyst_yfinance_stale_responses_total"
+                f"{_labels(cache=cache, reason=reason)} {stale_responses[key]}"
+            )
+        lines.extend(
+            (
+                "# HELP stock_analyst_yfinance_stale_refreshes_total Background refresh outcomes.",
+                "# TYPE stock_analyst_yfinance_stale_refreshes_total counter",
+            )
+        )
+        for key in sorted(stale_refreshes):
+            cache, outcome = key
+            lines.append(
+                "stock_analyst_yfinance_stale_refreshes_total"
+                f"{_labels(cache=cache, outcome=outcome)} {stale_refreshes[key]}"
+            )
+        lines.extend(
+            (
+                "# HELP stock_analyst_yfinance_refresh_ahead_total "
+                "Refresh-ahead outcomes for hot entries nearing expiry.",
+                "# TYPE stock_analyst_yfinance_refresh_ahead_total counter",
+            )
+        )
+        for key in sorted(refresh_ahead):
+            cache, outcome = key
+            lines.append(
+                "stock_analyst_yfinance_refresh_ahead_total"
+                f"{_labels(cache=cache, outcome=outcome)} {refresh_ahead[key]}"
+            )
+
+        lines.extend(
+            (
+                "# HELP stock_analyst_yfinance_adaptive_ttl_loads_total "
+                "Cached upstream loads by content compared with the previous load.",
+                "# TYPE stock_analyst_yfinance_adaptive_ttl_loads_total counter",
+            )
+        )
+        for key in sorted(adaptive_ttl_loads):
+            cache, content = key
+            lines.append(
+                "stock_analyst_yfinance_adaptive_ttl_loads_total"
+                f"{_labels(cache=cache, content=content)} {adaptive_ttl_loads[key]}"
+            )
+        lines.extend(
+            (
+                "# HELP stock_analyst_yfinance_negative_cache_hits_total "
+                "Cache hits answered from an unknown-symbol or empty-history entry.",
+                "# TYPE stock_analyst_yfinance_negative_cache_hits_total counter",
+            )
+        )
+        for cache in sorted(negative_cache_hits):
+            lines.append(
+                "stock_analyst_yfinance_negative_cache_hits_total"
+                f"{_labels(cache=cache)} {negative_cache_hits[cache]}"
+            )
+        lines.extend(
+            (
+                "# HELP stock_analyst_yfinance_session_ttl_decisions_total "
+                "Effective TTL decisions by market session state.",
+                "# TYPE stock_analyst_yfinance_session_ttl_decisions_total counter",
+            )
+        )
+        for key in sorted(session_ttl_decisions):
+            cache, decision = key
+            lines.append(
+                "stock_analyst_yfinance_session_ttl_decisions_total"
+                f"{_labels(cache=cache, decision=decision)} {session_ttl_decisions[key]}"
+            )
+        lines.extend(
+            (
+                "# HELP stock_analyst_yfinance_session_ttl_seconds_total "
+                "Effective TTL seconds from fetch by market session state.",
+                "# TYPE stock_analyst_yfinance_session_ttl_seconds_total counter",
+            )
+        )
+        for key in sorted(session_ttl_seconds):
+            cache, decision = key
+            lines.append(
+                "stock_analyst_yfinance_session_ttl_seconds_total"
+                f"{_labels(cache=cache, decision=decision)} {session_ttl_seconds[key]}"
+            )
+
+        lines.extend(
+            (
+                "# HELP stock_analyst_yfinance_warmup_loads_total Startup warm-up loads by outcome.",
+                "# TYPE stock_analyst_yfinance_warmup_loads_total counter",
+            )
+        )
+        for key in sorted(warmup_loads):
+            cache, outcome = key
+            lines.append(
+                "stock_analyst_yfinance_warmup_loads_total"
+                f"{_labels(cache=cache, outcome=outcome)} {warmup_loads[key]}"
+            )
+        if warmup_duration_seconds is not None:
+            lines.extend(
+                (
+                    "# HELP stock_analyst_yfinance_warmup_duration_seconds "
+                    "Duration of the completed startup warm-up.",
+                    "# TYPE stock_analyst_yfinance_warmup_duration_seconds gauge",
+                    f"stock_analyst_yfinance_warmup_duration_seconds {warmup_duration_seconds}",
+                )
+            )
+
+        lines.extend(
+            (
+                "# HELP stock_analyst_yfinance_batch_symbols_total "
+                "Batch symbols served without Yahoo or loaded under a shared permit.",
+                "# TYPE stock_analyst_yfinance_batch_symbols_total counter",
+            )
+        )
+        for key in sorted(batch_symbols):
+            cache, source = key
+            lines.append(
+                "stock_analyst_yfinance_batch_symbols_total"
+                f"{_labels(cache=cache, source=source)} {batch_symbols[key]}"
+            )
+        lines.extend(
+            _histogram_lines(
+                "stock_analyst_yfinance_info_batch_size",
+                "Keys per dispatched info micro-batch.",
+                _BATCH_SIZE_BUCKETS,
+                *info_batch_sizes,
+            )
+        )
+        lines.extend(
+            _histogram_lines(
+                "stock_analyst_yfinance_info_batch_wait_seconds",
+                "Time an info miss waited for its micro-batch to dispatch.",
+                _BATCH_WAIT_BUCKETS,
+                *info_batch_waits,
+            )
+        )
+
+        lines.extend(
+            (
+                "# HELP stock_analyst_yfinance_compression_input_bytes_total "
+                "Encoded JSON bytes compressed into cached gzip variants.",
+                "# TYPE stock_analyst_yfinance_compression_input_bytes_total counter",
+            )
+        )
+        for cache in sorted(compression_input_bytes):
+            lines.append(
+                "stock_analyst_yfinance_compression_input_bytes_total"
+                f"{_labels(cache=cache)} {compression_input_bytes[cache]}"
+            )
+        lines.extend(
+            (
+                "# HELP stock_analyst_yfinance_compression_output_bytes_total "
+                "Gzip bytes produced for cached variants.",
+                "# TYPE stock_analyst_yfinance_compression_output_bytes_total counter",
+            )
+        )
+        for cache in sorted(compression_output_bytes):
+            lines.append(
+                "stock_analyst_yfinance_compression_output_bytes_total"
+                f"{_labels(cache=cache)} {compression_output_bytes[cache]}"
+            )
+        lines.extend(
+            (
+                "# HELP stock_analyst_yfinance_compression_cpu_seconds_total "
+                "Thread CPU time spent building gzip variants.",
+                "# TYPE stock_analyst_yfinance_compression_cpu_seconds_total counter",
+            )
+        )
+        for cache in sorted(compression_cpu_seconds):
+            lines.append(
+                "stock_analyst_yfinance_compression_cpu_seconds_total"
+                f"{_labels(cache=cache)} {compression_cpu_seconds[cache]:.9f}"
+            )
+        lines.extend(
+            (
+                "# HELP stock_analyst_yfinance_response_encodings_total "
+                "Cached-payload responses by content encoding.",
+                "# TYPE stock_analyst_yfinance_response_encodings_total counter",
+            )
+        )
+        for encoding in sorted(response_encodings):
+            lines.append(
+                "stock_analyst_yfinance_response_encodings_total"
+                f"{_labels(encoding=encoding)} {response_encodings[encoding]}"
+            )
+
         lines.extend(
             (
                 "# HELP stock_analyst_yfinance_bulkhead_rejections_total Rejected unique loaders.",
@@ -146,6 +560,24 @@ class AdapterMetrics:
         return "\n".join(lines) + "\n"
 
 
+def _observe(counts, buckets, value):
+    for index, (_label, upper_bound) in enumerate(buckets):
+        if value <= upper_bound:
+            counts[index] += 1
+
+
+def _histogram_lines(name, description, buckets, counts, total, count):
+    lines = [f"# HELP {name} {description}", f"# TYPE {name} histogram"]
+    lines.extend(
+        f"{name}_bucket{_labels(le=label)} {counts[index]}"
+        for index, (label, _upper_bound) in enumerate(buckets)
+    )
+    lines.append(f"{name}_bucket{_labels(le='+Inf')} {count}")
+    lines.append(f"{name}_sum {total}")
+    lines.append(f"{name}_count {count}")
+    return lines
+
+
 def _labels(**labels):
     values = [f'{name}="{_escape(value)}"' for name, value in labels.items()]
     return "{" + ",".join(values) + "}"
@@ -0,0 +1,75 @@
+import threading
+import time
+from dataclasses import dataclass, field
+
+from singleflight import _clone_exception
+
+
+@dataclass
+class _Batch:
+    loaders: dict = field(default_factory=dict)
+    submitted_at: dict = field(default_factory=dict)
+    completed: threading.Event = field(default_factory=threading.Event)
+    outcomes: dict = field(default_factory=dict)
+    error: BaseException | None = None
+
+
+class MicroBatcher:
+    """Collect distinct keys submitted within a short window and load them with one call."""
+
+    def __init__(self, window_seconds, max_size, load_batch, *, on_dispatch=None, clock=time.monotonic):
+        if window_seconds <= 0:
+            raise ValueError("window_seconds must be positive")
+        if max_size <= 0:
+            raise ValueError("max_size must be positive")
+        self.window_seconds = window_seconds
+        self.max_size = max_size
+        self._load_batch = load_batch
+        self._on_dispatch = on_dispatch or (lambda _size, _waits: None)
+        self._clock = clock
+        self._condition = threading.Condition()
+        self._open = None
+
+    def submit(self, key, loader):
+        with self._condition:
+            batch = self._open
+            leader = batch is None
+            if leader:
+                batch = _Batch()
+                self._open = batch
+            batch.loaders[key] = loader
+            batch.submitted_at[key] = self._clock()
+            if len(batch.loaders) >= self.max_size:
+                self._open = None
+                self._condition.notify_all()
+
+        if leader:
+            with self._condition:
+                self._condition.wait_for(lambda: self._open is not batch, self.window_seconds)
+                if self._open is batch:
+                    self._open = None
+            self._dispatch(batch)
+        else:
+            batch.completed.wait()
+
+        if batch.error is not None:
+            raise batch.error if leader else _clone_exception(batch.error)
+        outcome = batch.outcomes.get(key)
+        if key not in batch.outcomes:
+            outcome = RuntimeError(f"Micro-batch loader returned nothing for key: {key}")
+        if isinstance(outcome, BaseException):
+            raise outcome
+        return outcome
+
+    def _dispatch(self, batch):
+        dispatched_at = self._clock()
+        self._on_dispatch(
+            len(batch.loaders),
+            [dispatched_at - submitted_at for submitted_at in batch.submitted_at.values()],
+        )
+        try:
+            batch.outcomes = self._load_batch(dict(batch.loaders))
+        except BaseException as error:
+            batch.error = error
+        finally:
+            batch.completed.set()
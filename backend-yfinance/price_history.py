@@ -0,0 +1,263 @@
+import mmap
+import sys
+from dataclasses import dataclass
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class HistoricalPrice:
+    date: str
+    open: float
+    close: float
+    low: float
+    high: float
+    volume: int
+    dividend: float
+    timestamp: int | None = None
+    splitRatio: float | None = None
+
+
+class PriceHistory:
+    """Immutable columnar price history backed by read-only NumPy arrays."""
+
+    __slots__ = (
+        "epoch_days",
+        "open",
+        "close",
+        "low",
+        "high",
+        "volume",
+        "dividend",
+        "split_ratio",
+        "timestamp",
+        "timezone",
+    )
+
+    def __init__(
+        self,
+        epoch_days,
+        open,
+        close,
+        low,
+        high,
+        volume,
+        dividend,
+        split_ratio,
+        timestamp=None,
+        timezone=None,
+    ):
+        self.epoch_days = _read_only(epoch_days, np.int32)
+        self.open = _read_only(open, np.float64)
+        self.close = _read_only(close, np.float64)
+        self.low = _read_only(low, np.float64)
+        self.high = _read_only(high, np.float64)
+        self.volume = _read_only(volume, np.int64)
+        self.dividend = _read_only(dividend, np.float64)
+        self.split_ratio = _read_only(split_ratio, np.float64)
+        self.timestamp = None if timestamp is None else _read_only(timestamp, np.int64)
+        self.timezone = timezone
+        lengths = {len(column) for column in self._columns()}
+        if len(lengths) > 1:
+            raise ValueError("price history columns must have equal lengths")
+
+    @classmethod
+    def empty(cls, timezone=None):
+        return cls(*([()] * 8), timezone=timezone)
+
+    @classmethod
+    def concatenate(cls, histories):
+        """Join histories in order; all must be daily or all intraday."""
+        histories = list(histories)
+        if not histories:
+            return cls.empty()
+        if len({history.timestamp is None for history in histories}) > 1:
+            raise ValueError("cannot concatenate daily and intraday price histories")
+        columns = zip(*(history._columns() for history in histories))
+        merged = [np.concatenate(parts) for parts in columns]
+        return cls(
+            *merged[:8],
+            timestamp=merged[8] if len(merged) > 8 else None,
+            timezone=next(
+                (history.timezone for history in reversed(histories) if history.timezone), None
+            ),
+        )
+
+    def aggregate(self, buckets, labels=None):
+        """Aggregate bars into the bucket `labels`, given each bar's bucket label."""
+        if not len(self):
+            return self
+        buckets = np.asarray(buckets)
+        if labels is None:
+            labels = np.unique(buckets)
+        starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+        ends = np.r_[starts[1:], len(self)] - 1
+        split_ratio = np.multiply.reduceat(np.nan_to_num(self.split_ratio, nan=1.0), starts)
+
+        positions = np.searchsorted(labels, buckets[starts])
+        filled = np.zeros(len(labels), dtype=bool)
+        filled[positions] = True
+        # For an empty label, `source` points at the last label that has bars.
+        source = np.maximum.accumulate(np.where(filled, np.arange(len(labels)), 0))
+
+        def spread(values, empty):
+            column = np.full(len(labels), empty, dtype=values.dtype)
+            column[positions] = values
+            return column
+
+        close = spread(self.close[ends], np.nan)[source]
+        intraday = self.timestamp is not None
+        return PriceHistory(
+            epoch_days=spread(self.epoch_days[starts], 0)[source] if intraday else labels,
+            open=np.where(filled, spread(self.open[starts], np.nan), close),
+            close=close,
+            low=np.where(filled, spread(np.minimum.reduceat(self.low, starts), np.nan), close),
+            high=np.where(filled, spread(np.maximum.reduceat(self.high, starts), np.nan), close),
+            volume=spread(np.add.reduceat(self.volume, starts), 0),
+            dividend=spread(np.add.reduceat(self.dividend, starts), 0.0),
+            split_ratio=spread(np.where(split_ratio == 1.0, np.nan, split_ratio), np.nan),
+            timestamp=labels if intraday else None,
+            timezone=self.timezone,
+        )
+
+    def _columns(self):
+        columns = [
+            self.epoch_days,
+            self.open,
+            self.close,
+            self.low,
+            self.high,
+            self.volume,
+            self.dividend,
+            self.split_ratio,
+        ]
+        if self.timestamp is not None:
+            columns.append(self.timestamp)
+        return columns
+
+    @property
+    def nbytes(self):
+        return sum(column.nbytes for column in self._columns())
+
+    def dates(self):
+        """Return exchange-local bar dates as ISO strings."""
+        return np.datetime_as_string(self.epoch_days.astype("datetime64[D]")).tolist()
+
+    def records(self):
+        """Return JSON-ready bar dictionaries, omitting absent timestamps and split ratios."""
+        records = [
+            {
+                "date": date,
+                "open": open_price,
+                "close": close_price,
+                "low": low_price,
+                "high": high_price,
+                "volume": volume,
+                "dividend": dividend,
+            }
+            for date, open_price, close_price, low_price, high_price, volume, dividend in zip(
+                self.dates(),
+                self.open.tolist(),
+                self.close.tolist(),
+                self.low.tolist(),
+                self.high.tolist(),
+                self.volume.tolist(),
+                self.dividend.tolist(),
+            )
+        ]
+        if self.timestamp is not None:
+            for record, timestamp in zip(records, self.timestamp.tolist()):
+                record["timestamp"] = timestamp
+        for position in np.flatnonzero(~np.isnan(self.split_ratio)).tolist():
+            records[position]["splitRatio"] = float(self.split_ratio[position])
+        return records
+
+    def __len__(self):
+        return len(self.epoch_days)
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return PriceHistory(
+                *(column[item] for column in self._columns()[:8]),
+                timestamp=None if self.timestamp is None else self.timestamp[item],
+                timezone=self.timezone,
+            )
+        position = range(len(self))[item]
+        split_ratio = float(self.split_ratio[position])
+        return HistoricalPrice(
+            date=str(self.epoch_days[position].astype("datetime64[D]")),
+            open=float(self.open[position]),
+            close=float(self.close[position]),
+            low=float(self.low[position]),
+            high=float(self.high[position]),
+            volume=int(self.volume[position]),
+            dividend=float(self.dividend[position]),
+            timestamp=None if self.timestamp is None else int(self.timestamp[position]),
+            splitRatio=None if np.isnan(split_ratio) else split_ratio,
+        )
+
+    def __iter__(self):
+        return (self[position] for position in range(len(self)))
+
+    def detached(self):
+        """Return this history with in-heap columns that no longer pin a larger array."""
+        columns = [_owned(column) for column in self._columns()]
+        if all(owned is column for owned, column in zip(columns, self._columns())):
+            return self
+        return PriceHistory(
+            *columns[:8],
+            timestamp=columns[8] if len(columns) > 8 else None,
+            timezone=self.timezone,
+        )
+
+    def __copy__(self):
+        # The arrays are read-only, so a copy only needs its own wrapper.
+        return self[:]
+
+    def __sizeof__(self):
+        # Columns mapped from a history archive live in the shared page cache, not the heap,
+        # but their array headers do not.
+        return object.__sizeof__(self) + sum(
+            _COLUMN_HEADER_BYTES + (0 if _is_externally_backed(column) else column.nbytes)
+            for column in self._columns()
+        )
+
+    def __reduce__(self):
+        return (
+            PriceHistory,
+            (*self._columns()[:8], self.timestamp, self.timezone),
+        )
+
+    def __repr__(self):
+        return f"PriceHistory(bars={len(self)}, timezone={self.timezone!r})"
+
+
+# Each column is a read-only view over the array holding its values: two array headers.
+_COLUMN_HEADER_BYTES = 2 * sys.getsizeof(np.empty(0))
+
+
+def _owned(column):
+    root = column
+    while isinstance(root.base, np.ndarray):
+        root = root.base
+    # Archive maps stay views, because the page cache holds their pages anyway.
+    if root.nbytes <= column.nbytes or _is_externally_backed(column):
+        return column
+    return column.copy()
+
+
+def _is_externally_backed(array):
+    base = array.base
+    while isinstance(base, np.ndarray):
+        base = base.base
+    return isinstance(base, (memoryview, mmap.mmap))
+
+
+def _read_only(values, dtype):
+    array = np.asarray(values, dtype=dtype)
+    if array.ndim != 1:
+        raise ValueError("price history columns must be one-dimensional")
+    if array.flags.writeable:
+        array = array.view()
+        array.flags.writeable = False
+    return array
@@ -0,0 +1,164 @@
+import logging
+import random
+import threading
+import time
+from dataclasses import dataclass
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _TrackedKey:
+    loader: object
+    score: float
+    touched_at: float
+    jitter: float
+
+
+class RefreshAheadScheduler:
+    """Reload frequently read cache entries shortly before they expire."""
+
+    def __init__(
+        self,
+        refresh,
+        expiry,
+        *,
+        budget_per_minute,
+        min_hits,
+        lead_fraction,
+        jitter_fraction,
+        min_lead_seconds,
+        half_life_seconds,
+        max_keys,
+        interval_seconds=1.0,
+        on_outcome=None,
+        clock=time.monotonic,
+        random=random.random,
+    ):
+        if budget_per_minute <= 0:
+            raise ValueError("budget_per_minute must be positive")
+        if min_hits <= 0:
+            raise ValueError("min_hits must be positive")
+        if half_life_seconds <= 0:
+            raise ValueError("half_life_seconds must be positive")
+        if interval_seconds <= 0:
+            raise ValueError("interval_seconds must be positive")
+        self.budget_per_minute = budget_per_minute
+        self.min_hits = min_hits
+        self.lead_fraction = lead_fraction
+        self.jitter_fraction = jitter_fraction
+        self.min_lead_seconds = min_lead_seconds
+        self.half_life_seconds = half_life_seconds
+        self.max_keys = max_keys
+        self.interval_seconds = interval_seconds
+        self._refresh = refresh
+        self._expiry = expiry
+        self._on_outcome = on_outcome or (lambda _key, _outcome: None)
+        self._clock = clock
+        self._random = random
+        self._lock = threading.Lock()
+        self._keys = {}
+        self._tokens = float(budget_per_minute)
+        self._tokens_at = clock()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def record(self, key, loader):
+        now = self._clock()
+        with self._lock:
+            tracked = self._keys.get(key)
+            if tracked is None:
+                if len(self._keys) >= self.max_keys:
+                    self._drop_coldest(now)
+                self._keys[key] = _TrackedKey(loader, 1.0, now, self._random())
+                return
+            tracked.score = self._decayed(tracked, now) + 1.0
+            tracked.touched_at = now
+            tracked.loader = loader
+
+    def run_once(self):
+        """Refresh every hot key that is due, hottest first, within budget and capacity."""
+        now = self._clock()
+        with self._lock:
+            self._refill(now)
+            candidates = []
+            for key, tracked in list(self._keys.items()):
+                score = self._decayed(tracked, now)
+                if score < 0.5:
+                    # Cold enough that one more read would not make it hot again soon.
+                    del self._keys[key]
+                elif score >= self.min_hits:
+                    candidates.append((score, key, tracked))
+        candidates.sort(key=lambda candidate: candidate[0], reverse=True)
+
+        refreshed = 0
+        for _score, key, tracked in candidates:
+            expiry = self._expiry(key)
+            if expiry is None:
+                # Absent or expired entries are left to the next read.
+                continue
+            remaining, ttl = expiry
+            lead = ttl * self.lead_fraction * (1.0 + self.jitter_fraction * tracked.jitter)
+            if remaining > max(self.min_lead_seconds, lead):
+                continue
+            with self._lock:
+                if self._tokens < 1.0:
+                    self._on_outcome(key, "budget_exhausted")
+                    break
+                self._tokens -= 1.0
+            try:
+                started = self._refresh(key, tracked.loader)
+            except Exception:
+                logger.warning("Refresh-ahead load failed for %s", key, exc_info=True)
+                self._on_outcome(key, "error")
+                with self._lock:
+                    # Forget the key so it has to prove it is hot again before a retry.
+                    self._keys.pop(key, None)
+                continue
+            if not started:
+                with self._lock:
+                    self._tokens += 1.0
+                self._on_outcome(key, "deferred")
+                break
+            refreshed += 1
+            self._on_outcome(key, "refreshed")
+            with self._lock:
+                # A new draw per refresh keeps entries loaded together from expiring in sync.
+                tracked.jitter = self._random()
+        return refreshed
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="refresh-ahead", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+
+    @property
+    def tracked_count(self):
+        with self._lock:
+            return len(self._keys)
+
+    def _run(self):
+        while not self._stopped.wait(self.interval_seconds):
+            try:
+                self.run_once()
+            except Exception:
+                logger.exception("Refresh-ahead round failed")
+
+    def _decayed(self, tracked, now):
+        return tracked.score * 0.5 ** ((now - tracked.touched_at) / self.half_life_seconds)
+
+    def _refill(self, now):
+        elapsed = max(0.0, now - self._tokens_at)
+        self._tokens = min(
+            float(self.budget_per_minute), self._tokens + elapsed * self.budget_per_minute / 60
+        )
+        self._tokens_at = now
+
+    def _drop_coldest(self, now):
+        coldest = min(self._keys, key=lambda key: self._decayed(self._keys[key], now))
+        del self._keys[coldest]
@@ -55,6 +55,64 @@ class SingleFlight:
             return self._run_leader(key, flight, loader)
         return self._wait_for_leader(flight)
 
+    def call_many(self, keys, loader):
+        """Lead every key nobody is loading with one `loader(led_keys)` call and join the rest."""
+        thread_id = threading.get_ident()
+        led = {}
+        joined = {}
+        with self._condition:
+            for key in dict.fromkeys(keys):
+                flight = self._flights.get(key)
+                if flight is None:
+                    flight = _Flight(owner_thread_id=thread_id)
+                    self._flights[key] = flight
+                    led[key] = flight
+                elif flight.owner_thread_id == thread_id:
+                    for led_key, led_flight in led.items():
+                        self._flights.pop(led_key)
+                        led_flight.completed.set()
+                    raise RuntimeError(f"Recursive single-flight call for key: {key}")
+                else:
+                    flight.participants += 1
+                    joined[key] = flight
+            self._condition.notify_all()
+
+        outcomes = {}
+        if led:
+            try:
+                loaded = loader(list(led))
+            except BaseException as error:
+                for key, flight in led.items():
+                    self._complete(key, flight, error=error)
+                raise
+            for key, flight in led.items():
+                if key in loaded:
+                    outcome = loaded[key]
+                else:
+                    outcome = RuntimeError(f"Single-flight loader returned nothing for key: {key}")
+                if isinstance(outcome, BaseException):
+                    self._complete(key, flight, error=outcome)
+                else:
+                    self._complete(key, flight, result=outcome)
+                outcomes[key] = outcome
+        for key, flight in joined.items():
+            try:
+                outcomes[key] = self._wait_for_leader(flight)
+            except Exception as error:
+                outcomes[key] = error
+        return outcomes
+
+    def join(self, key, default=None):
+        """Wait for an active flight without starting one, returning `default` if none exists."""
+        thread_id = threading.get_ident()
+        with self._condition:
+            flight = self._flights.get(key)
+            if flight is None or flight.owner_thread_id == thread_id:
+                return default
+            flight.participants += 1
+            self._condition.notify_all()
+        return self._wait_for_leader(flight)
+
     def _run_leader(self, key, flight, loader):
         try:
             result = loader()
@@ -1,4 +1,7 @@
+import gzip
 import json
+import os
+import sys
 import threading
 import time
 from concurrent.futures import ThreadPoolExecutor
@@ -10,35 +13,59 @@ import numpy as np
 import pandas as pd
 import pytest
 import yfinance as yf
+from flask import jsonify
 
 from app import (
+    ADAPTIVE_TTL_MAX_SECONDS,
     ApiError,
+    BackendBusyError,
     BULKHEAD_MAX_ACTIVE_LOADERS,
     BULKHEAD_RETRY_AFTER_SECONDS,
+    HISTORY_CACHE_SECONDS,
+    INFO_CACHE_SECONDS,
+    NEGATIVE_CACHE_SECONDS,
     HistoricalPrice,
     RATE_LIMIT_RETRY_AFTER_SECONDS,
     SEARCH_CACHE_SECONDS,
+    SearchResult,
     SymbolNotFoundError,
     UpstreamDataError,
     UpstreamRateLimitError,
     WAITRESS_THREADS,
+    _adaptive_ttls,
     _classify_circuit_error,
     _history_cache,
+    _last_known_good,
+    _load_micro_batch,
+    _retain_last_known_good,
     _loader_bulkhead,
     _metadata_cache,
     _metrics,
+    _normalize_history,
+    _resample_history,
     _single_flight,
+    _trading_sessions,
     _upstream_circuit,
+    _watchlist_loads,
     app,
     get_basic_info,
     get_history,
     run_server,
     search_tickers,
 )
-from bulkhead import LoaderBulkhead
+from adaptive_ttl import AdaptiveTtl
+from bulkhead import BulkheadSaturatedError, LoaderBulkhead
 from circuit_breaker import CircuitBreaker, CircuitOpenError, CircuitState
+from disk_cache import DiskCache
+from history_archive import HistoryArchive
+from market_sessions import MarketSessions
 from memory_cache import ByteBoundedTTLCache, estimate_cache_entry_bytes
+from price_history import PriceHistory
 from metrics import AdapterMetrics
+from micro_batcher import MicroBatcher
+from refresh_ahead import RefreshAheadScheduler
+from singleflight import SingleFlight
+from warmup import CacheWarmup
 from yfinance.exceptions import YFPricesMissingError, YFRateLimitError, YFTzMissingError
 
 
@@ -57,9 +84,12 @@ def clear_data_cache():
     _metrics.reset()
     _history_cache.clear()
     _metadata_cache.clear()
+    _last_known_good.clear()
+    _adaptive_ttls.clear()
     yield
     _history_cache.clear()
     _metadata_cache.clear()
+    _last_known_good.clear()
     assert _single_flight.active_count == 0
     assert _loader_bulkhead.active_count == 0
     _upstream_circuit.reset()
@@ -87,6 +117,30 @@ def mock_ticker():
     patcher.stop()
 
 
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def cache_on_evict():
+    return None
+
+
+@pytest.fixture
+def history_cache(clock, cache_on_evict):
+    cache = ByteBoundedTTLCache(64 * 1024 * 1024, 512, clock=clock, on_evict=cache_on_evict)
+    with patch("app._history_cache", cache):
+        yield cache
+
+
+@pytest.fixture
+def metadata_cache(clock, cache_on_evict):
+    cache = ByteBoundedTTLCache(8 * 1024 * 1024, 2048, clock=clock, on_evict=cache_on_evict)
+    with patch("app._metadata_cache", cache):
+        yield cache
+
+
 def _sample_history(date="2024-06-15"):
     index = pd.DatetimeIndex([pd.Timestamp(date)])
     return pd.DataFrame(
@@ -304,29 +358,33 @@ class TestHistoryEndpoint:
             repair=True,
         )
 
-    @pytest.mark.parametrize("interval", ["1wk", "1mo"])
-    def test_weekly_and_monthly_keep_repaired_split_basis(self, client, mock_ticker, interval):
-        mock_ticker(history_df=_split_adjusted_history())
-
-        response = client.get(f"/history/NVDA/1y?interval={interval}")
-
-        assert response.status_code == 200
-        data = response.get_json()
-        assert [row["close"] for row in data] == [100.0, 101.0, 102.0]
-        assert [row["volume"] for row in data] == [100_000, 120_000, 110_000]
-        assert data[1]["splitRatio"] == 10.0
-
-    @pytest.mark.parametrize("interval", ["1wk", "1mo"])
-    def test_max_repaired_multi_day_history_uses_explicit_start(self, client, mock_ticker, interval):
+    @pytest.mark.parametrize(
+        ("interval", "expected"),
+        [
+            (
+                "1wk",
+                [
+                    {"date": "2024-06-03", "close": 100.0, "volume": 100_000, "dividend": 0.04},
+                    {"date": "2024-06-10", "close": 102.0, "volume": 230_000, "dividend": 0.01},
+                ],
+            ),
+            ("1mo", [{"date": "2024-06-01", "close": 102.0, "volume": 330_000, "dividend": 0.05}]),
+        ],
+    )
+    def test_weekly_and_monthly_aggregate_repaired_daily_split_basis(
+        self, client, mock_ticker, interval, expected
+    ):
         ticker = mock_ticker(history_df=_split_adjusted_history())
 
         response = client.get(f"/history/NVDA/max?interval={interval}")
 
         assert response.status_code == 200
-        assert [row["close"] for row in response.get_json()] == [100.0, 101.0, 102.0]
+        data = response.get_json()
+        assert [{name: row[name] for name in expected[0]} for row in data] == pytest.approx(expected)
+        assert data[-1]["splitRatio"] == 10.0
         ticker.history.assert_called_once_with(
-            start="1900-01-01",
-            interval=interval,
+            period="max",
+            interval="1d",
             auto_adjust=False,
             actions=True,
             repair=True,
@@ -349,7 +407,7 @@ class TestHistoryEndpoint:
         assert data[1]["timestamp"] == int(index[1].tz_convert("UTC").timestamp())
         ticker.history.assert_called_once_with(
             period="5d",
-            interval="5m",
+            interval="1m",
             auto_adjust=False,
             actions=True,
             repair=True,
@@ -390,6 +448,51 @@ class TestHistoryEndpoint:
         assert response.status_code == 200
         assert response.get_json()[0]["dividend"] == 0.5
 
+    def test_complete_history_actions_skip_corporate_actions_lookup(self, client, mock_ticker):
+        history = _sample_history().assign(Dividends=0.27, **{"Stock Splits": 0.0})
+        ticker = mock_ticker(history_df=history)
+        dividends = PropertyMock(return_value=pd.Series([0.5], index=history.index))
+        type(ticker).dividends = dividends
+
+        response = client.get("/history/AAPL/1y")
+
+        assert response.get_json()[0]["dividend"] == 0.27
+        dividends.assert_not_called()
+        assert not _metadata_cache.contains("actions:AAPL")
+
+    def test_corporate_actions_are_shared_across_periods_and_intervals(self, client, mock_ticker):
+        ticker = mock_ticker(history_df=_sample_history())
+        dividends = PropertyMock(return_value=pd.Series([0.5], index=_sample_history().index))
+        splits = PropertyMock(return_value=pd.Series([4.0], index=_sample_history().index))
+        type(ticker).dividends = dividends
+        type(ticker).splits = splits
+
+        responses = [
+            client.get(path).get_json()
+            for path in ("/history/AAPL/1y", "/history/AAPL/5d", "/history/AAPL/1d?interval=5m")
+        ]
+
+        assert ticker.history.call_count == 3
+        assert dividends.call_count == splits.call_count == 1
+        assert [bars[0]["dividend"] for bars in responses] == [0.5, 0.5, 0.5]
+        assert [bars[0].get("splitRatio") for bars in responses] == [4.0, 4.0, None]
+
+    def test_intraday_bars_keep_their_own_split_cells(self, client, mock_ticker):
+        index = pd.DatetimeIndex([
+            pd.Timestamp("2024-06-10 09:30:00", tz="America/New_York"),
+            pd.Timestamp("2024-06-10 09:35:00", tz="America/New_York"),
+        ])
+        history = pd.DataFrame(
+            {"Open": [100.0, 101.0], "Close": [101.0, 102.0], "Low": [99.0, 100.0], "High": [102.0, 103.0]},
+            index=index,
+        )
+        ticker = mock_ticker(history_df=history)
+        type(ticker).splits = PropertyMock(return_value=pd.Series([4.0], index=index[:1].normalize()))
+
+        bars = client.get("/history/AAPL/1d?interval=5m").get_json()
+
+        assert [bar.get("splitRatio") for bar in bars] == [None, None]
+
     def test_zero_dividend_when_none_on_date(self, client, mock_ticker):
         mock_ticker(history_df=_sample_history())
 
@@ -398,6 +501,67 @@ class TestHistoryEndpoint:
         assert response.status_code == 200
         assert response.get_json()[0]["dividend"] == 0.0
 
+    def test_sums_same_day_fallback_dividends_and_ignores_non_finite_amounts(self, client, mock_ticker):
+        history = pd.DataFrame(
+            {
+                "Open": [100.0, 101.0, 102.0],
+                "Close": [101.0, 102.0, 103.0],
+                "Low": [99.0, 100.0, 101.0],
+                "High": [102.0, 103.0, 104.0],
+                "Volume": [1000, 1000, 1000],
+                "Dividends": [0.0, float("nan"), 0.3],
+            },
+            index=pd.DatetimeIndex(
+                [pd.Timestamp("2024-06-13"), pd.Timestamp("2024-06-14"), pd.Timestamp("2024-06-17")]
+            ),
+        )
+        dividends = pd.Series(
+            [0.1, 0.2, float("inf"), 0.5, 0.7],
+            index=pd.DatetimeIndex([
+                pd.Timestamp("2024-06-13 00:00", tz="UTC"),
+                pd.Timestamp("2024-06-13 12:00", tz="UTC"),
+                pd.Timestamp("2024-06-14", tz="UTC"),
+                pd.Timestamp("2024-06-16", tz="UTC"),
+                pd.Timestamp("2024-06-17", tz="UTC"),
+            ]),
+        )
+        mock_ticker(history_df=history, dividends=dividends)
+
+        response = client.get("/history/AAPL/1y")
+
+        assert response.status_code == 200
+        assert [row["dividend"] for row in _standard_json(response)] == [0.1 + 0.2, 0.0, 0.3]
+
+    def test_normalizes_object_columns_missing_volume_and_naive_intraday_index(self, client, mock_ticker):
+        history = pd.DataFrame(
+            {
+                "Open": ["100.5", "bad"],
+                "Close": [101.0, 102.0],
+                "Low": [99.0, 100.0],
+                "High": [102.0, 103.0],
+                "Stock Splits": ["2", None],
+            },
+            index=pd.DatetimeIndex(
+                [pd.Timestamp("2024-06-14 13:30"), pd.Timestamp("2024-06-14 13:35")]
+            ),
+        )
+        mock_ticker(history_df=history)
+
+        response = client.get("/history/AAPL/1d?interval=5m")
+
+        assert response.status_code == 200
+        assert _standard_json(response) == [{
+            "date": "2024-06-14",
+            "open": 100.5,
+            "close": 101.0,
+            "low": 99.0,
+            "high": 102.0,
+            "volume": 0,
+            "dividend": 0.0,
+            "timestamp": int(datetime(2024, 6, 14, 13, 30, tzinfo=timezone.utc).timestamp()),
+            "splitRatio": 2.0,
+        }]
+
     def test_invalid_period_returns_400(self, client):
         response = client.get("/history/AAPL/invalid")
 
@@ -610,6 +774,102 @@ class TestHistoryEndpoint:
         assert response.headers["Cache-Control"] == "public, max-age=30"
 
 
+class TestHistoryBatchEndpoint:
+    @staticmethod
+    def tickers(**by_symbol):
+        def ticker_for(symbol):
+            ticker = MagicMock()
+            outcome = by_symbol[symbol]
+            if isinstance(outcome, Exception):
+                ticker.history.side_effect = outcome
+            else:
+                ticker.history.return_value = outcome
+            type(ticker).dividends = PropertyMock(return_value=pd.Series(dtype=float))
+            type(ticker).info = PropertyMock(return_value={})
+            return ticker
+
+        return patch("app.yf.Ticker", side_effect=ticker_for)
+
+    def test_serves_cached_symbols_and_loads_misses_under_one_permit(self, client):
+        with self.tickers(
+            AAPL=_sample_history(),
+            MSFT=_sample_history("2024-06-14"),
+            NOPE=YFPricesMissingError("NOPE", "for requested range"),
+        ) as ticker_class:
+            cached = get_history("AAPL", "1y").records()
+            with patch.object(_loader_bulkhead, "call", wraps=_loader_bulkhead.call) as permits:
+                response = client.post(
+                    "/history/batch",
+                    json={"symbols": ["AAPL", "MSFT", "NOPE", "MSFT"], "period": "1y"},
+                )
+            metrics = client.get("/metrics").get_data(as_text=True)
+
+        assert response.status_code == 200
+        assert list(response.get_json()) == ["AAPL", "MSFT", "NOPE"]
+        assert response.get_json()["AAPL"] == {"prices": cached, "status": 200}
+        assert response.get_json()["MSFT"]["prices"][0]["date"] == "2024-06-14"
+        assert response.get_json()["NOPE"] == {"error": "Symbol not found: NOPE", "status": 404}
+        assert permits.call_count == 1
+        assert [call.args[0] for call in ticker_class.call_args_list] == ["AAPL", "MSFT", "NOPE"]
+        assert _history_cache.contains("history:MSFT:1y:1d")
+        assert 'stock_analyst_yfinance_batch_symbols_total{cache="history",source="cache"} 1' in metrics
+        assert 'stock_analyst_yfinance_batch_symbols_total{cache="history",source="upstream"} 2' in metrics
+        assert (
+            'stock_analyst_yfinance_http_requests_total{method="POST",route="/history/batch",status="200"} 1'
+            in metrics
+        )
+
+    def test_rate_limit_opens_circuit_for_the_remaining_symbols(self, client):
+        with self.tickers(LIMIT=YFRateLimitError(), MSFT=_sample_history()) as ticker_class:
+            response = client.post(
+                "/history/batch", json={"symbols": ["LIMIT", "MSFT"], "period": "10y"}
+            )
+
+        assert response.status_code == 200
+        assert response.get_json()["LIMIT"] == {
+            "error": "Upstream provider rate limit exceeded",
+            "retryAfter": RATE_LIMIT_RETRY_AFTER_SECONDS,
+            "status": 429,
+        }
+        assert response.get_json()["MSFT"]["status"] == 503
+        assert ticker_class.call_count == 1
+
+    def test_saturated_bulkhead_rejects_the_whole_batch(self, client):
+        with self.tickers(AAPL=_sample_history()):
+            with patch.object(
+                _loader_bulkhead, "call", side_effect=BulkheadSaturatedError("saturated")
+            ):
+                response = client.post("/history/batch", json={"symbols": ["AAPL"], "period": "1y"})
+
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == str(BULKHEAD_RETRY_AFTER_SECONDS)
+
+    @pytest.mark.parametrize(
+        "body",
+        [
+            ["AAPL"],
+            {"symbols": ["AAPL"], "period": "2d"},
+            {"symbols": ["AAPL"], "period": "1y", "interval": "2h"},
+            {"symbols": [], "period": "1y"},
+            {"symbols": ["AAPL", ""], "period": "1y"},
+            {"symbols": "AAPL", "period": "1y"},
+            {"symbols": [f"S{number}" for number in range(21)], "period": "1y"},
+        ],
+    )
+    def test_rejects_invalid_batch_requests(self, client, body):
+        with patch("app.yf.Ticker", side_effect=AssertionError("Yahoo called for an invalid batch")):
+            response = client.post("/history/batch", json=body)
+
+        assert response.status_code == 400
+
+    def test_invalid_interval_error_matches_the_single_symbol_route(self, client):
+        batch = client.post("/history/batch", json={"symbols": ["AAPL"], "period": "1y", "interval": "2h"})
+        single = client.get("/history/AAPL/1y?interval=2h")
+
+        assert batch.get_json() == single.get_json()
+        assert batch.get_json()["error"].startswith("Invalid interval: 2h. Valid values: 15m, 1d, ")
+
+
 class TestInfoEndpoint:
     def test_returns_basic_info(self, client, mock_ticker):
         mock_ticker(info={
@@ -824,6 +1084,120 @@ class TestInfoEndpoint:
         assert "Internal details" not in str(response.get_json())
 
 
+class TestInfoBatchEndpoint:
+    @staticmethod
+    def tickers(**info_by_symbol):
+        def ticker_for(symbol):
+            ticker = MagicMock()
+            info = info_by_symbol[symbol]
+            type(ticker).info = PropertyMock(
+                side_effect=info if isinstance(info, Exception) else None, return_value=info
+            )
+            return ticker
+
+        return patch("app.yf.Ticker", side_effect=ticker_for)
+
+    def test_returns_typed_per_symbol_results_and_fills_single_symbol_keys(self, client):
+        with self.tickers(
+            AAPL={"longName": "Apple Inc.", "regularMarketPrice": 195.0, "currency": "USD"},
+            NOPE={"trailingPegRatio": None},
+            BROKEN=_http_error(500),
+        ) as ticker_class:
+            with patch.object(_loader_bulkhead, "call", wraps=_loader_bulkhead.call) as permits:
+                response = client.post("/info/batch", json={"symbols": ["AAPL", "NOPE", "BROKEN"]})
+            ticker_class.side_effect = AssertionError("single lookup missed the batch entry")
+            single = client.get("/info/AAPL")
+
+        assert response.status_code == 200
+        assert response.get_json()["AAPL"]["status"] == 200
+        assert response.get_json()["AAPL"]["info"] == single.get_json()
+        assert response.get_json()["AAPL"]["info"]["name"] == "Apple Inc."
+        assert response.get_json()["NOPE"] == {"error": "Symbol not found: NOPE", "status": 404}
+        assert response.get_json()["BROKEN"] == {
+            "error": "Failed to fetch data from upstream provider",
+            "status": 502,
+        }
+        assert permits.call_count == 1
+        assert single.status_code == 200
+
+    def test_cached_symbols_skip_the_permit(self, client):
+        with self.tickers(AAPL={"longName": "Apple Inc."}):
+            get_basic_info("AAPL")
+            with patch.object(_loader_bulkhead, "call", side_effect=AssertionError("permit taken")):
+                response = client.post("/info/batch", json={"symbols": ["AAPL"]})
+            metrics = client.get("/metrics").get_data(as_text=True)
+
+        assert response.get_json()["AAPL"]["info"]["name"] == "Apple Inc."
+        assert 'stock_analyst_yfinance_batch_symbols_total{cache="metadata",source="cache"} 1' in metrics
+
+    @pytest.mark.parametrize("body", [{}, {"symbols": [1]}, {"symbols": ["A"] * 2 + [f"S{n}" for n in range(20)]}])
+    def test_rejects_invalid_batch_requests(self, client, body):
+        response = client.post("/info/batch", json=body)
+
+        assert response.status_code == 400
+
+
+class TestInfoMicroBatching:
+    @pytest.fixture
+    def info_batcher(self):
+        batcher = MicroBatcher(0.2, 20, _load_micro_batch, on_dispatch=_metrics.record_info_batch)
+        with patch("app._info_batcher", batcher):
+            yield batcher
+
+    def test_concurrent_distinct_misses_share_one_permit(self, client, info_batcher):
+        with TestInfoBatchEndpoint.tickers(
+            AAPL={"longName": "Apple Inc."},
+            **{"EURUSD=X": {"shortName": "EUR/USD"}},
+            BROKEN=_http_error(500),
+        ):
+            with patch.object(_loader_bulkhead, "call", wraps=_loader_bulkhead.call) as permits:
+                with ThreadPoolExecutor(max_workers=3) as executor:
+                    futures = {
+                        symbol: executor.submit(get_basic_info, symbol)
+                        for symbol in ("AAPL", "EURUSD=X", "BROKEN")
+                    }
+                    names = {
+                        symbol: futures[symbol].result(timeout=5).name for symbol in ("AAPL", "EURUSD=X")
+                    }
+                    error = futures["BROKEN"].exception(timeout=5)
+            metrics = client.get("/metrics").get_data(as_text=True)
+
+        assert names == {"AAPL": "Apple Inc.", "EURUSD=X": "EUR/USD"}
+        assert isinstance(error, UpstreamDataError)
+        assert permits.call_count == 1
+        assert 'stock_analyst_yfinance_info_batch_size_bucket{le="3"} 1' in metrics
+        assert "stock_analyst_yfinance_info_batch_size_sum 3" in metrics
+        assert "stock_analyst_yfinance_info_batch_wait_seconds_count 3" in metrics
+        assert "stock_analyst_yfinance_batch_symbols_total{" not in metrics
+
+    def test_full_batch_dispatches_before_the_window_ends(self):
+        dispatched = []
+        batcher = MicroBatcher(
+            30, 2, lambda loaders: {key: loader() for key, loader in loaders.items()},
+            on_dispatch=lambda size, waits: dispatched.append(size),
+        )
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            first = executor.submit(batcher.submit, "a", lambda: 1)
+            second = executor.submit(batcher.submit, "b", lambda: 2)
+            results = (first.result(timeout=5), second.result(timeout=5))
+
+        assert results == (1, 2)
+        assert dispatched == [2]
+
+    def test_whole_batch_failure_reaches_every_waiter(self):
+        def reject(_loaders):
+            raise BackendBusyError()
+
+        batcher = MicroBatcher(0.05, 20, reject)
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            futures = [executor.submit(batcher.submit, key, lambda: None) for key in ("a", "b")]
+            errors = [future.exception(timeout=5) for future in futures]
+
+        assert all(isinstance(error, BackendBusyError) for error in errors)
+        assert errors[0] is not errors[1]
+
+
 class TestCacheHeaders:
     def test_info_cache_5_minutes(self, client, mock_ticker):
         mock_ticker(info={"longName": "Test"})
@@ -914,6 +1288,71 @@ class TestByteBoundedTTLCache:
         assert not sized_cache.set("same", (21, "new"), ttl=100)
         assert sized_cache.get("same") is None
 
+    def test_retains_expired_entries_for_stale_reads_until_retention_ends(self):
+        clock = FakeClock()
+        cache = self.sized_cache(100, 10, clock)
+        cache.set("history", (10, "old"), ttl=5, stale_seconds=20)
+
+        clock.advance(5)
+
+        assert cache.get("history") is None
+        assert not cache.contains("history")
+        assert cache.get_stale("history") == (10, "old")
+        assert cache.total_bytes == 10
+
+        clock.advance(20)
+
+        assert cache.get_stale("history") is None
+        assert cache.total_bytes == 0
+
+    def test_reports_how_long_a_retained_entry_has_been_expired(self):
+        clock = FakeClock()
+        cache = self.sized_cache(100, 10, clock)
+        cache.set("info", (10, "old"), ttl=5, stale_seconds=20)
+
+        assert cache.get_expired_for("info") == ((10, "old"), 0.0)
+        clock.advance(12)
+        assert cache.get_expired_for("info") == ((10, "old"), 7.0)
+        clock.advance(13)
+        assert cache.get_expired_for("info") is None
+
+    def test_reports_expired_and_evicted_entries_but_not_replaced_ones(self):
+        clock = FakeClock()
+        evicted = []
+        cache = ByteBoundedTTLCache(
+            25, 10, clock=clock, size_of=lambda _key, value: value[0],
+            on_evict=lambda key, value: evicted.append((key, value)),
+        )
+        cache.set("short", (10, "short"), ttl=5)
+        cache.set("replaced", (10, "old"), ttl=100)
+        cache.set("replaced", (10, "new"), ttl=100)
+
+        clock.advance(5)
+        cache.set("large", (16, "large"), ttl=100)
+
+        assert evicted == [("short", (10, "short")), ("replaced", (10, "new"))]
+
+    def test_reads_drop_ended_retentions_in_bounded_batches(self):
+        clock = FakeClock()
+        evicted = []
+        cache = ByteBoundedTTLCache(
+            10_000, 1_000, clock=clock, size_of=lambda _key, _value: 1,
+            on_evict=lambda key, _value: evicted.append(key),
+        )
+        for index in range(100):
+            cache.set(f"old-{index}", index, ttl=5)
+        cache.set("live", "live", ttl=100)
+        for _ in range(3):
+            cache.set("live", "live", ttl=100)
+
+        clock.advance(5)
+
+        assert cache.get("live") == "live"
+        assert 0 < len(evicted) < 100
+        assert len(cache) == 1
+        assert sorted(evicted) == sorted(f"old-{index}" for index in range(100))
+        assert cache.total_bytes == 1
+
     def test_copies_mutable_containers_on_write_and_read(self):
         cache = ByteBoundedTTLCache(1_000, 10, size_of=lambda _key, _value: 10)
         source = ["original"]
@@ -942,6 +1381,239 @@ class TestByteBoundedTTLCache:
 
         assert two_prices > one_price
 
+    def test_default_estimator_reads_each_dataclass_layout_once(self):
+        results = [SearchResult(f"S{index}", "Name", "WSE", "EQUITY") for index in range(3)]
+        estimate_cache_entry_bytes("search:s", results[:1])
+
+        with patch("memory_cache.fields", side_effect=AssertionError("layout read again")):
+            one = estimate_cache_entry_bytes("search:s", results[:1])
+            three = estimate_cache_entry_bytes("search:s", results)
+
+        assert three - one > 2 * sys.getsizeof(results[0])
+
+
+class TestPriceHistory:
+    @staticmethod
+    def history(bars, timestamps=False):
+        closes = np.arange(bars, dtype=float) + 100.0
+        split_ratio = np.full(bars, np.nan)
+        split_ratio[-1] = 2.0
+        return PriceHistory(
+            epoch_days=np.arange(19_000, 19_000 + bars),
+            open=closes,
+            close=closes,
+            low=closes - 1.0,
+            high=closes + 1.0,
+            volume=np.full(bars, 1_000),
+            dividend=np.zeros(bars),
+            split_ratio=split_ratio,
+            timestamp=np.arange(bars) * 60 if timestamps else None,
+        )
+
+    def test_estimates_retained_size_without_visiting_bars(self):
+        history = self.history(10_000)
+
+        with patch.object(PriceHistory, "__iter__", side_effect=AssertionError("bars must not be visited")):
+            estimate = estimate_cache_entry_bytes("history:AAPL:max:1d", history)
+
+        assert history.nbytes == 10_000 * 60
+        assert history.nbytes <= estimate < history.nbytes + 4_096
+        assert self.history(10_000, timestamps=True).nbytes == 10_000 * 68
+
+    def test_columns_are_read_only_and_slices_share_them(self):
+        history = self.history(10)
+        tail = history[-3:]
+
+        with pytest.raises(ValueError):
+            history.close[0] = 0.0
+        assert len(tail) == 3
+        assert np.shares_memory(tail.close, history.close)
+        assert not tail.close.flags.writeable
+
+    def test_copy_returns_distinct_wrapper_over_shared_columns(self):
+        history = self.history(5)
+        cache = ByteBoundedTTLCache(1_000_000, 10)
+        cache.set("history:AAPL:1y:1d", history, ttl=100)
+
+        cached = cache.get("history:AAPL:1y:1d")
+
+        assert cached is not history
+        assert np.shares_memory(cached.close, history.close)
+        assert list(cached) == list(history)
+
+    def test_records_omit_absent_timestamps_and_split_ratios(self):
+        records = self.history(2).records()
+
+        assert records[0] == {
+            "date": "2022-01-08",
+            "open": 100.0,
+            "close": 100.0,
+            "low": 99.0,
+            "high": 101.0,
+            "volume": 1_000,
+            "dividend": 0.0,
+        }
+        assert records[1]["splitRatio"] == 2.0
+        assert "timestamp" not in records[1]
+        assert self.history(2, timestamps=True).records()[1]["timestamp"] == 60
+        assert self.history(2)[1] == HistoricalPrice(
+            date="2022-01-09",
+            open=101.0,
+            close=101.0,
+            low=100.0,
+            high=102.0,
+            volume=1_000,
+            dividend=0.0,
+            splitRatio=2.0,
+        )
+
+
+class TestDiskCache:
+    @pytest.fixture
+    def disk_cache(self, tmp_path):
+        clock = FakeClock()
+        cache = DiskCache(str(tmp_path / "cache.sqlite3"), schema_version=1, max_bytes=1_000_000, clock=clock)
+        cache.clock = clock
+        yield cache
+        cache.close()
+
+    def test_write_behind_persists_expiry_and_stale_retention(self, disk_cache):
+        assert disk_cache.put("info:AAPL", {"name": "Apple"}, ttl=10, stale_seconds=20)
+        assert disk_cache.flush(timeout=5)
+
+        fresh = disk_cache.get("info:AAPL")
+        disk_cache.clock.advance(15)
+        stale = disk_cache.get("info:AAPL")
+        disk_cache.clock.advance(15)
+
+        assert (fresh.value, fresh.expires_in, fresh.retained_for) == ({"name": "Apple"}, 10, 30)
+        assert (stale.expires_in, stale.retained_for) == (-5, 15)
+        assert disk_cache.get("info:AAPL") is None
+
+    def test_reopening_discards_rows_from_other_schema_versions(self, disk_cache, tmp_path):
+        disk_cache.put("search:apple", ["AAPL"], ttl=100)
+        disk_cache.flush(timeout=5)
+        path = str(tmp_path / "cache.sqlite3")
+
+        same_schema = DiskCache(path, schema_version=1, max_bytes=1_000_000, clock=disk_cache.clock)
+        new_schema = DiskCache(path, schema_version=2, max_bytes=1_000_000, clock=disk_cache.clock)
+        try:
+            assert new_schema.get("search:apple") is None
+            assert same_schema.get("search:apple") is None
+        finally:
+            same_schema.close()
+            new_schema.close()
+
+    def test_byte_budget_keeps_most_recent_writes(self, tmp_path):
+        clock = FakeClock()
+        cache = DiskCache(str(tmp_path / "small.sqlite3"), schema_version=1, max_bytes=2_500, clock=clock)
+        try:
+            for name in ("a", "b", "c"):
+                clock.advance(1)
+                cache.put(name, "x" * 1_000, ttl=100)
+                cache.flush(timeout=5)
+
+            assert cache.get("a") is None
+            assert cache.get("b").value == "x" * 1_000
+            assert cache.get("c").value == "x" * 1_000
+        finally:
+            cache.close()
+
+    def test_restart_serves_history_from_disk_and_promotes_it(self, client, mock_ticker, tmp_path):
+        disk_cache = DiskCache(
+            str(tmp_path / "cache.sqlite3"),
+            schema_version=1,
+            max_bytes=10_000_000,
+            on_write=_metrics.record_disk_cache_write,
+        )
+        try:
+            with patch("app._disk_cache", disk_cache):
+                mock_ticker(history_df=_sample_history())
+                first = client.get("/history/AAPL/10y")
+                assert disk_cache.flush(timeout=5)
+                _history_cache.clear()
+
+                with patch("app.yf.Ticker", side_effect=AssertionError("Yahoo called after restart")):
+                    restarted = client.get("/history/AAPL/10y")
+                    promoted = client.get("/history/AAPL/10y")
+                metrics = client.get("/metrics").get_data(as_text=True)
+        finally:
+            disk_cache.close()
+
+        assert restarted.get_data() == first.get_data()
+        assert restarted.headers["ETag"] == first.headers["ETag"]
+        assert promoted.status_code == 200
+        assert _history_cache.contains("history:AAPL:10y:1d")
+        assert 'stock_analyst_yfinance_disk_cache_lookups_total{result="hit"} 1' in metrics
+        # The history entry and the corporate actions its dividend fallback loaded.
+        assert 'stock_analyst_yfinance_disk_cache_writes_total{result="written"} 2' in metrics
+
+
+class TestHistoryArchive:
+    def test_rebuild_replaces_file_atomically_and_maps_read_only_columns(self, tmp_path):
+        archive = HistoryArchive(str(tmp_path), schema_version=1, max_bytes=2**30)
+        history = TestPriceHistory.history(1_000)
+        archive.write("history:BRK/B:max:1d", history[:500], b"old", None, "old-tag", 1.0)
+        old = archive.read("history:BRK/B:max:1d")
+
+        archive.write("history:BRK/B:max:1d", history, b"[new]", b"gz", "new-tag", 2.0)
+        new = archive.read("history:BRK/B:max:1d")
+
+        assert sorted(path.name for path in tmp_path.iterdir()) == ["history%3ABRK%2FB%3Amax%3A1d.hist"]
+        assert (len(old.history), bytes(old.body), old.etag) == (500, b"old", "old-tag")
+        assert list(new.history) == list(history)
+        assert (bytes(new.body), bytes(new.gzip_body), new.fetched_at) == (b"[new]", b"gz", 2.0)
+        assert not new.history.close.flags.writeable
+        assert sys.getsizeof(new.history) < 4_096 < history.nbytes
+        assert HistoryArchive(str(tmp_path), schema_version=2, max_bytes=2**30).read("history:BRK/B:max:1d") is None
+
+    def test_oldest_files_beyond_the_byte_limit_are_deleted_on_write_and_at_startup(self, tmp_path):
+        history = TestPriceHistory.history(100)
+        archive = HistoryArchive(str(tmp_path), schema_version=1, max_bytes=2**30)
+        for age, symbol in enumerate(("NEW", "MID", "OLD")):
+            archive.write(f"history:{symbol}:max:1d", history, b"[]", None, "tag", 1.0)
+            os.utime(archive.path_for(f"history:{symbol}:max:1d"), (1_000 - age, 1_000 - age))
+        file_bytes = os.path.getsize(archive.path_for("history:NEW:max:1d"))
+
+        assert HistoryArchive(str(tmp_path), schema_version=1, max_bytes=2 * file_bytes).read(
+            "history:OLD:max:1d"
+        ) is None
+        bounded = HistoryArchive(str(tmp_path), schema_version=1, max_bytes=file_bytes)
+        bounded.write("history:MID:max:1d", history, b"[]", None, "tag", 2.0)
+
+        assert sorted(path.name for path in tmp_path.iterdir()) == ["history%3AMID%3Amax%3A1d.hist"]
+        assert bounded.read("history:MID:max:1d").fetched_at == 2.0
+
+    def test_abandoned_temporary_files_are_deleted(self, tmp_path):
+        (tmp_path / "crashed.tmp").write_bytes(b"partial")
+        (tmp_path / "writing.tmp").write_bytes(b"partial")
+        os.utime(tmp_path / "crashed.tmp", (1_000, 1_000))
+
+        HistoryArchive(str(tmp_path), schema_version=1, max_bytes=2**30)
+
+        assert [path.name for path in tmp_path.iterdir()] == ["writing.tmp"]
+
+    def test_warm_archive_serves_a_new_process_without_yahoo(self, client, mock_ticker, tmp_path):
+        archive = HistoryArchive(str(tmp_path), schema_version=1, max_bytes=2**30)
+        with patch("app._history_archive", archive):
+            mock_ticker(history_df=TestHistoryRangeSubsumption.daily_history())
+            first = client.get("/history/AAPL/10y", headers={"Accept-Encoding": "gzip"})
+            _history_cache.clear()
+
+            with patch("app.yf.Ticker", side_effect=AssertionError("Yahoo called with a warm archive")):
+                restarted = client.get("/history/AAPL/10y", headers={"Accept-Encoding": "gzip"})
+                mapped_entry_bytes = _history_cache.total_bytes
+                sliced = client.get("/history/AAPL/1y")
+            metrics = client.get("/metrics").get_data(as_text=True)
+
+        assert restarted.get_data() == first.get_data()
+        assert restarted.headers["ETag"] == first.headers["ETag"]
+        assert sliced.get_json() == get_history("AAPL", "1y").records()
+        assert 'stock_analyst_yfinance_history_archive_writes_total{result="written"} 1' in metrics
+        assert 'stock_analyst_yfinance_history_cache_hits_total{match="archive"} 1' in metrics
+        # The mapped columns and bodies stay in the page cache, outside the history budget.
+        assert mapped_entry_bytes < 4_096 < len(first.get_data())
+
 
 class TestCircuitBreaker:
     @staticmethod
@@ -1231,6 +1903,29 @@ class TestSingleFlight:
         assert all(len(result) == 1 for result in results)
         assert len({id(result) for result in results}) == len(results)
 
+    def test_batch_call_leads_idle_keys_and_joins_active_ones(self):
+        single_flight = SingleFlight()
+        blocker = BlockingUpstream(value="joined")
+        led = []
+
+        def load_batch(keys):
+            led.extend(keys)
+            return {key: f"loaded {key}" for key in keys}
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            active = executor.submit(single_flight.call, "a", blocker)
+            assert blocker.started.wait(timeout=5)
+            batch = executor.submit(single_flight.call_many, ["a", "b", "c"], load_batch)
+            try:
+                assert single_flight.wait_for_participants("a", 2, timeout=5)
+            finally:
+                blocker.release.set()
+
+            assert batch.result(timeout=5) == {"a": "joined", "b": "loaded b", "c": "loaded c"}
+            assert active.result(timeout=5) == "joined"
+        assert led == ["b", "c"]
+        assert single_flight.active_count == 0
+
     def test_coalesces_identical_search_loads(self):
         search_result = MagicMock()
         search_result.quotes = [{
@@ -1642,6 +2337,27 @@ class TestDataCache:
             assert _history_cache.contains("history:AAPL:1y:1d")
             assert not _metadata_cache.contains("history:AAPL:1y:1d")
 
+    def test_cache_hits_serve_the_body_encoded_at_load_time(self, client, mock_ticker):
+        mock_ticker(history_df=_sample_history(), info={"longName": "Apple Inc."})
+        first_history = client.get("/history/AAPL/1y")
+        first_info = client.get("/info/AAPL")
+
+        with patch.object(app.json, "response", side_effect=AssertionError("cache hit re-encoded")):
+            second_history = client.get("/history/AAPL/1y")
+            second_info = client.get("/info/AAPL")
+
+        assert second_history.get_data() == first_history.get_data()
+        assert second_info.get_data() == first_info.get_data()
+        assert second_history.content_type == "application/json"
+        with app.app_context():
+            assert first_history.get_data() == jsonify(get_history("AAPL", "1y").records()).get_data()
+
+    def test_cache_budget_counts_encoded_body_bytes(self, client, mock_ticker):
+        mock_ticker(history_df=_sample_history(), info={"longName": "Apple Inc."})
+        body = client.get("/history/AAPL/1y").get_data()
+
+        assert _history_cache.total_bytes >= len(body) + get_history("AAPL", "1y").nbytes
+
     def test_does_not_cache_errors(self, client):
         with patch("app.yf.Ticker") as mock_class:
             bad = MagicMock()
@@ -1670,12 +2386,1214 @@ class TestDataCache:
         assert response.get_json()["name"] == "Apple Inc."
 
 
-class TestHealthEndpoint:
-    def test_health_returns_ok(self, client):
-        response = client.get("/health")
+class TestHistoryRangeSubsumption:
+    @staticmethod
+    def daily_history(years=3):
+        today = pd.Timestamp.now("America/New_York").normalize()
+        index = pd.date_range(today - pd.DateOffset(years=years), today, freq="B")
+        closes = np.linspace(100.0, 200.0, len(index))
+        return pd.DataFrame(
+            {"Open": closes, "Close": closes, "Low": closes - 1.0, "High": closes + 1.0, "Volume": 1000},
+            index=index,
+        )
+
+    @staticmethod
+    def start_date(offset):
+        return (pd.Timestamp.now("America/New_York").normalize() - offset).strftime("%Y-%m-%d")
+
+    def test_slices_shorter_daily_period_from_cached_longer_period(self, client, mock_ticker):
+        ticker = mock_ticker(history_df=self.daily_history())
+        ten_years = client.get("/history/AAPL/10y")
+
+        one_year = client.get("/history/AAPL/1y")
+        six_months = client.get("/history/AAPL/6mo")
+
+        assert ticker.history.call_count == 1
+        one_year_dates = [bar["date"] for bar in one_year.get_json()]
+        assert one_year_dates[0] >= self.start_date(pd.DateOffset(years=1))
+        assert ten_years.get_json()[-len(one_year_dates) :] == one_year.get_json()
+        assert len(one_year_dates) < len(ten_years.get_json())
+        assert six_months.get_json()[0]["date"] >= self.start_date(pd.DateOffset(months=6))
+        assert one_year.headers["Last-Modified"] == ten_years.headers["Last-Modified"]
+        assert _history_cache.contains("history:AAPL:1y:1d")
+        body = client.get("/metrics").get_data(as_text=True)
+        assert 'stock_analyst_yfinance_history_cache_hits_total{match="derived"} 2' in body
+        assert 'stock_analyst_yfinance_history_cache_hits_total{match="exact"}' not in body
+
+    def test_derived_entry_does_not_reference_the_source_columns(self, client, mock_ticker):
+        mock_ticker(history_df=self.daily_history())
+        client.get("/history/AAPL/10y")
+        client.get("/history/AAPL/1mo")
+
+        source = _history_cache.get("history:AAPL:10y:1d").value
+        derived = _history_cache.get("history:AAPL:1mo:1d").value
+
+        assert 0 < len(derived) < len(source)
+        assert not any(
+            np.shares_memory(derived_column, source_column)
+            for derived_column, source_column in zip(derived._columns(), source._columns())
+        )
+        assert sys.getsizeof(derived) < sys.getsizeof(source) / 10
+
+    def test_derived_entry_is_then_served_as_an_exact_hit(self, client, mock_ticker):
+        mock_ticker(history_df=self.daily_history())
+        client.get("/history/AAPL/max")
+        client.get("/history/AAPL/ytd")
+        client.get("/history/AAPL/ytd")
+
+        body = client.get("/metrics").get_data(as_text=True)
+
+        assert 'stock_analyst_yfinance_history_cache_hits_total{match="derived"} 1' in body
+        assert 'stock_analyst_yfinance_history_cache_hits_total{match="exact"} 1' in body
+
+    def test_source_older_than_requested_ttl_is_not_sliced(self, client, mock_ticker):
+        ticker = mock_ticker(history_df=self.daily_history())
+        with patch("app.time.time", return_value=time.time() - HISTORY_CACHE_SECONDS["1mo"]):
+            client.get("/history/AAPL/10y")
+
+        client.get("/history/AAPL/1mo")
+
+        assert ticker.history.call_count == 2
+        assert ticker.history.call_args.kwargs["period"] == "1mo"
+
+    @pytest.mark.parametrize(
+        "path", ["/history/AAPL/5d?interval=1h", "/history/AAPL/5d?interval=1wk", "/history/AAPL/5d"]
+    )
+    def test_intraday_intervals_and_short_periods_are_fetched(self, client, mock_ticker, path):
+        ticker = mock_ticker(history_df=self.daily_history())
+        client.get("/history/AAPL/max")
+
+        client.get(path)
+
+        assert ticker.history.call_count == 2
+
+    def test_joins_in_flight_longer_period_instead_of_fetching(self):
+        blocker = BlockingUpstream(value=self.daily_history())
+        with patch("app.yf.Ticker") as ticker_class:
+            ticker = ticker_class.return_value
+            ticker.history.side_effect = blocker
+            type(ticker).dividends = PropertyMock(return_value=pd.Series(dtype=float))
+
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                ten_years = executor.submit(get_history, "AAPL", "10y")
+                try:
+                    assert blocker.started.wait(timeout=5)
+                    one_year = executor.submit(get_history, "AAPL", "1y")
+                    assert _single_flight.wait_for_participants("history:AAPL:10y:1d", 2, timeout=5)
+                finally:
+                    blocker.release.set()
+                ten_year_history = ten_years.result(timeout=5)
+                one_year_history = one_year.result(timeout=5)
+
+        assert blocker.calls == 1
+        assert list(one_year_history) == list(ten_year_history)[-len(one_year_history) :]
+
+
+class TestHistoryDateRange:
+    @staticmethod
+    def days_ago(days):
+        return (pd.Timestamp.now("America/New_York").normalize() - pd.Timedelta(days=days)).strftime(
+            "%Y-%m-%d"
+        )
+
+    def test_slices_range_from_cached_covering_period(self, client, mock_ticker):
+        ticker = mock_ticker(history_df=TestHistoryRangeSubsumption.daily_history(years=11))
+        client.get("/history/AAPL/10y")
+        start, end = self.days_ago(5 * 366 + 14), self.days_ago(30)
+
+        response = client.get(f"/history/AAPL?start={start}&end={end}")
 
         assert response.status_code == 200
-        assert response.get_json() == {"status": "ok"}
+        assert ticker.history.call_count == 1
+        dates = [bar["date"] for bar in response.get_json()]
+        assert dates[0] >= start and dates[-1] <= end
+        assert (pd.Timestamp(dates[0]) - pd.Timestamp(start)).days <= 3
+        assert (pd.Timestamp(end) - pd.Timestamp(dates[-1])).days <= 3
+        assert response.headers["Cache-Control"] == f"public, max-age={HISTORY_CACHE_SECONDS['10y']}"
+
+    def test_range_hit_is_counted_and_gzipped_only_when_accepted(self, client, mock_ticker):
+        mock_ticker(history_df=TestHistoryRangeSubsumption.daily_history(years=11))
+        client.get("/history/AAPL/10y", headers={"Accept-Encoding": "gzip"})
+        path = f"/history/AAPL?start={self.days_ago(5 * 366 + 14)}&end={self.days_ago(30)}"
+
+        def compressed_bytes():
+            body = client.get("/metrics").get_data(as_text=True)
+            return body.split('compression_input_bytes_total{cache="history"} ')[1].split("\n")[0]
+
+        before = compressed_bytes()
+        identity = client.get(path)
+        after_identity = compressed_bytes()
+        gzipped = client.get(path, headers={"Accept-Encoding": "gzip"})
+
+        assert after_identity == before != compressed_bytes()
+        assert "Content-Encoding" not in identity.headers
+        assert gzipped.headers["Content-Encoding"] == "gzip"
+        assert json.loads(gzip.decompress(gzipped.get_data())) == identity.get_json()
+        body = client.get("/metrics").get_data(as_text=True)
+        assert 'stock_analyst_yfinance_history_cache_hits_total{match="range"} 2' in body
+
+    def test_miss_loads_shortest_covering_period_through_the_cache(self, client, mock_ticker):
+        ticker = mock_ticker(history_df=TestHistoryRangeSubsumption.daily_history(years=1))
+
+        response = client.get(f"/history/AAPL?start={self.days_ago(20)}")
+        client.get("/history/AAPL/1mo")
+
+        assert response.status_code == 200
+        assert ticker.history.call_count == 1
+        assert ticker.history.call_args.kwargs["period"] == "1mo"
+        assert response.get_json()[0]["date"] >= self.days_ago(20)
+
+    @pytest.mark.parametrize(
+        "query",
+        [
+            "",
+            "?start=2024-13-01",
+            "?start=2024-06-10&end=2024-06-01",
+            "?start=2024-06-10&interval=1wk",
+        ],
+    )
+    def test_rejects_invalid_ranges(self, client, mock_ticker, query):
+        ticker = mock_ticker(history_df=_sample_history())
+
+        response = client.get(f"/history/AAPL{query}")
+
+        assert response.status_code == 400
+        assert "error" in response.get_json()
+        ticker.history.assert_not_called()
+
+
+class TestHistoryResampling:
+    @staticmethod
+    def daily_frame():
+        index = pd.bdate_range("2024-01-02", "2024-04-30", tz="America/New_York")
+        # A whole missing week must still produce a flat bar, as yfinance fills it.
+        index = index[(index < "2024-02-12") | (index > "2024-02-16")]
+        closes = np.linspace(100.0, 130.0, len(index))
+        frame = pd.DataFrame(
+            {
+                "Open": closes - 0.5,
+                "High": closes + 1.0,
+                "Low": closes - 1.0,
+                "Close": closes,
+                "Adj Close": closes,
+                "Volume": np.arange(len(index)) * 10 + 1000,
+                "Dividends": 0.0,
+                "Stock Splits": 0.0,
+            },
+            index=index,
+        )
+        frame.iloc[20, frame.columns.get_loc("Dividends")] = 0.25
+        frame.iloc[40, frame.columns.get_loc("Stock Splits")] = 2.0
+        return frame
+
+    @pytest.mark.parametrize("interval", ["1wk", "1mo"])
+    def test_matches_yfinance_resampling_of_the_same_daily_bars(self, interval):
+        from yfinance.scrapers.history import PriceHistory as YahooPriceHistory
+
+        frame = self.daily_frame()
+        expected = YahooPriceHistory._resample(MagicMock(), frame.copy(), "1d", interval, "max")
+
+        resampled = _resample_history(
+            _normalize_history("AAPL", frame, None, intraday=False), "max", interval
+        )
+
+        assert resampled.records() == _normalize_history(
+            "AAPL", expected, None, intraday=False
+        ).records()
+
+    def test_serves_weekly_bars_from_cached_longer_daily_history(self, client, mock_ticker):
+        ticker = mock_ticker(history_df=TestHistoryRangeSubsumption.daily_history())
+        client.get("/history/AAPL/2y")
+
+        response = client.get("/history/AAPL/1y?interval=1wk")
+
+        assert response.status_code == 200
+        assert ticker.history.call_count == 1
+        dates = [pd.Timestamp(bar["date"]) for bar in response.get_json()]
+        assert all(date.dayofweek == 0 for date in dates)
+        assert dates[0] >= pd.Timestamp.now().normalize() - pd.DateOffset(years=1, days=11)
+        body = client.get("/metrics").get_data(as_text=True)
+        assert 'stock_analyst_yfinance_history_cache_hits_total{match="resampled"} 1' in body
+
+    def test_concurrent_intervals_share_one_load_of_the_daily_source(self):
+        blocker = BlockingUpstream(value=TestHistoryRangeSubsumption.daily_history())
+        with patch("app.yf.Ticker") as ticker_class:
+            ticker = ticker_class.return_value
+            ticker.history.side_effect = blocker
+            type(ticker).dividends = PropertyMock(return_value=pd.Series(dtype=float))
+
+            with ThreadPoolExecutor(max_workers=3) as executor:
+                futures = [
+                    executor.submit(get_history, "AAPL", period, interval)
+                    for period, interval in (("1y", "1wk"), ("1y", "1mo"), ("2y", "1d"))
+                ]
+                try:
+                    assert blocker.started.wait(timeout=5)
+                    assert _single_flight.wait_for_participants("history:AAPL:2y:1d", 3, timeout=5)
+                finally:
+                    blocker.release.set()
+                weekly, monthly, daily = [future.result(timeout=5) for future in futures]
+
+        assert blocker.calls == 1
+        assert len(daily) > len(weekly) > len(monthly) > 0
+
+    @staticmethod
+    def minute_frame():
+        index = pd.DatetimeIndex(
+            [
+                *pd.date_range("2024-03-08 09:30", "2024-03-08 11:14", freq="min"),
+                pd.Timestamp("2024-03-08 15:59"),
+                # The US switched to daylight saving time over this weekend.
+                *pd.date_range("2024-03-11 09:31", "2024-03-11 10:44", freq="min"),
+            ]
+        ).tz_localize("America/New_York")
+        closes = np.linspace(100.0, 110.0, len(index))
+        return pd.DataFrame(
+            {
+                "Open": closes - 0.1,
+                "High": closes + 0.5,
+                "Low": closes - 0.5,
+                "Close": closes,
+                "Volume": np.arange(len(index)) + 100,
+            },
+            index=index,
+        )
+
+    def test_known_session_anchors_bars_of_a_late_starting_day(self, client, mock_ticker):
+        index = pd.date_range("2024-03-11 09:47", "2024-03-11 11:14", freq="min", tz="America/New_York")
+        mock_ticker(
+            history_df=pd.DataFrame(
+                {"Open": 1.0, "High": 1.0, "Low": 1.0, "Close": 1.0, "Volume": 1}, index=index
+            )
+        )
+        sessions = TestMarketSessionTtls.sessions()
+
+        with patch("app._market_sessions", sessions):
+            guessed = client.get("/history/AAPL/1d?interval=1h").get_json()
+            _history_cache.clear()
+            sessions.observe("AAPL", "America/New_York", "EQUITY", None)
+            anchored = client.get("/history/AAPL/1d?interval=1h").get_json()
+
+        def starts(bars):
+            stamps = pd.to_datetime([bar["timestamp"] for bar in bars], unit="s", utc=True)
+            return list(stamps.tz_convert("America/New_York").strftime("%H:%M"))
+
+        assert starts(guessed) == ["09:47", "10:47"]
+        assert starts(anchored) == ["09:30", "10:30"]
+        assert [bar["volume"] for bar in anchored] == [43, 45]
+
+    @pytest.mark.parametrize(("interval", "rule"), [("5m", "5min"), ("1h", "1h")])
+    def test_serves_coarser_intraday_bars_from_cached_minute_series(
+        self, client, mock_ticker, interval, rule
+    ):
+        frame = self.minute_frame()
+        ticker = mock_ticker(history_df=frame)
+        client.get("/history/AAPL/5d?interval=1m")
+
+        response = client.get(f"/history/AAPL/5d?interval={interval}")
+
+        assert response.status_code == 200
+        assert ticker.history.call_count == 1
+        expected = (
+            frame.resample(rule, offset="30min")
+            .agg({"Open": "first", "Close": "last", "Low": "min", "High": "max", "Volume": "sum"})
+            .dropna()
+        )
+        data = response.get_json()
+        assert [bar["timestamp"] for bar in data] == [
+            int(timestamp.timestamp()) for timestamp in expected.index
+        ]
+        assert [bar["open"] for bar in data] == pytest.approx(expected["Open"].tolist())
+        assert [bar["close"] for bar in data] == pytest.approx(expected["Close"].tolist())
+        assert [bar["low"] for bar in data] == pytest.approx(expected["Low"].tolist())
+        assert [bar["volume"] for bar in data] == expected["Volume"].tolist()
+        body = client.get("/metrics").get_data(as_text=True)
+        assert 'stock_analyst_yfinance_history_cache_hits_total{match="resampled"} 1' in body
+
+    def test_coarser_intraday_miss_loads_and_caches_the_minute_series(self, client, mock_ticker):
+        ticker = mock_ticker(history_df=self.minute_frame())
+
+        hourly = client.get("/history/AAPL/1d?interval=1h")
+        fifteen_minutes = client.get("/history/AAPL/1d?interval=15m")
+        minutes = client.get("/history/AAPL/1d?interval=1m")
+
+        assert hourly.status_code == fifteen_minutes.status_code == minutes.status_code == 200
+        ticker.history.assert_called_once_with(
+            period="1d", interval="1m", auto_adjust=False, actions=True, repair=True
+        )
+        assert [bar["date"] for bar in hourly.get_json()] == ["2024-03-08"] * 3 + ["2024-03-11"] * 2
+        assert sum(bar["volume"] for bar in hourly.get_json()) == sum(
+            bar["volume"] for bar in minutes.get_json()
+        )
+
+
+class TestIncrementalHistoryRefresh:
+    @staticmethod
+    def frames():
+        full = TestHistoryRangeSubsumption.daily_history()
+        return full.iloc[:-1], full.iloc[-5:]
+
+    @staticmethod
+    def refresh_outcome(client, outcome):
+        body = client.get("/metrics").get_data(as_text=True)
+        return (
+            f'stock_analyst_yfinance_history_incremental_refreshes_total{{outcome="{outcome}"}} 1'
+        ) in body
+
+    def test_splices_recent_window_onto_expired_series(self, client, mock_ticker, clock, history_cache):
+        cached, tail = self.frames()
+        ticker = mock_ticker()
+        ticker.history.side_effect = [cached, tail]
+        first = client.get("/history/AAPL/10y").get_json()
+        clock.advance(HISTORY_CACHE_SECONDS["10y"])
+
+        refreshed = client.get("/history/AAPL/10y").get_json()
+
+        assert ticker.history.call_args.kwargs["period"] == "5d"
+        ticker.get_dividends.assert_not_called()
+        assert len(refreshed) == len(first) + 1
+        assert refreshed[:-5] == first[:-4]
+        assert refreshed[-1]["date"] == tail.index[-1].strftime("%Y-%m-%d")
+        assert self.refresh_outcome(client, "spliced")
+
+    def test_new_split_in_tail_forces_full_reload(self, client, mock_ticker, clock, history_cache):
+        cached, tail = self.frames()
+        tail = tail.assign(**{"Stock Splits": [0.0, 0.0, 0.0, 0.0, 2.0]})
+        ticker = mock_ticker()
+        ticker.history.side_effect = [cached, tail, cached]
+        client.get("/history/AAPL/10y")
+        clock.advance(HISTORY_CACHE_SECONDS["10y"])
+
+        client.get("/history/AAPL/10y")
+
+        assert ticker.history.call_count == 3
+        assert ticker.history.call_args.kwargs["period"] == "10y"
+        assert self.refresh_outcome(client, "split")
+
+    def test_restated_overlap_forces_full_reload(self, client, mock_ticker, clock, history_cache):
+        cached, tail = self.frames()
+        tail = tail.assign(Close=tail["Close"] * 0.98)
+        ticker = mock_ticker()
+        ticker.history.side_effect = [cached, tail, cached]
+        client.get("/history/AAPL/max")
+        clock.advance(HISTORY_CACHE_SECONDS["max"])
+
+        client.get("/history/AAPL/max")
+
+        assert ticker.history.call_count == 3
+        assert ticker.history.call_args.kwargs["period"] == "max"
+        assert self.refresh_outcome(client, "restatement")
+
+    def test_series_older_than_tail_windows_reloads_without_tail_fetch(self, client, mock_ticker, clock, history_cache):
+        cached, _tail = self.frames()
+        ticker = mock_ticker()
+        ticker.history.side_effect = [cached.iloc[:-30], cached]
+        client.get("/history/AAPL/10y")
+        clock.advance(HISTORY_CACHE_SECONDS["10y"])
+
+        client.get("/history/AAPL/10y")
+
+        assert [call.kwargs["period"] for call in ticker.history.call_args_list] == ["10y", "10y"]
+        assert self.refresh_outcome(client, "gap")
+
+    def test_short_periods_are_not_retained_after_expiry(self, client, mock_ticker, clock, history_cache):
+        mock_ticker(history_df=TestHistoryRangeSubsumption.daily_history())
+        client.get("/history/AAPL/1y")
+        clock.advance(HISTORY_CACHE_SECONDS["1y"])
+
+        assert history_cache.get_stale("history:AAPL:1y:1d") is None
+
+
+class TestResponseCompression:
+    @staticmethod
+    def long_history(bars=200):
+        index = pd.date_range("2024-01-01", periods=bars, freq="D")
+        closes = np.linspace(100.0, 150.0, bars)
+        return pd.DataFrame(
+            {"Open": closes, "Close": closes, "Low": closes - 1.0, "High": closes + 1.0, "Volume": 1000},
+            index=index,
+        )
+
+    def test_serves_cached_gzip_variant_when_accepted(self, client, mock_ticker):
+        mock_ticker(history_df=self.long_history())
+        identity = client.get("/history/AAPL/1y")
+
+        with patch("app.gzip.compress", side_effect=AssertionError("cache hit recompressed")):
+            compressed = client.get("/history/AAPL/1y", headers={"Accept-Encoding": "br, gzip;q=0.5"})
+
+        assert identity.headers.get("Content-Encoding") is None
+        assert compressed.headers["Content-Encoding"] == "gzip"
+        assert "Accept-Encoding" in compressed.headers["Vary"]
+        assert "Accept-Encoding" in identity.headers["Vary"]
+        assert gzip.decompress(compressed.get_data()) == identity.get_data()
+        assert len(compressed.get_data()) < len(identity.get_data()) / 3
+
+    @pytest.mark.parametrize("accept_encoding", ["gzip;q=0", "identity", "*;q=0"])
+    def test_serves_identity_when_gzip_is_refused(self, client, mock_ticker, accept_encoding):
+        mock_ticker(history_df=self.long_history())
+
+        response = client.get("/history/AAPL/1y", headers={"Accept-Encoding": accept_encoding})
+
+        assert response.headers.get("Content-Encoding") is None
+        assert len(response.get_json()) == 200
+
+    def test_small_bodies_have_no_gzip_variant(self, client, mock_ticker):
+        mock_ticker(info={"longName": "Apple Inc."})
+
+        response = client.get("/info/AAPL", headers={"Accept-Encoding": "gzip"})
+
+        assert response.headers.get("Content-Encoding") is None
+        assert response.get_json()["name"] == "Apple Inc."
+
+    def test_cache_budget_and_metrics_include_gzip_variant(self, client, mock_ticker):
+        mock_ticker(history_df=self.long_history())
+        identity_bytes = len(client.get("/history/AAPL/1y").get_data())
+        gzip_bytes = len(client.get("/history/AAPL/1y", headers={"Accept-Encoding": "gzip"}).get_data())
+
+        body = client.get("/metrics").get_data(as_text=True)
+
+        assert _history_cache.total_bytes >= identity_bytes + gzip_bytes
+        assert (
+            f'stock_analyst_yfinance_compression_input_bytes_total{{cache="history"}} {identity_bytes}'
+        ) in body
+        assert (
+            f'stock_analyst_yfinance_compression_output_bytes_total{{cache="history"}} {gzip_bytes}'
+        ) in body
+        assert 'stock_analyst_yfinance_compression_cpu_seconds_total{cache="history"}' in body
+        assert 'stock_analyst_yfinance_response_encodings_total{encoding="gzip"} 1' in body
+        assert 'stock_analyst_yfinance_response_encodings_total{encoding="identity"} 1' in body
+
+
+class TestConditionalResponses:
+    def test_matching_etag_returns_304_without_re_encoding(self, client, mock_ticker):
+        mock_ticker(history_df=_sample_history(), info={"longName": "Apple Inc."})
+        first = client.get("/history/AAPL/5y")
+        etag = first.headers["ETag"]
+
+        with patch.object(app.json, "response", side_effect=AssertionError("revalidation re-encoded")):
+            revalidated = client.get("/history/AAPL/5y", headers={"If-None-Match": etag})
+            weak = client.get("/history/AAPL/5y", headers={"If-None-Match": f'"other", W/{etag}'})
+
+        assert first.status_code == 200
+        assert etag.startswith('"') and not etag.startswith("W/")
+        assert revalidated.status_code == 304
+        assert revalidated.get_data() == b""
+        assert revalidated.headers["ETag"] == etag
+        assert revalidated.headers["Cache-Control"] == "public, max-age=86400"
+        assert weak.status_code == 304
+
+    def test_mismatched_etag_returns_full_body(self, client, mock_ticker):
+        mock_ticker(info={"longName": "Apple Inc."})
+        first = client.get("/info/AAPL")
+
+        response = client.get(
+            "/info/AAPL",
+            headers={"If-None-Match": '"stale"', "If-Modified-Since": first.headers["Last-Modified"]},
+        )
+
+        assert response.status_code == 200
+        assert response.get_json()["name"] == "Apple Inc."
+        assert response.headers["ETag"] == first.headers["ETag"]
+
+    def test_last_modified_reports_fetch_time_and_supports_if_modified_since(self, client, mock_ticker):
+        mock_ticker(info={"longName": "Apple Inc."})
+        with patch("app.time.time", return_value=1_718_000_000.0):
+            first = client.get("/info/AAPL")
+
+        response = client.get("/info/AAPL", headers={"If-Modified-Since": first.headers["Last-Modified"]})
+
+        assert first.headers["Last-Modified"] == "Mon, 10 Jun 2024 06:13:20 GMT"
+        assert response.status_code == 304
+
+    def test_each_encoding_has_its_own_strong_etag(self, client, mock_ticker):
+        mock_ticker(history_df=TestResponseCompression.long_history())
+        identity = client.get("/history/AAPL/1y")
+        compressed = client.get("/history/AAPL/1y", headers={"Accept-Encoding": "gzip"})
+
+        cross_validated = client.get(
+            "/history/AAPL/1y",
+            headers={"Accept-Encoding": "gzip", "If-None-Match": identity.headers["ETag"]},
+        )
+
+        assert compressed.headers["ETag"] == identity.headers["ETag"][:-1] + '-gzip"'
+        assert cross_validated.status_code == 200
+        assert cross_validated.headers["Content-Encoding"] == "gzip"
+
+
+class TestStaleWhileRevalidate:
+    @pytest.fixture(autouse=True)
+    def info_window(self, metadata_cache):
+        with patch.dict("app.STALE_WHILE_REVALIDATE_SECONDS", {"info": 60}):
+            yield
+
+    @staticmethod
+    def info(price):
+        return {"symbol": "AAPL", "longName": "Apple Inc.", "regularMarketPrice": price}
+
+    @staticmethod
+    def wait_for(condition):
+        deadline = time.monotonic() + 5
+        while not condition():
+            assert time.monotonic() < deadline, "background refresh did not finish"
+            time.sleep(0.005)
+
+    def test_serves_expired_entry_while_one_background_refresh_runs(
+        self, client, mock_ticker, clock, metadata_cache
+    ):
+        ticker = mock_ticker(info=self.info(195.0))
+        first = client.get("/info/AAPL")
+        clock.advance(INFO_CACHE_SECONDS + 10)
+        blocker = BlockingUpstream(value=self.info(197.0))
+        type(ticker).info = PropertyMock(side_effect=blocker)
+
+        try:
+            stale = [client.get("/info/AAPL") for _ in range(3)]
+            assert blocker.started.wait(timeout=5)
+        finally:
+            blocker.release.set()
+        self.wait_for(lambda: metadata_cache.contains("info:AAPL") and _single_flight.active_count == 0)
+        refreshed = client.get("/info/AAPL")
+
+        assert blocker.calls == 1
+        for response in stale:
+            assert response.status_code == 200
+            assert response.get_data() == first.get_data()
+            assert response.headers["X-Data-Stale"] == "true"
+            assert int(response.headers["Age"]) >= 0
+            assert response.headers["Cache-Control"] == "public, max-age=0"
+        assert refreshed.get_json()["price"] == 197.0
+        assert "X-Data-Stale" not in refreshed.headers
+        assert refreshed.headers["Cache-Control"] == f"public, max-age={INFO_CACHE_SECONDS}"
+        body = client.get("/metrics").get_data(as_text=True)
+        assert 'stock_analyst_yfinance_stale_responses_total{cache="metadata",reason="revalidating"} 3' in body
+        self.wait_for(
+            lambda: 'stale_refreshes_total{cache="metadata",outcome="refreshed"} 1'
+            in client.get("/metrics").get_data(as_text=True)
+        )
+
+    def test_failed_refresh_keeps_serving_stale_until_the_window_ends(
+        self, client, mock_ticker, clock
+    ):
+        ticker = mock_ticker(info=self.info(195.0))
+        client.get("/info/AAPL")
+        clock.advance(INFO_CACHE_SECONDS + 10)
+        type(ticker).info = PropertyMock(side_effect=YFRateLimitError())
+
+        stale = client.get("/info/AAPL")
+        self.wait_for(
+            lambda: 'stale_refreshes_total{cache="metadata",outcome="error"} 1'
+            in client.get("/metrics").get_data(as_text=True)
+        )
+        still_stale = client.get("/info/AAPL")
+        self.wait_for(lambda: _single_flight.active_count == 0)
+        clock.advance(60)
+        expired = client.get("/info/AAPL")
+
+        assert stale.headers["X-Data-Stale"] == still_stale.headers["X-Data-Stale"] == "true"
+        # The rate-limited refresh forced the circuit open, so the foreground load is rejected.
+        assert expired.status_code == 503
+        assert "X-Data-Stale" not in expired.headers
+
+
+class TestStaleIfError:
+    @pytest.fixture
+    def cache_on_evict(self):
+        return _retain_last_known_good
+
+    @pytest.fixture(autouse=True)
+    def caches(self, history_cache, metadata_cache):
+        return history_cache, metadata_cache
+
+    def test_serves_last_known_good_info_through_rate_limit_and_open_circuit(
+        self, client, mock_ticker, clock
+    ):
+        ticker = mock_ticker(info={"symbol": "AAPL", "longName": "Apple Inc."})
+        first = client.get("/info/AAPL")
+        clock.advance(INFO_CACHE_SECONDS)
+        type(ticker).info = PropertyMock(side_effect=YFRateLimitError())
+
+        rate_limited = client.get("/info/AAPL")
+        circuit_open = client.get("/info/AAPL")
+
+        for response, reason in ((rate_limited, "rate_limited"), (circuit_open, "circuit_open")):
+            assert response.status_code == 200
+            assert response.get_data() == first.get_data()
+            assert response.headers["X-Data-Stale"] == "true"
+            assert response.headers["X-Data-Stale-Reason"] == reason
+            assert response.headers["Cache-Control"] == "public, max-age=0"
+        assert _upstream_circuit.state == CircuitState.OPEN
+        assert client.get("/info/MSFT").status_code == 503
+        body = client.get("/metrics").get_data(as_text=True)
+        for reason in ("rate_limited", "circuit_open"):
+            assert (
+                f'stock_analyst_yfinance_stale_responses_total{{cache="metadata",reason="{reason}"}} 1'
+                in body
+            )
+
+    def test_serves_retained_history_when_upstream_fails(self, client, mock_ticker, clock):
+        ticker = mock_ticker(history_df=TestHistoryRangeSubsumption.daily_history())
+        first = client.get("/history/AAPL/10y")
+        clock.advance(HISTORY_CACHE_SECONDS["10y"])
+        ticker.history.side_effect = RuntimeError("upstream unavailable")
+
+        response = client.get("/history/AAPL/10y")
+
+        assert response.status_code == 200
+        assert response.get_data() == first.get_data()
+        assert response.headers["X-Data-Stale-Reason"] == "upstream_error"
+        assert "Age" in response.headers
+
+    def test_retained_history_older_than_the_maximum_age_is_not_served(
+        self, client, mock_ticker, clock, history_cache
+    ):
+        ticker = mock_ticker(history_df=TestHistoryRangeSubsumption.daily_history())
+        client.get("/history/AAPL/10y")
+        clock.advance(5 * 86400)
+        ticker.history.side_effect = YFRateLimitError()
+
+        with patch("app.time.time", return_value=time.time() + 5 * 86400):
+            rate_limited = client.get("/history/AAPL/10y")
+            circuit_open = client.get("/history/AAPL/10y")
+
+        assert history_cache.get_stale("history:AAPL:10y:1d") is not None
+        assert (rate_limited.status_code, circuit_open.status_code) == (429, 503)
+        assert "X-Data-Stale" not in circuit_open.headers
+
+    def test_retained_negative_entries_are_not_served_as_last_known_good(
+        self, client, mock_ticker, clock, metadata_cache
+    ):
+        ticker = mock_ticker(info={"trailingPegRatio": None})
+        assert client.get("/info/NOPE").status_code == 404
+        negative = metadata_cache.get("info:NOPE")
+        # A disk row or a stale window can retain the entry past its TTL.
+        metadata_cache.set("info:NOPE", negative, NEGATIVE_CACHE_SECONDS, stale_seconds=3600)
+        clock.advance(NEGATIVE_CACHE_SECONDS)
+        type(ticker).info = PropertyMock(side_effect=YFRateLimitError())
+
+        response = client.get("/info/NOPE")
+
+        assert metadata_cache.get_stale("info:NOPE") == negative
+        assert response.status_code == 429
+
+    def test_last_known_good_expires_after_its_maximum_age(self, client, mock_ticker, clock):
+        ticker = mock_ticker(info={"symbol": "AAPL", "longName": "Apple Inc."})
+        client.get("/info/AAPL")
+        clock.advance(INFO_CACHE_SECONDS)
+        type(ticker).info = PropertyMock(side_effect=YFRateLimitError())
+
+        with patch("app.time.time", return_value=time.time() + 86400):
+            response = client.get("/info/AAPL")
+
+        assert response.status_code == 429
+
+
+class TestRefreshAhead:
+    @staticmethod
+    def scheduler(refresh, expiry, clock, budget_per_minute=60, jitter=(0.0,), on_outcome=None):
+        draws = iter(jitter * 100)
+        return RefreshAheadScheduler(
+            refresh,
+            expiry,
+            budget_per_minute=budget_per_minute,
+            min_hits=3,
+            lead_fraction=0.1,
+            jitter_fraction=0.5,
+            min_lead_seconds=2,
+            half_life_seconds=300,
+            max_keys=16,
+            on_outcome=on_outcome,
+            clock=clock,
+            random=lambda: next(draws),
+        )
+
+    @pytest.fixture
+    def app_scheduler(self, clock, metadata_cache):
+        import app as app_module
+
+        scheduler = self.scheduler(
+            app_module._refresh_ahead_load,
+            metadata_cache.expiry,
+            clock,
+            on_outcome=lambda _key, outcome: _metrics.record_refresh_ahead("metadata", outcome),
+        )
+        with patch("app._refresh_ahead", scheduler):
+            yield scheduler
+
+    def test_refreshes_a_hot_entry_before_readers_see_it_expire(
+        self, client, mock_ticker, clock, app_scheduler
+    ):
+        ticker = mock_ticker(info={"symbol": "AAPL", "longName": "Apple Inc.", "regularMarketPrice": 1.0})
+        client.get("/info/AAPL")
+        type(ticker).info = PropertyMock(
+            return_value={"symbol": "AAPL", "longName": "Apple Inc.", "regularMarketPrice": 2.0}
+        )
+
+        clock.advance(INFO_CACHE_SECONDS - 60)
+        client.get("/info/AAPL")
+        client.get("/info/AAPL")
+        assert app_scheduler.run_once() == 0
+        clock.advance(40)
+        client.get("/info/AAPL")
+        assert app_scheduler.run_once() == 1
+        clock.advance(30)
+        response = client.get("/info/AAPL")
+
+        assert response.get_json()["price"] == 2.0
+        assert "X-Data-Stale" not in response.headers
+        body = client.get("/metrics").get_data(as_text=True)
+        # Only the first read's lookups, before and inside its flight, missed.
+        assert 'stock_analyst_yfinance_cache_lookups_total{cache="metadata",result="miss"} 2' in body
+        assert 'stock_analyst_yfinance_refresh_ahead_total{cache="metadata",outcome="refreshed"} 1' in body
+
+    def test_ignores_cold_keys(self, client, mock_ticker, clock, app_scheduler):
+        ticker = mock_ticker(info={"symbol": "AAPL", "longName": "Apple Inc."})
+        client.get("/info/AAPL")
+        client.get("/info/AAPL")
+        clock.advance(INFO_CACHE_SECONDS - 5)
+
+        assert app_scheduler.run_once() == 0
+        assert ticker.mock_calls == []
+
+    def test_defers_without_a_closed_circuit_or_a_spare_permit(
+        self, client, mock_ticker, clock, app_scheduler
+    ):
+        ticker = mock_ticker(info={"symbol": "AAPL", "longName": "Apple Inc."})
+        client.get("/info/AAPL")
+        clock.advance(INFO_CACHE_SECONDS - 5)
+        for _ in range(3):
+            client.get("/info/AAPL")
+        info = PropertyMock(side_effect=AssertionError("refreshed under pressure"))
+        type(ticker).info = info
+
+        with patch.object(
+            CircuitBreaker, "state", new_callable=PropertyMock, return_value=CircuitState.HALF_OPEN
+        ):
+            assert app_scheduler.run_once() == 0
+        with patch("app._loader_bulkhead", LoaderBulkhead(max_active=1, acquire_timeout_seconds=0)):
+            assert app_scheduler.run_once() == 0
+
+        info.assert_not_called()
+        body = client.get("/metrics").get_data(as_text=True)
+        assert 'stock_analyst_yfinance_refresh_ahead_total{cache="metadata",outcome="deferred"} 2' in body
+
+    def test_budget_limits_refreshes_and_jitter_staggers_leads(self, clock):
+        ttls = {"info:AAPL": (13.0, 100.0), "info:MSFT": (13.0, 100.0), "info:NVDA": (9.0, 100.0)}
+        refreshed = []
+        outcomes = []
+
+        def refresh(key, _loader):
+            refreshed.append(key)
+            ttls[key] = (100.0, 100.0)
+            return True
+
+        scheduler = self.scheduler(
+            refresh,
+            ttls.get,
+            clock,
+            budget_per_minute=1,
+            # AAPL's lead stretches to 15s while MSFT and NVDA keep 10s.
+            jitter=(1.0, 0.0, 0.0),
+            on_outcome=lambda key, outcome: outcomes.append((key, outcome)),
+        )
+        for key in ("info:AAPL", "info:MSFT", "info:NVDA"):
+            for _ in range(3):
+                scheduler.record(key, None)
+
+        scheduler.run_once()
+        clock.advance(60)
+        for key in ttls:
+            scheduler.record(key, None)
+        scheduler.run_once()
+
+        assert refreshed == ["info:AAPL", "info:NVDA"]
+        assert ("info:NVDA", "budget_exhausted") in outcomes
+
+    def test_failed_refresh_forgets_the_key_until_it_is_hot_again(self, clock):
+        def refresh(_key, _loader):
+            raise UpstreamDataError("upstream unavailable")
+
+        scheduler = self.scheduler(refresh, lambda _key: (1.0, 100.0), clock)
+        for _ in range(3):
+            scheduler.record("info:AAPL", None)
+
+        assert scheduler.run_once() == 0
+        assert scheduler.tracked_count == 0
+
+
+class TestCacheWarmup:
+    @staticmethod
+    def watchlist(tmp_path, content):
+        path = tmp_path / "watchlist.json"
+        path.write_text(json.dumps(content))
+        return str(path)
+
+    def test_watchlist_expands_symbols_and_fx_pairs_into_cache_keys(self, tmp_path):
+        path = self.watchlist(
+            tmp_path,
+            {
+                "symbols": ["AAPL"],
+                "fx": ["USD/PLN", "eur/usd"],
+                "history": [{"period": "1y", "interval": "1wk"}, {"period": "5d"}],
+            },
+        )
+
+        assert list(_watchlist_loads(path)) == [
+            "info:AAPL",
+            "history:AAPL:1y:1wk",
+            "history:AAPL:5d:1d",
+            "info:PLN=X",
+            "history:PLN=X:1y:1wk",
+            "history:PLN=X:5d:1d",
+            "info:EURUSD=X",
+            "history:EURUSD=X:1y:1wk",
+            "history:EURUSD=X:5d:1d",
+        ]
+        assert list(_watchlist_loads(self.watchlist(tmp_path, {"symbols": ["MSFT"]}))) == [
+            "info:MSFT",
+            "history:MSFT:10y:1d",
+        ]
+
+    @pytest.mark.parametrize(
+        "content",
+        [
+            ["AAPL"],
+            {"symbols": "AAPL"},
+            {"symbols": [""]},
+            {"fx": ["EURPLN"]},
+            {"history": [{"period": "7y"}]},
+            {"history": [{"period": "1y", "interval": "4h"}]},
+        ],
+    )
+    def test_rejects_invalid_watchlists(self, tmp_path, content):
+        with pytest.raises(RuntimeError):
+            _watchlist_loads(self.watchlist(tmp_path, content))
+
+    def test_warms_keys_through_the_cache_path_and_gates_readiness(
+        self, client, mock_ticker, tmp_path
+    ):
+        ticker = mock_ticker(
+            history_df=_sample_history(), info={"symbol": "AAPL", "longName": "Apple Inc."}
+        )
+        warmup = CacheWarmup(
+            _watchlist_loads(self.watchlist(tmp_path, {"symbols": ["AAPL", "MSFT"]})),
+            max_concurrency=2,
+            per_minute=600,
+            on_load=lambda key, outcome: _metrics.record_warmup_load(
+                "history" if key.startswith("history:") else "metadata", outcome
+            ),
+            on_complete=_metrics.record_warmup_duration,
+            sleep=lambda _seconds: None,
+        )
+        with patch("app._warmup", warmup):
+            warming = client.get("/ready")
+            type(ticker).info = PropertyMock(
+                side_effect=[{"symbol": "AAPL", "longName": "Apple Inc."}, RuntimeError("down")]
+            )
+            warmup.run()
+            ready = client.get("/ready")
+
+        assert warming.status_code == 503
+        assert warming.get_json()["status"] == "warming"
+        assert ready.status_code == 200
+        assert ready.get_json() == {
+            "status": "ready",
+            "warmup": {"state": "complete", "total": 4, "loaded": 3, "failed": 1},
+        }
+        assert _history_cache.contains("history:AAPL:10y:1d")
+        assert _history_cache.contains("history:MSFT:10y:1d")
+        body = client.get("/metrics").get_data(as_text=True)
+        assert 'stock_analyst_yfinance_warmup_loads_total{cache="history",outcome="loaded"} 2' in body
+        assert 'stock_analyst_yfinance_warmup_loads_total{cache="metadata",outcome="failed"} 1' in body
+        assert "stock_analyst_yfinance_warmup_duration_seconds " in body
+        assert 'route="/ready"' not in body
+
+    def test_bounds_concurrency_and_spaces_load_starts(self):
+        clock = FakeClock()
+        sleeps = []
+        active = []
+        peak = []
+        lock = threading.Lock()
+
+        def load():
+            with lock:
+                active.append(None)
+                peak.append(len(active))
+            time.sleep(0.02)
+            with lock:
+                active.pop()
+
+        def sleep(seconds):
+            sleeps.append(seconds)
+            clock.advance(seconds)
+
+        warmup = CacheWarmup(
+            {f"info:{index}": load for index in range(6)},
+            max_concurrency=2,
+            per_minute=30,
+            clock=clock,
+            sleep=sleep,
+        )
+        warmup.run()
+
+        assert max(peak) <= 2
+        assert sleeps == [0.0, 2.0, 2.0, 2.0, 2.0, 2.0]
+        assert warmup.progress() == {"state": "complete", "total": 6, "loaded": 6, "failed": 0}
+
+
+class TestMarketSessionTtls:
+    @staticmethod
+    def at(local, zone="America/New_York"):
+        return pd.Timestamp(local, tz=zone).timestamp()
+
+    @staticmethod
+    def sessions(calendar=None, max_extension_seconds=4 * 86400, tmp_path=None):
+        path = None
+        if calendar is not None:
+            path = tmp_path / "calendar.json"
+            path.write_text(json.dumps(calendar))
+        return MarketSessions(
+            _trading_sessions(None if path is None else str(path)),
+            settle_seconds=1800,
+            holiday_grace_seconds=1800,
+            max_extension_seconds=max_extension_seconds,
+            max_symbols=16,
+        )
+
+    def test_keeps_fixed_ttls_while_open_and_extends_them_until_the_next_open(self):
+        sessions = self.sessions()
+        sessions.observe("AAPL", "America/New_York", "EQUITY", None)
+        monday_open = self.at("2026-10-19 09:30")
+
+        # 2026-10-16 is a Friday; the close settles 30 minutes after 16:00.
+        assert sessions.fresh_until("AAPL", self.at("2026-10-16 11:00"), 120) == (
+            self.at("2026-10-16 11:02"),
+            "open",
+        )
+        assert sessions.fresh_until("AAPL", self.at("2026-10-16 16:20"), 120)[1] == "open"
+        assert sessions.fresh_until("AAPL", self.at("2026-10-16 16:40"), 120) == (monday_open, "closed")
+        assert sessions.fresh_until("AAPL", self.at("2026-10-18 12:00"), 120) == (monday_open, "closed")
+        assert sessions.fresh_until("AAPL", self.at("2026-10-19 09:29"), 120) == (
+            self.at("2026-10-19 09:31"),
+            "closed",
+        )
+
+    def test_round_the_clock_unknown_and_capped_symbols(self):
+        sessions = self.sessions(max_extension_seconds=3600)
+        sessions.observe("BTC-USD", "UTC", "CRYPTOCURRENCY", None)
+        sessions.observe("EURUSD=X", "Europe/London", "CURRENCY", None)
+        sessions.observe("ODD", "America/Caracas", "EQUITY", None)
+        sessions.observe("AAPL", "America/New_York", "EQUITY", None)
+        saturday = self.at("2026-10-17 12:00")
+
+        assert sessions.fresh_until("BTC-USD", saturday, 30) == (saturday + 30, "always_open")
+        assert sessions.fresh_until("EURUSD=X", saturday, 300) == (saturday + 300, "always_open")
+        assert sessions.fresh_until("ODD", saturday, 300) == (saturday + 300, "unknown")
+        assert sessions.fresh_until("NEVER", saturday, 300) == (saturday + 300, "unknown")
+        assert sessions.fresh_until("AAPL", saturday, 300) == (saturday + 3600, "closed")
+
+    def test_calendar_holidays_and_a_missed_open_close_the_session(self, tmp_path):
+        sessions = self.sessions(
+            {"America/New_York": {"open": "09:30", "close": "16:00", "holidays": ["2026-11-26"]}},
+            tmp_path=tmp_path,
+        )
+        sessions.observe("AAPL", "America/New_York", "EQUITY", None)
+
+        assert sessions.fresh_until("AAPL", self.at("2026-11-26 12:00"), 120) == (
+            self.at("2026-11-27 09:30"),
+            "closed",
+        )
+
+        with patch.object(sessions, "_clock", return_value=self.at("2026-10-19 10:30")):
+            sessions.observe("AAPL", "America/New_York", "EQUITY", int(self.at("2026-10-16 16:00")))
+        assert sessions.fresh_until("AAPL", self.at("2026-10-19 10:31"), 120) == (
+            self.at("2026-10-20 09:30"),
+            "holiday",
+        )
+
+    @pytest.mark.parametrize(
+        "calendar",
+        [
+            {"Mars/Olympus": {"open": "09:00", "close": "17:00"}},
+            {"America/New_York": {"open": "16:00", "close": "09:30"}},
+            {"America/New_York": {"open": "09:30"}},
+        ],
+    )
+    def test_rejects_invalid_calendars(self, tmp_path, calendar):
+        with pytest.raises(RuntimeError):
+            self.sessions(calendar, tmp_path=tmp_path)
+
+    def test_only_ttls_assigned_at_insert_count_as_session_decisions(
+        self, client, mock_ticker, clock, history_cache
+    ):
+        ticker = mock_ticker(history_df=TestHistoryRangeSubsumption.daily_history())
+        loaded_at = time.time()
+
+        with patch("app._market_sessions", self.sessions()):
+            client.get("/history/AAPL/10y")
+            client.get("/history/AAPL/1y")
+            # The derived 1y entry has expired, and its 10y source is too old to slice again.
+            clock.advance(HISTORY_CACHE_SECONDS["1y"] + 60)
+            with patch("app.time.time", return_value=loaded_at + HISTORY_CACHE_SECONDS["1y"] + 60):
+                client.get("/history/AAPL/1y")
+
+        assert ticker.history.call_count == 2
+        body = client.get("/metrics").get_data(as_text=True)
+        assert 'session_ttl_decisions_total{cache="history",decision="unknown"} 3' in body
+
+    def test_info_is_not_extended_over_the_weekend(self, client, mock_ticker, clock, metadata_cache):
+        ticker = mock_ticker()
+        info = {
+            "symbol": "AAPL",
+            "longName": "Apple Inc.",
+            "exchangeTimezoneName": "America/New_York",
+            "quoteType": "EQUITY",
+            "regularMarketPrice": 190.0,
+            "previousClose": 185.0,
+            "regularMarketTime": int(self.at("2026-10-16 16:00")),
+        }
+        type(ticker).info = PropertyMock(return_value=info)
+        responses = []
+
+        with patch("app._market_sessions", self.sessions()):
+            # 2026-10-16 is a Friday; 20:00 New York is already 00:00 UTC on Saturday.
+            for local in ("2026-10-16 16:40", "2026-10-16 19:58", "2026-10-17 12:00"):
+                clock.now = self.at(local)
+                with patch("app.time.time", return_value=clock.now):
+                    responses.append(client.get("/info/AAPL").get_json())
+                responses[-1]["ttl"] = metadata_cache.expiry("info:AAPL")[1]
+
+        assert [response["previous_close"] for response in responses] == [185.0, 185.0, 190.0]
+        assert [response["ttl"] for response in responses] == pytest.approx([300, 120, 300])
+        body = client.get("/metrics").get_data(as_text=True)
+        assert 'session_ttl_decisions_total{cache="metadata"' not in body
+
+
+class TestAdaptiveTtl:
+    def test_grows_geometrically_while_unchanged_and_resets_on_change(self):
+        ttls = AdaptiveTtl(growth_factor=2, max_ttl_seconds=3000, max_keys=16)
+
+        loads = [ttls.ttl_for("info:X", fingerprint, 300) for fingerprint in "aaaaaba"]
+
+        assert loads == [
+            (300, "new"),
+            (600, "unchanged"),
+            (1200, "unchanged"),
+            (2400, "unchanged"),
+            (3000, "unchanged"),
+            (300, "changed"),
+            (300, "changed"),
+        ]
+
+    def test_floor_wins_over_a_lower_cap_and_old_keys_are_forgotten(self):
+        ttls = AdaptiveTtl(growth_factor=2, max_ttl_seconds=0, max_keys=1)
+
+        assert ttls.ttl_for("info:X", "a", 300) == (300, "new")
+        assert ttls.ttl_for("info:X", "a", 300) == (300, "unchanged")
+        ttls.ttl_for("info:Y", "a", 300)
+        assert ttls.ttl_for("info:X", "a", 300) == (300, "new")
+
+    def test_unchanged_reloads_stretch_the_cached_info_ttl(
+        self, client, mock_ticker, clock, metadata_cache
+    ):
+        info = {"symbol": "DEAD", "longName": "Dormant Coin", "quoteType": "CRYPTOCURRENCY"}
+        ticker = mock_ticker(info=info)
+        ttls = []
+
+        for _ in range(3):
+            client.get("/info/DEAD")
+            ttls.append(metadata_cache.expiry("info:DEAD")[1])
+            clock.advance(ttls[-1])
+        type(ticker).info = PropertyMock(return_value={**info, "longName": "Renamed"})
+        client.get("/info/DEAD")
+        ttls.append(metadata_cache.expiry("info:DEAD")[1])
+
+        assert ttls == pytest.approx(
+            [INFO_CACHE_SECONDS, 2 * INFO_CACHE_SECONDS, 4 * INFO_CACHE_SECONDS, INFO_CACHE_SECONDS],
+            abs=1,
+        )
+        assert 4 * INFO_CACHE_SECONDS <= ADAPTIVE_TTL_MAX_SECONDS
+        body = client.get("/metrics").get_data(as_text=True)
+        assert 'stock_analyst_yfinance_adaptive_ttl_loads_total{cache="metadata",content="unchanged"} 2' in body
+        assert 'stock_analyst_yfinance_adaptive_ttl_loads_total{cache="metadata",content="changed"} 1' in body
+
+    def test_grown_ttl_ends_at_the_open_and_needs_a_known_session(
+        self, client, mock_ticker, metadata_cache
+    ):
+        ticker = mock_ticker()
+        at = TestMarketSessionTtls.at
+
+        def reload(symbol, local, timezone):
+            type(ticker).info = PropertyMock(
+                return_value={"symbol": symbol, "quoteType": "EQUITY", "exchangeTimezoneName": timezone}
+            )
+            metadata_cache.clear()
+            with patch("app.time.time", return_value=at(local)):
+                client.get(f"/info/{symbol}")
+            return metadata_cache.expiry(f"info:{symbol}")[1]
+
+        with patch("app._market_sessions", TestMarketSessionTtls.sessions()):
+            # 2026-10-19 is a Monday; each reload is unchanged, so the TTL keeps doubling.
+            for local in ("2026-10-19 07:00", "2026-10-19 07:30", "2026-10-19 08:00"):
+                reload("AAPL", local, "America/New_York")
+            before_open = reload("AAPL", "2026-10-19 09:20", "America/New_York")
+            unknown = [reload("ODD", "2026-10-19 09:20", "America/Caracas") for _ in range(3)]
+
+        assert before_open == pytest.approx(600)
+        assert unknown == pytest.approx([INFO_CACHE_SECONDS] * 3)
+
+
+class TestNegativeCaching:
+    def test_unknown_symbol_is_cached_briefly(self, client, mock_ticker, metadata_cache):
+        info = PropertyMock(return_value={"trailingPegRatio": None})
+        type(mock_ticker()).info = info
+
+        responses = [client.get("/info/NOPE") for _ in range(2)]
+        batch = client.post("/info/batch", json={"symbols": ["NOPE"]})
+
+        assert metadata_cache.expiry("info:NOPE")[1] == NEGATIVE_CACHE_SECONDS
+        assert [response.status_code for response in responses] == [404, 404]
+        assert batch.get_json()["NOPE"]["status"] == 404
+        assert info.call_count == 1
+        body = client.get("/metrics").get_data(as_text=True)
+        assert 'stock_analyst_yfinance_negative_cache_hits_total{cache="metadata"} 2' in body
+
+    def test_history_of_a_known_missing_symbol_skips_yahoo(self, client, mock_ticker):
+        ticker = mock_ticker(info={"trailingPegRatio": None})
+
+        assert client.get("/info/NOPE").status_code == 404
+        response = client.get("/history/NOPE/1y")
+
+        assert response.status_code == 404
+        ticker.history.assert_not_called()
+
+    def test_empty_history_reuses_cached_info_and_is_cached(self, client, mock_ticker):
+        ticker = mock_ticker()
+        info = PropertyMock(return_value={"symbol": "AAPL", "longName": "Apple Inc."})
+        type(ticker).info = info
+        ticker.history.side_effect = YFPricesMissingError("AAPL", "for requested range")
+
+        assert client.get("/info/AAPL").status_code == 200
+        responses = [client.get("/history/AAPL/1y") for _ in range(2)]
+
+        assert [response.get_json() for response in responses] == [[], []]
+        assert info.call_count == 1
+        assert ticker.history.call_count == 1
+        body = client.get("/metrics").get_data(as_text=True)
+        assert 'stock_analyst_yfinance_negative_cache_hits_total{cache="history"} 1' in body
+
+
+class TestHealthEndpoint:
+    def test_health_returns_ok(self, client):
+        response = client.get("/health")
+
+        assert response.status_code == 200
+        assert response.get_json() == {"status": "ok"}
+
+    def test_ready_without_a_watchlist(self, client):
+        response = client.get("/ready")
+
+        assert response.status_code == 200
+        assert response.get_json() == {"status": "ready"}
 
 
 class TestMetricsEndpoint:
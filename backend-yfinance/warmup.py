@@ -0,0 +1,98 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+logger = logging.getLogger(__name__)
+
+
+class CacheWarmup:
+    """Run a fixed list of cache loads once, in the background, and report progress."""
+
+    def __init__(
+        self,
+        loads,
+        *,
+        max_concurrency,
+        per_minute,
+        on_load=None,
+        on_complete=None,
+        clock=time.monotonic,
+        sleep=time.sleep,
+    ):
+        if max_concurrency <= 0:
+            raise ValueError("max_concurrency must be positive")
+        if per_minute <= 0:
+            raise ValueError("per_minute must be positive")
+        self.max_concurrency = max_concurrency
+        self.per_minute = per_minute
+        self._loads = dict(loads)
+        self._on_load = on_load or (lambda _label, _outcome: None)
+        self._on_complete = on_complete or (lambda _seconds: None)
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._state = "pending"
+        self._loaded = 0
+        self._failed = 0
+        self._thread = None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self.run, name="cache-warmup", daemon=True)
+        self._thread.start()
+
+    def run(self):
+        with self._lock:
+            self._state = "running"
+        started_at = self._clock()
+        slots = threading.BoundedSemaphore(self.max_concurrency)
+        spacing = 60 / self.per_minute
+        with ThreadPoolExecutor(self.max_concurrency, thread_name_prefix="cache-warmup") as executor:
+            for index, (label, loader) in enumerate(self._loads.items()):
+                slots.acquire()
+                self._sleep(max(0.0, started_at + index * spacing - self._clock()))
+                executor.submit(self._load, label, loader, slots)
+        duration = self._clock() - started_at
+        with self._lock:
+            self._state = "complete"
+        logger.info(
+            "Cache warm-up finished in %.1fs: %d loaded, %d failed",
+            duration,
+            self._loaded,
+            self._failed,
+        )
+        self._on_complete(duration)
+
+    def progress(self):
+        with self._lock:
+            return {
+                "state": self._state,
+                "total": len(self._loads),
+                "loaded": self._loaded,
+                "failed": self._failed,
+            }
+
+    @property
+    def complete(self):
+        with self._lock:
+            return self._state == "complete"
+
+    def _load(self, label, loader, slots):
+        try:
+            loader()
+        except Exception:
+            logger.warning("Cache warm-up failed for %s", label, exc_info=True)
+            outcome = "failed"
+        else:
+            outcome = "loaded"
+        finally:
+            slots.release()
+        with self._lock:
+            if outcome == "loaded":
+                self._loaded += 1
+            else:
+                self._failed += 1
+        self._on_load(label, outcome)
@@ -65,6 +65,7 @@ dependencies {
     implementation(libs.ktor.client.core)
     implementation(libs.ktor.client.cio)
     implementation(libs.ktor.client.content.negotiation)
+    implementation(libs.ktor.client.encoding)
     implementation(libs.ktor.client.logging)
     implementation(libs.logback.classic)
     implementation(libs.koin.ktor)
@@ -123,7 +123,7 @@ internal class BackendProvider(
         else "${from.uppercase()}${to.uppercase()}=X"
 
     internal suspend fun isReady(): Boolean = try {
-        client.get("$backendUrl/health").status.isSuccess()
+        client.get("$backendUrl/ready").status.isSuccess()
     } catch (e: CancellationException) {
         throw e
     } catch (e: Exception) {
@@ -2,6 +2,7 @@ package net.bobinski.stockanalyst
 
 import io.ktor.client.HttpClient
 import io.ktor.client.engine.cio.CIO
+import io.ktor.client.plugins.compression.ContentEncoding
 import io.ktor.client.plugins.contentnegotiation.ContentNegotiation
 import io.ktor.client.plugins.defaultRequest
 import io.ktor.client.plugins.HttpRequestRetry
@@ -24,6 +25,7 @@ val BackendProviderModule = module {
     single<HttpClient>(createdAtStart = true) {
         HttpClient(CIO) {
             install(ContentNegotiation) { json(get<Json>()) }
+            install(ContentEncoding) { gzip() }
             defaultRequest { accept(ContentType.Application.Json) }
             install(HttpTimeout) {
                 configureBackendTimeouts()